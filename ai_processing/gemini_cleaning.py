@@ -2,7 +2,7 @@ import google.generativeai as genai
 import json
 import logging
 import os
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 import time
 import argparse
 import re
@@ -15,6 +15,11 @@ except Exception:
     import sys as _sys, os as _os
     _sys.path.append(_os.path.dirname(_os.path.dirname(__file__)))
     from ai_processing.policies import FIELD_POLICY
+try:
+    from database.async_writer import open_stream_writer
+except Exception:
+    # Écriture DB en continu indisponible (package database non résolu)
+    open_stream_writer = None
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -209,8 +214,12 @@ class GeminiProcessor:
                 time.sleep(delay)
         return {"error": "Gemini processing failed after all retries"}
     
-    def process_product_batch(self, products: List[Dict[str, Any]], batch_size: int = 3, category_hint: str | None = None) -> List[Dict[str, Any]]:
-        """Traite un lot de produits avec rate limiting et préservation en cas d'erreur IA."""
+    def process_product_batch(self, products: List[Dict[str, Any]], batch_size: int = 3, category_hint: str | None = None,
+                              on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
+        """Traite un lot de produits avec rate limiting et préservation en cas d'erreur IA.
+
+        on_batch (optionnel) reçoit chaque lot traité, ex: pour l'écrire en base pendant la pause quota.
+        """
         processed_products: List[Dict[str, Any]] = []
 
         total_batches = (len(products) + batch_size - 1) // batch_size
@@ -256,6 +265,9 @@ class GeminiProcessor:
                     product['ai_processed'] = False
                     processed_products.append(product)
 
+            if on_batch:
+                on_batch(processed_products[-len(batch):])
+
             # Pause inter-batch configurable (free tier)
             if i + batch_size < len(products):
                 logger.info("⏳ Pause pour respecter les quotas API...")
@@ -310,16 +322,28 @@ def process_json_file(input_file: str, output_file: str, api_key: str = None, *,
         processor = GeminiProcessor(api_key)
         category_hint = infer_category(input_file)
 
+        # Écriture DB en continu (ENABLE_DB + DB_STREAM_WRITES), sinon None
+        db_writer = open_stream_writer(category_hint) if open_stream_writer else None
+
+        def finalize_batch(batch: List[Dict[str, Any]]) -> None:
+            # Optimiser la taille
+            for product in batch:
+                if product.get('tech_specs'):
+                    product['tech_specs'] = processor.optimize_specs_size(product['tech_specs'])
+                # Toujours retirer description (déplacée en tech_specs si utile)
+                if 'description' in product:
+                    product.pop('description', None)
+            if db_writer:
+                db_writer.put_many(batch)
+
         # Traiter les produits
-        processed_products = processor.process_product_batch(products, category_hint=category_hint, batch_size=batch_size)
-
-        # Optimiser la taille
-        for product in processed_products:
-            if product.get('tech_specs'):
-                product['tech_specs'] = processor.optimize_specs_size(product['tech_specs'])
-            # Toujours retirer description (déplacée en tech_specs si utile)
-            if 'description' in product:
-                product.pop('description', None)
+        try:
+            processed_products = processor.process_product_batch(
+                products, category_hint=category_hint, batch_size=batch_size, on_batch=finalize_batch
+            )
+        finally:
+            if db_writer:
+                db_writer.close()
 
         # Sauvegarder
         with open(output_file, 'w', encoding='utf-8') as f:
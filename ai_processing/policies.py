@@ -18,6 +18,13 @@ FIELD_POLICY = {
             "power_consumption_w", "noise_db",
             "twain_driver", "ocr_supported"
         ],
+        # Clés exposées en colonnes générées indexées (num | text) pour les filtres SQL
+        "indexed": {
+            "print_speed_ppm": "num",
+            "scan_speed_ipm": "num",
+            "duty_cycle_pages_month": "num",
+            "technology": "text",
+        },
         "synonyms": {
             "ppm": "print_speed_ppm",
             "scan_speed": "scan_speed_ipm",
@@ -47,6 +54,14 @@ FIELD_POLICY = {
             "raid_controller", "nic_ports", "pcie_slots", "psu_watts", "form_factor",
             "dimensions_mm", "weight_kg", "gpu_model"
         ],
+        "indexed": {
+            "ram_max_gb": "num",
+            "ram_installed_gb": "num",
+            "cpu_sockets": "num",
+            "cpu_cores_total": "num",
+            "psu_watts": "num",
+            "form_factor": "text",
+        },
         "synonyms": {
             "cpu": "cpu_model",
             "sockets": "cpu_sockets",
@@ -81,6 +96,12 @@ FIELD_POLICY = {
             "expansion_units", "dimensions_mm", "weight_kg", "psu_watts", "form_factor",
             "nic_ports"
         ],
+        "indexed": {
+            "max_capacity_tb": "num",
+            "drive_bays": "num",
+            "cache_gb": "num",
+            "form_factor": "text",
+        },
         "synonyms": {
             "capacity_max": "max_capacity_tb",
             "cache": "cache_gb",
@@ -0,0 +1,90 @@
+"""
+Planification adaptative des scrapers selon le churn de chaque catalogue.
+
+Chaque script reçoit une fréquence f (runs/semaine) qui minimise la fraîcheur
+perdue Σ churn_i / f_i sous un budget d'heures navigateur Σ coût_i × f_i = B.
+La solution est la règle de la racine carrée: f_i ∝ √(churn_i / coût_i), bornée
+par [SCHEDULER_MIN_RUNS_PER_WEEK, SCHEDULER_MAX_RUNS_PER_WEEK]. Le budget par
+défaut est le coût actuel d'un run hebdomadaire complet: les catalogues
+volatils passent plus souvent, les catalogues stables moins, à heures égales.
+"""
+import logging
+import math
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Budget total (heures navigateur / semaine); 0 = coût d'un run hebdomadaire complet
+SCHEDULER_BROWSER_HOURS_PER_WEEK = float(os.getenv('SCHEDULER_BROWSER_HOURS_PER_WEEK', '0'))
+SCHEDULER_MIN_RUNS_PER_WEEK = float(os.getenv('SCHEDULER_MIN_RUNS_PER_WEEK', '0.25'))
+SCHEDULER_MAX_RUNS_PER_WEEK = float(os.getenv('SCHEDULER_MAX_RUNS_PER_WEEK', '7'))
+# Plancher de churn: un catalogue sans changement observé reste planifié (au minimum)
+SCHEDULER_MIN_CHURN_PER_DAY = float(os.getenv('SCHEDULER_MIN_CHURN_PER_DAY', '0.0005'))
+# Tolérance sur l'échéance (s): un script dû dans moins d'une heure part au déclenchement courant
+_DUE_TOLERANCE_SECONDS = 3600
+
+
+def _allocate(costs, churn, budget_seconds, min_f, max_f):
+    """Fréquences (runs/semaine) par script: règle de la racine carrée avec bornes (water-filling)."""
+    freqs = {}
+    free = set(costs)
+    for _ in range(len(costs) + 1):
+        remaining = budget_seconds - sum(costs[s] * freqs[s] for s in freqs)
+        weight = sum(math.sqrt(churn[s] * costs[s]) for s in free)
+        if remaining <= 0 or weight <= 0:
+            for s in free:
+                freqs[s] = min_f
+            break
+        k = remaining / weight
+        proposed = {s: k * math.sqrt(churn[s] / costs[s]) for s in free}
+        clamped = {s: min(max_f, max(min_f, f)) for s, f in proposed.items() if f < min_f or f > max_f}
+        if not clamped:
+            freqs.update(proposed)
+            break
+        freqs.update(clamped)
+        free -= set(clamped)
+    return freqs
+
+
+def plan_cadences(scripts, history, fallback_costs, budget_hours=None, now=None):
+    """Plan {script: {runs_per_week, cadence_days, churn_per_day, cost_hours, last_success, due}}.
+
+    Les scripts sans churn observé restent hebdomadaires (hors optimisation).
+    """
+    now = now or datetime.now()
+    costs = {s: history.cost_seconds(s) or fallback_costs.get(s, 900) for s in scripts}
+    churn = {s: history.churn_per_day(s) for s in scripts}
+    budget = (budget_hours if budget_hours is not None else SCHEDULER_BROWSER_HOURS_PER_WEEK) * 3600
+    if budget <= 0:
+        budget = sum(costs.values())
+
+    known = {s for s in scripts if churn[s] is not None}
+    freqs = {s: 1.0 for s in scripts if s not in known}
+    freqs.update(_allocate(
+        {s: max(costs[s], 1.0) for s in known},
+        {s: max(churn[s], SCHEDULER_MIN_CHURN_PER_DAY) for s in known},
+        budget - sum(costs[s] for s in freqs),
+        SCHEDULER_MIN_RUNS_PER_WEEK,
+        SCHEDULER_MAX_RUNS_PER_WEEK,
+    ))
+
+    plan = {}
+    for s in scripts:
+        cadence_days = 7.0 / freqs[s]
+        last = history.last_success(s)
+        due = last is None or (now - last).total_seconds() >= cadence_days * 86400 - _DUE_TOLERANCE_SECONDS
+        plan[s] = {
+            'runs_per_week': round(freqs[s], 2),
+            'cadence_days': round(cadence_days, 1),
+            'churn_per_day': round(churn[s], 5) if churn[s] is not None else None,
+            'cost_hours': round(costs[s] / 3600, 2),
+            'last_success': last.isoformat() if last else None,
+            'due': due,
+        }
+    used = sum(costs[s] * freqs[s] for s in scripts) / 3600
+    logger.info(f"🗓️ Plan adaptatif: {used:.1f} h navigateur / semaine (budget {budget / 3600:.1f} h)")
+    for s, p in sorted(plan.items(), key=lambda item: item[1]['cadence_days']):
+        churn_txt = f"{p['churn_per_day'] * 100:.2f}%/j" if p['churn_per_day'] is not None else "churn inconnu"
+        logger.info(f"   • {s}: tous les {p['cadence_days']} j ({churn_txt}, {p['cost_hours']} h){' → dû' if p['due'] else ''}")
+    return plan
@@ -0,0 +1,266 @@
+"""
+File de jobs partagée entre le coordinateur et les workers du scheduler.
+
+Le coordinateur publie un job par script de scraping; chaque worker (local ou sur
+un autre hôte) prend un job sous bail (lease), le prolonge par des heartbeats
+pendant l'exécution puis publie le résultat. Un bail expiré (worker tué, hôte
+perdu) remet le job en file jusqu'à `max_attempts` tentatives.
+
+Backends enregistrés dans JOB_QUEUE_BACKENDS, choisis par le schéma de
+JOB_QUEUE_URL (défaut `sqlite:///logs/job_queue.db`). Le backend SQLite convient
+aux workers d'un même hôte, ou d'hôtes partageant le fichier (volume commun).
+
+    queue = get_job_queue()
+    queue.enqueue(run_id, {'category': 'serveurs', 'script': 'serveurs/hp.py'}, domain='hp.com')
+    job = queue.lease('worker-1')            # None si rien à faire
+    queue.heartbeat(job['id'], 'worker-1')   # False si le bail a été perdu
+    queue.complete(job['id'], 'worker-1', result)
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_URL = os.getenv('JOB_QUEUE_URL', 'sqlite:///logs/job_queue.db')
+# Durée d'un bail (s), prolongée par chaque heartbeat du worker
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '120'))
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', '30'))
+# Tentatives par job (bail expiré ou échec du script) avant abandon
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+
+
+class JobQueue(ABC):
+    """Interface d'une file de jobs; un job est un dict (id, run_id, payload, attempts, ...).
+
+    Un backend incomplet échoue à l'instanciation (méthode abstraite manquante),
+    pas au premier appel pendant un run.
+    """
+
+    @abstractmethod
+    def enqueue(self, run_id, payload, domain=None, priority=0.0, max_attempts=None):
+        """Publie un job en attente; retourne son id. max_attempts: défaut JOB_MAX_ATTEMPTS."""
+
+    @abstractmethod
+    def lease(self, worker, run_id=None, lease_seconds=None, domain_cap=None):
+        """Prend le job en attente le plus prioritaire (au plus `domain_cap` baux par domaine).
+
+        Remet d'abord en file les baux expirés; retourne le job (attempts incrémenté) ou None.
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id, worker, lease_seconds=None):
+        """Prolonge le bail de `worker`; False si le bail a été perdu (expiré, repris, annulé)."""
+
+    @abstractmethod
+    def complete(self, job_id, worker, result):
+        """Publie le résultat d'un job sous bail de `worker`; False si le bail a été perdu."""
+
+    @abstractmethod
+    def fail(self, job_id, worker, error, retry=True, result=None):
+        """Échec d'une tentative (résultat partiel conservé); remis en file si retry et tentatives restantes."""
+
+    @abstractmethod
+    def cancel(self, run_id, error):
+        """Abandonne les jobs non terminés d'un run (échéance dépassée, plus de worker); retourne leur nombre."""
+
+    @abstractmethod
+    def requeue_expired(self):
+        """Remet en file (ou abandonne) les jobs dont le bail a expiré; retourne leur nombre."""
+
+    @abstractmethod
+    def run_status(self, run_id):
+        """Compteurs par statut: {'pending', 'leased', 'done', 'failed'}."""
+
+    @abstractmethod
+    def jobs(self, run_id):
+        """Jobs d'un run (ordre de publication), payload et result décodés."""
+
+
+class SQLiteJobQueue(JobQueue):
+    """File de jobs dans une base SQLite (WAL); un bail est pris sous BEGIN IMMEDIATE."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._tx() as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    domain TEXT,
+                    priority REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker TEXT,
+                    lease_expires REAL,
+                    heartbeat_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, priority)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs (run_id)")
+
+    @contextmanager
+    def _tx(self):
+        # Connexion courte par opération: partageable entre threads (heartbeat) et processus
+        cn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        cn.row_factory = sqlite3.Row
+        try:
+            cn.execute("PRAGMA journal_mode=WAL")
+            cur = cn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        finally:
+            cn.close()
+
+    @staticmethod
+    def _job(row):
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def enqueue(self, run_id, payload, domain=None, priority=0.0, max_attempts=None):
+        now = time.time()
+        with self._tx() as cur:
+            cur.execute(
+                "INSERT INTO jobs (run_id, payload, domain, priority, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, json.dumps(payload, ensure_ascii=False), domain, priority,
+                 max_attempts or JOB_MAX_ATTEMPTS, now, now)
+            )
+            return cur.lastrowid
+
+    def _requeue_expired(self, cur, now):
+        cur.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+            "error = 'lease expired (worker ' || COALESCE(worker, '?') || ')', worker = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        )
+        return cur.rowcount
+
+    def lease(self, worker, run_id=None, lease_seconds=None, domain_cap=None):
+        now = time.time()
+        with self._tx() as cur:
+            self._requeue_expired(cur, now)
+            query = "SELECT * FROM jobs WHERE status = 'pending'"
+            params = []
+            if run_id:
+                query += " AND run_id = ?"
+                params.append(run_id)
+            cur.execute(query + " ORDER BY priority DESC, id", params)
+            candidates = cur.fetchall()
+            if not candidates:
+                return None
+            load = {}
+            if domain_cap:
+                cur.execute("SELECT domain, COUNT(*) FROM jobs WHERE status = 'leased' GROUP BY domain")
+                load = {d: n for d, n in cur.fetchall()}
+            for row in candidates:
+                if domain_cap and row['domain'] and load.get(row['domain'], 0) >= domain_cap:
+                    continue
+                cur.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, attempts = attempts + 1, "
+                    "lease_expires = ?, heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                    (worker, now + (lease_seconds or JOB_LEASE_SECONDS), now, now, row['id'])
+                )
+                job = self._job(row)
+                job.update(status='leased', worker=worker, attempts=row['attempts'] + 1)
+                return job
+            return None
+
+    def heartbeat(self, job_id, worker, lease_seconds=None):
+        now = time.time()
+        with self._tx() as cur:
+            cur.execute(
+                "UPDATE jobs SET lease_expires = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now + (lease_seconds or JOB_LEASE_SECONDS), now, now, job_id, worker)
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        with self._tx() as cur:
+            cur.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id, worker)
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id, worker, error, retry=True, result=None):
+        """Échec d'une tentative: le job repart en file tant qu'il reste des tentatives."""
+        with self._tx() as cur:
+            cur.execute(
+                "UPDATE jobs SET status = CASE WHEN ? AND attempts < max_attempts THEN 'pending' ELSE 'failed' END, "
+                "worker = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE worker END, "
+                "error = ?, result = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (int(retry), int(retry), str(error),
+                 json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 time.time(), job_id, worker)
+            )
+            return cur.rowcount == 1
+
+    def cancel(self, run_id, error):
+        # Un worker encore en cours verra son complete()/fail() ignoré (statut plus 'leased')
+        with self._tx() as cur:
+            cur.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE run_id = ? AND status IN ('pending', 'leased')",
+                (str(error), time.time(), run_id)
+            )
+            return cur.rowcount
+
+    def requeue_expired(self):
+        with self._tx() as cur:
+            return self._requeue_expired(cur, time.time())
+
+    def run_status(self, run_id):
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        with self._tx() as cur:
+            cur.execute("SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status", (run_id,))
+            counts.update({s: n for s, n in cur.fetchall()})
+        return counts
+
+    def jobs(self, run_id):
+        with self._tx() as cur:
+            cur.execute("SELECT * FROM jobs WHERE run_id = ? ORDER BY id", (run_id,))
+            return [self._job(row) for row in cur.fetchall()]
+
+
+# Schéma d'URL → classe de file (ex: ajouter un backend serveur pour des workers sans volume partagé)
+JOB_QUEUE_BACKENDS = {
+    'sqlite': lambda location: SQLiteJobQueue(location),
+}
+
+
+def get_job_queue(url=None):
+    """File de jobs configurée par JOB_QUEUE_URL (`<backend>:///<emplacement>`)."""
+    url = url or JOB_QUEUE_URL
+    scheme, sep, location = url.partition(':///')
+    if not sep:
+        # Chemin nu: fichier SQLite
+        scheme, location = 'sqlite', url
+    factory = JOB_QUEUE_BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"Backend de file de jobs inconnu: {scheme} (connus: {', '.join(JOB_QUEUE_BACKENDS)})")
+    return factory(location)
@@ -0,0 +1,175 @@
+"""
+Modèle de durée par script appris des rapports du scheduler (logs/scraping_report_*.json).
+
+Pour chaque script, les runs réussis donnent des couples (produits, durée):
+    durée ≈ listing + secondes_par_produit × produits
+ajustés par moindres carrés (ratio médian si les volumes ne varient pas), avec
+l'écart-type des résidus. Le scheduler s'en sert pour des timeouts adaptatifs,
+des ETA en cours de run et la détection de régressions.
+
+Les mêmes rapports donnent aussi, par script, la date du dernier run réussi et le
+churn du catalogue (nouveaux / modifiés / désactivés) utilisé par la
+planification adaptative (automation/adaptive.py).
+"""
+import glob
+import json
+import logging
+import os
+import statistics
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Nombre de rapports récents pris en compte
+SCHEDULER_HISTORY_REPORTS = int(os.getenv('SCHEDULER_HISTORY_REPORTS', '20'))
+# Runs réussis minimum avant de remplacer le timeout statique
+SCHEDULER_HISTORY_MIN_RUNS = int(os.getenv('SCHEDULER_HISTORY_MIN_RUNS', '3'))
+# Timeout = max(prévu × facteur, prévu + k × écart-type), jamais sous le plancher
+SCHEDULER_TIMEOUT_FACTOR = float(os.getenv('SCHEDULER_TIMEOUT_FACTOR', '2.0'))
+SCHEDULER_TIMEOUT_SIGMAS = float(os.getenv('SCHEDULER_TIMEOUT_SIGMAS', '4'))
+SCHEDULER_MIN_TIMEOUT_SECONDS = int(os.getenv('SCHEDULER_MIN_TIMEOUT_SECONDS', '300'))
+# Régression signalée si la durée dépasse la prévision de plus de ce ratio (0.5 = +50%)
+SCHEDULER_REGRESSION_THRESHOLD = float(os.getenv('SCHEDULER_REGRESSION_THRESHOLD', '0.5'))
+
+
+def _products_of(result):
+    """Nombre de produits d'un résultat (champ explicite, manifeste, ou post-traitement)."""
+    if isinstance(result.get('products'), int):
+        return result['products']
+    counts = (result.get('manifest') or {}).get('counts') or {}
+    if isinstance(counts.get('products'), int):
+        return counts['products']
+    raw = result.get('raw_json')
+    stats = (result.get('postprocess') or {}).get(os.path.basename(raw)) if raw else None
+    if stats:
+        return stats.get('items')
+    return None
+
+
+class ScriptModel:
+    def __init__(self, samples):
+        self.samples = samples  # [(produits, durée)]
+        n = len(samples)
+        xs = [p for p, _ in samples]
+        ys = [d for _, d in samples]
+        mean_x = sum(xs) / n
+        mean_y = sum(ys) / n
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        if n >= 2 and var_x > 0:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / var_x
+            intercept = mean_y - slope * mean_x
+        else:
+            slope, intercept = None, None
+        if slope is None or slope < 0 or intercept < 0:
+            # Volumes constants ou ajustement incohérent: ratio médian, sans temps de listing
+            slope = statistics.median(d / p for p, d in samples if p > 0) if any(p > 0 for p in xs) else 0.0
+            intercept = 0.0 if slope else mean_y
+        self.seconds_per_product = slope
+        self.listing_seconds = intercept
+        residuals = [y - (intercept + slope * x) for x, y in samples]
+        self.stdev = statistics.pstdev(residuals) if n >= 2 else 0.0
+        self.typical_products = int(statistics.median(xs))
+
+    def predict(self, products=None):
+        """Durée prévue (s) pour un volume donné (volume médian historique par défaut)."""
+        if not products:
+            products = self.typical_products
+        return self.listing_seconds + self.seconds_per_product * products
+
+    def timeout(self, products=None, cap=None):
+        predicted = self.predict(products)
+        t = max(predicted * SCHEDULER_TIMEOUT_FACTOR, predicted + SCHEDULER_TIMEOUT_SIGMAS * self.stdev)
+        t = max(SCHEDULER_MIN_TIMEOUT_SECONDS, t)
+        if cap and cap > 0:
+            t = min(cap, t)
+        return int(t)
+
+    def as_dict(self):
+        return {
+            'runs': len(self.samples),
+            'seconds_per_product': round(self.seconds_per_product, 2),
+            'listing_seconds': round(self.listing_seconds, 1),
+            'stdev_seconds': round(self.stdev, 1),
+            'typical_products': self.typical_products,
+        }
+
+
+class RunHistory:
+    """Historique des durées par script, chargé depuis les rapports JSON."""
+
+    def __init__(self, report_dir, max_reports=None):
+        self.samples = {}
+        # Runs réussis par script, chronologiques: [(début du rapport, résultat)]
+        self.runs = {}
+        files = sorted(glob.glob(os.path.join(report_dir, 'scraping_report_*.json')))
+        for path in files[-(max_reports or SCHEDULER_HISTORY_REPORTS):]:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+                started = datetime.fromisoformat(report['start_time']) if report.get('start_time') else None
+            except (OSError, ValueError):
+                continue
+            for scripts in (report.get('categories') or {}).values():
+                if not isinstance(scripts, dict):
+                    continue
+                for script, result in scripts.items():
+                    if not isinstance(result, dict) or result.get('status') != 'success':
+                        continue
+                    if started:
+                        self.runs.setdefault(script, []).append((started, result))
+                    # Run repris depuis un journal: durée partielle, non représentative
+                    if result.get('resumed_from'):
+                        continue
+                    products = _products_of(result)
+                    if products is None or not result.get('duration'):
+                        continue
+                    self.samples.setdefault(script, []).append((products, float(result['duration'])))
+        logger.info(f"📚 Historique des durées: {len(files)} rapports, {len(self.samples)} scripts")
+
+    def model(self, script):
+        """Modèle du script, ou None si l'historique est insuffisant."""
+        samples = self.samples.get(script) or []
+        if len(samples) < SCHEDULER_HISTORY_MIN_RUNS:
+            return None
+        return ScriptModel(samples)
+
+    def last_success(self, script):
+        runs = self.runs.get(script)
+        return runs[-1][0] if runs else None
+
+    def churn_per_day(self, script, default_interval_days=7.0):
+        """Fraction du catalogue qui change par jour (nouveaux + modifiés + désactivés), ou None."""
+        rates = []
+        previous = None
+        for started, result in self.runs.get(script) or []:
+            churn = result.get('churn')
+            if isinstance(churn, dict) and 'new' in churn:
+                seen = churn.get('new', 0) + churn.get('changed', 0) + churn.get('unchanged', 0)
+                changed = churn.get('new', 0) + churn.get('changed', 0) + churn.get('deactivated', 0)
+                days = (started - previous).total_seconds() / 86400 if previous else default_interval_days
+                rates.append(changed / max(1, seen) / max(days, 1 / 24))
+            previous = started
+        # Médiane: un premier run sur base vide (tout « nouveau ») ne fausse pas la cadence
+        return statistics.median(rates) if rates else None
+
+    def cost_seconds(self, script):
+        """Coût d'un run (s): modèle appris, sinon dernière durée observée, sinon None."""
+        model = self.model(script)
+        if model:
+            return model.predict()
+        samples = self.samples.get(script)
+        return samples[-1][1] if samples else None
+
+
+def regression(model, duration, products=None):
+    """Retourne un diagnostic si la durée dépasse la prévision au-delà du seuil, sinon None."""
+    if model is None:
+        return None
+    predicted = model.predict(products)
+    if predicted <= 0 or duration <= predicted * (1 + SCHEDULER_REGRESSION_THRESHOLD):
+        return None
+    return {
+        'predicted_seconds': round(predicted, 1),
+        'duration': round(duration, 1),
+        'slowdown': round(duration / predicted, 2),
+    }
@@ -8,21 +8,25 @@ from datetime import datetime
 import json
 import threading
 import re
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+from scraping.browser_pool import CHROME_ADDRESS_ENV, CHROME_POOL_SIZE, ChromePool
+from scraping.checkpoint import CHECKPOINT_ENV, RESUME_ENV, checkpoint_path, journal_entries
+from scraping.manifest import MANIFEST_ENV, read_manifest
+from automation.run_history import RunHistory, regression
+from automation.adaptive import plan_cadences
+from automation.job_queue import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_QUEUE_URL, get_job_queue
 
 # Configuration de logging
 log_dir = "logs"
-os.makedirs(log_dir, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'{log_dir}/scheduler.log'),
-        logging.StreamHandler()
-    ]
-)
 # NOTE: On Windows consoles (cp1252), emojis/UTF-8 can raise UnicodeEncodeError.
-# We'll reconfigure the root logger to use a safe console handler and UTF-8 file handler.
+# configure_logging() installe un FileHandler UTF-8 et un handler console sûr.
 logger = logging.getLogger()  # root logger
 
 # Remplacer le StreamHandler standard par un handler sûr pour la console Windows (évite UnicodeEncodeError)
@@ -40,24 +44,163 @@ class SafeStreamHandler(logging.StreamHandler):
             # Ne pas interrompre l'exécution pour un problème d'affichage console
             pass
 
-# Appliquer une configuration sûre: retirer les handlers actuels et ajouter un FileHandler UTF-8 + SafeStreamHandler
-_fmt = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-for h in list(logger.handlers):
-    try:
-        logger.removeHandler(h)
-    except Exception:
-        pass
-
-file_handler = logging.FileHandler(f'{log_dir}/scheduler.log', encoding='utf-8')
-file_handler.setFormatter(_fmt)
-logger.addHandler(file_handler)
-
-# Option pour couper les logs console si l'encodage Windows pose problème
-if os.getenv('SCHEDULER_SILENT_CONSOLE', '1').strip().lower() not in {'1','true','yes','on'}:
-    safe_console = SafeStreamHandler()
-    safe_console.setFormatter(_fmt)
-    logger.addHandler(safe_console)
-logger.setLevel(logging.INFO)
+_logging_configured = False
+
+
+def configure_logging():
+    """Logs du scheduler dans logs/scheduler.log (+ console si SCHEDULER_SILENT_CONSOLE=0).
+
+    Appelée par les points d'entrée (scheduler, worker), pas à l'import: importer le
+    module (tests, outils) n'écrit rien dans l'arbre de travail.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    os.makedirs(log_dir, exist_ok=True)
+    # Configuration sûre: retirer les handlers actuels et ajouter un FileHandler UTF-8 + SafeStreamHandler
+    _fmt = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    for h in list(logger.handlers):
+        try:
+            logger.removeHandler(h)
+        except Exception:
+            pass
+
+    file_handler = logging.FileHandler(f'{log_dir}/scheduler.log', encoding='utf-8')
+    file_handler.setFormatter(_fmt)
+    logger.addHandler(file_handler)
+
+    # Option pour couper les logs console si l'encodage Windows pose problème
+    if os.getenv('SCHEDULER_SILENT_CONSOLE', '1').strip().lower() not in {'1','true','yes','on'}:
+        safe_console = SafeStreamHandler()
+        safe_console.setFormatter(_fmt)
+        logger.addHandler(safe_console)
+    logger.setLevel(logging.INFO)
+
+# Nombre de lignes de sortie conservées en mémoire et dans le rapport, par script
+SCHEDULER_OUTPUT_TAIL_LINES = int(os.getenv('SCHEDULER_OUTPUT_TAIL_LINES', '200'))
+# Intervalle (s) entre deux logs d'ETA pendant l'exécution d'un script
+SCHEDULER_ETA_LOG_SECONDS = int(os.getenv('SCHEDULER_ETA_LOG_SECONDS', '60'))
+# Relances depuis le journal de reprise après un timeout / échec (0 = désactivé)
+SCHEDULER_RESUME_ATTEMPTS = int(os.getenv('SCHEDULER_RESUME_ATTEMPTS', '1'))
+# Mode distribué: coordinateur + workers via la file de jobs (automation/job_queue.py)
+SCHEDULER_DISTRIBUTED = os.getenv('SCHEDULER_DISTRIBUTED', 'false').lower() == 'true'
+# Workers lancés localement par le coordinateur (0 = uniquement des workers externes)
+SCHEDULER_LOCAL_WORKERS = int(os.getenv('SCHEDULER_LOCAL_WORKERS', '1'))
+
+# Jetons de specs suspects dans un nom de produit (validation)
+_NAME_SPEC_TOKENS = ('gb ram', 'tb', 'ssd', 'hdd', 'xeon', 'cores', 'core', 'silver', 'gold', 'bronze', 'w power')
+
+
+def _strip_descriptions(o, counter):
+    if isinstance(o, dict):
+        out = {}
+        for k, v in o.items():
+            if k.lower() == 'description':
+                counter[0] += 1
+                continue
+            out[k] = _strip_descriptions(v, counter)
+        return out
+    if isinstance(o, list):
+        return [_strip_descriptions(x, counter) for x in o]
+    return o
+
+
+def postprocess_json(path, drop_description=True):
+    """Passe unique sur un JSON de sortie de scraper.
+
+    Lit le fichier une fois; pour chaque item: suppression des clés 'description'
+    (optionnelle), SKU remonté de tech_specs vers la racine, validation, collecte des
+    marques. Réécrit le fichier atomiquement seulement s'il a changé.
+    Retourne (données, avertissements, stats).
+    """
+    t0 = time.perf_counter()
+    bytes_in = os.path.getsize(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    parse_seconds = time.perf_counter() - t0
+
+    findings = []
+    brands = set()
+    removed = [0]
+    hoisted = 0
+    changed = False
+    if drop_description:
+        data = _strip_descriptions(data, removed)
+    if not isinstance(data, list):
+        findings.append('root_not_list')
+    else:
+        if len(data) == 0:
+            findings.append('empty_list')
+        for idx, item in enumerate(data):
+            if not isinstance(item, dict):
+                findings.append(f'item_{idx}_not_dict')
+                continue
+            # Normalisation: remonter SKU au niveau racine si présent dans tech_specs
+            ts = item.get('tech_specs')
+            if isinstance(ts, dict):
+                sku_val = ts.pop('SKU', None) or ts.pop('sku', None)
+                if sku_val:
+                    if not item.get('sku'):
+                        item['sku'] = sku_val
+                    hoisted += 1
+                    changed = True
+            brand = (item.get('brand') or '').strip()
+            if brand:
+                brands.add(brand)
+            # Clés requises
+            for key in ['brand', 'link', 'name', 'tech_specs']:
+                if key not in item:
+                    findings.append(f'missing_{key}_at_{idx}')
+            name = (item.get('name') or '').strip()
+            if not name:
+                findings.append(f'empty_name_{idx}')
+            # Si le nom contient trop de specs, signaler
+            name_low = name.lower()
+            if any(tok in name_low for tok in _NAME_SPEC_TOKENS):
+                findings.append(f'name_may_contain_specs_{idx}')
+            # tech_specs doit être un objet
+            if ts is None:
+                findings.append(f'no_tech_specs_{idx}')
+            elif not isinstance(ts, dict):
+                findings.append(f'tech_specs_not_object_{idx}')
+            # lien plausible
+            link = item.get('link')
+            if not (isinstance(link, str) and link.startswith('http')):
+                findings.append(f'bad_link_{idx}')
+
+    bytes_out = bytes_in
+    t1 = time.perf_counter()
+    if changed or removed[0]:
+        # Écriture atomique: fichier temporaire dans le même dossier puis remplacement
+        fd, tmp_path = tempfile.mkstemp(prefix='.postprocess_', suffix='.json', dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        bytes_out = os.path.getsize(path)
+    write_seconds = time.perf_counter() - t1
+
+    stats = {
+        'items': len(data) if isinstance(data, list) else 0,
+        'brands': sorted(brands),
+        'descriptions_removed': removed[0],
+        'skus_hoisted': hoisted,
+        'findings': len(findings),
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out,
+        'parse_seconds': round(parse_seconds, 3),
+        'write_seconds': round(write_seconds, 3),
+        'seconds': round(time.perf_counter() - t0, 3),
+    }
+    return data, findings, stats
+
 
 class ScrapingScheduler:
     def __init__(self):
@@ -80,6 +223,10 @@ class ScrapingScheduler:
             ]
         }
         self.results = {}
+        # Historique des durées (rapports précédents), rechargé à chaque run complet
+        self.history = None
+        # Restriction optionnelle à un sous-ensemble de scripts (planification adaptative)
+        self._only_scripts = None
         # Délai recommandé par script (secondes)
         self.script_timeouts = {
             'serveurs/lenovo.py': 1800,
@@ -88,9 +235,128 @@ class ScrapingScheduler:
             'imprimantes_scanners/hp.py': 1800,
             'imprimantes_scanners/EpsonScanner.py': 1800,
         }
+        # Domaine fournisseur par script: en mode parallèle, les scripts d'un même
+        # domaine partagent un plafond de concurrence (même hôte, mêmes protections anti-bot)
+        self.script_domains = {
+            'serveurs/asus.py': 'asus.com',
+            'serveurs/dell.py': 'dell.com',
+            'stockage/dell.py': 'dell.com',
+            'serveurs/hp.py': 'hp.com',
+            'imprimantes_scanners/hp.py': 'hp.com',
+            'serveurs/lenovo.py': 'lenovo.com',
+            'stockage/lenovo.py': 'lenovo.com',
+            'serveurs/xfusion.py': 'xfusion.com',
+            'imprimantes_scanners/EpsonPrinters.py': 'epson.com',
+            'imprimantes_scanners/EpsonScanner.py': 'epson.com',
+        }
+        # Connecteur DB ouvert une fois par run et partagé par les uploads (sous verrou en mode parallèle)
+        self._db = None
+        self._db_lock = threading.Lock()
+        # Pool de Chrome chauds prêtés aux scripts (CHROME_POOL_SIZE > 0)
+        self.browser_pool = None
+
+    def upload_products(self, products, table, brand=None):
+        """Upsert en processus des produits déjà chargés, via le connecteur partagé du run.
+
+        Retourne le bilan de churn {'new', 'changed', 'unchanged', 'deactivated'} ou False.
+        """
+        try:
+            from database.common import get_connector
+            from database.save import save_products
+        except Exception as e:
+            logger.error(f"❌ Insertion DB impossible (import database.save): {e}")
+            return False
+        with self._db_lock:
+            if self._db is None:
+                db = get_connector()
+                if not db.connect():
+                    logger.error("❌ Insertion DB impossible: connexion refusée")
+                    return False
+                if not db.create_tables():
+                    logger.error("❌ Insertion DB impossible: schéma incomplet (migrations en échec)")
+                    db.close()
+                    return False
+                self._db = db
+            self._db.last_deactivated = 0
+            if not save_products(products, table, brand, db=self._db):
+                return False
+            # Bilan renseigné par les deux modes de chargement (upsert et LOAD DATA)
+            churn = dict(self._db.last_upsert_stats)
+            churn['deactivated'] = self._db.last_deactivated
+            return churn
+
+    def close_db(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def start_browser_pool(self):
+        """Lance le pool de Chrome chauds si CHROME_POOL_SIZE > 0 (sinon chaque script lance le sien)"""
+        if CHROME_POOL_SIZE <= 0 or self.browser_pool is not None:
+            return
+        # Les scripts lancés par le scheduler sont headless par défaut (HEADLESS_MODE=1)
+        headless = os.getenv('HEADLESS_MODE', '1').strip().lower() in {'1', 'true', 'yes', 'on'}
+        pool = ChromePool(CHROME_POOL_SIZE, headless=headless)
+        if pool.start():
+            self.browser_pool = pool
+
+    def stop_browser_pool(self):
+        if self.browser_pool is not None:
+            self.results['chrome_pool'] = dict(self.browser_pool.stats)
+            self.browser_pool.close()
+            self.browser_pool = None
     
-    def run_script(self, script_path):
-        """Exécute un script de scraping"""
+    def run_script(self, script_path, resume=False):
+        """Exécute un script de scraping, repris depuis son journal après un timeout ou un échec"""
+        result = self._run_pooled(script_path, resume=resume)
+        journal = checkpoint_path(self._safe_name(script_path))
+        attempts = 0
+        while result.get('status') in ('timeout', 'error') and attempts < SCHEDULER_RESUME_ATTEMPTS:
+            entries = journal_entries(journal)
+            if not entries:
+                break
+            attempts += 1
+            logger.info(f"♻️ Reprise de {script_path} depuis {journal} ({entries} entrées, tentative {attempts})")
+            previous = result
+            result = self._run_pooled(script_path, resume=True)
+            result['resumed_from'] = {
+                'status': previous.get('status'),
+                'duration': previous.get('duration'),
+                'log_file': previous.get('log_file'),
+                'journal_entries': entries
+            }
+        return result
+
+    def _run_pooled(self, script_path, resume=False):
+        """Une tentative, sur une instance Chrome chaude du pool si disponible"""
+        chrome = None
+        if self.browser_pool is not None:
+            try:
+                # Attente bornée (CHROME_POOL_ACQUIRE_TIMEOUT): sinon le script lance son propre Chrome
+                chrome = self.browser_pool.acquire()
+                if chrome is None:
+                    logger.warning(f"⚠️ Aucune instance du pool Chrome libre pour {script_path}, lancement local")
+            except Exception as e:
+                logger.warning(f"⚠️ Pool Chrome indisponible pour {script_path}: {e}")
+        if chrome is None:
+            return self._run_script_once(script_path, resume=resume)
+        result = {}
+        try:
+            result = self._run_script_once(script_path, resume=resume, chrome_address=chrome.address)
+        finally:
+            pages = ((result.get('manifest') or {}).get('counts') or {}).get('pages')
+            # Script tué (timeout) ou planté: l'instance peut garder des onglets orphelins
+            self.browser_pool.release(chrome, pages, healthy=result.get('status') in ('success', 'error'))
+        result['chrome_pool'] = {'address': chrome.address, 'runs': chrome.runs, 'pages': chrome.pages}
+        return result
+
+    @staticmethod
+    def _safe_name(script_path):
+        return script_path.replace('/', '_').replace('\\', '_').replace('.py', '')
+
+    def _run_script_once(self, script_path, resume=False, chrome_address=None):
+        """Exécute un script de scraping (une tentative)"""
         try:
             logger.info(f"🚀 Démarrage de {script_path}")
             start_time = datetime.now()
@@ -106,15 +372,27 @@ class ScrapingScheduler:
 
             # Préparer un fichier de log par script pour le streaming temps réel
             timestamp_run = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_name = script_path.replace('/', '_').replace('\\', '_').replace('.py', '')
+            safe_name = self._safe_name(script_path)
             script_log_file = os.path.join(log_dir, f"{safe_name}_{timestamp_run}.log")
             logger.info(f"📝 Sortie temps réel → {script_log_file}")
 
-            captured_lines: list[str] = []
+            # Seule la fin de la sortie est gardée en mémoire (le log complet est sur disque)
+            captured_lines = deque(maxlen=SCHEDULER_OUTPUT_TAIL_LINES)
+            # Manifeste écrit par le scraper (chemin de sortie, compteurs, erreurs)
+            manifest_file = os.path.abspath(os.path.join(log_dir, f"{safe_name}_{timestamp_run}.manifest.json"))
 
             with open(script_log_file, 'w', encoding='utf-8') as logf:
                 # Indiquer explicitement aux sous-processus qu'ils sont lancés par le scheduler
                 env["RUNNING_UNDER_SCHEDULER"] = "1"
+                env[MANIFEST_ENV] = manifest_file
+                # Journal de reprise stable par script (relu seulement en reprise)
+                env[CHECKPOINT_ENV] = checkpoint_path(safe_name)
+                env[RESUME_ENV] = "1" if resume else "0"
+                # Chrome chaud du pool auquel le script s'attache (sinon lancement local)
+                if chrome_address:
+                    env[CHROME_ADDRESS_ENV] = chrome_address
+                else:
+                    env.pop(CHROME_ADDRESS_ENV, None)
                 # Valeurs par défaut pour plus de stabilité/rapidité
                 env.setdefault("HEADLESS_MODE", "1")
                 env.setdefault("FAST_SCRAPE", "1")
@@ -148,37 +426,36 @@ class ScrapingScheduler:
                 t.daemon = True
                 t.start()
 
-                # Timeout configurable par env (override possible par script)
-                default_timeout = self.script_timeouts.get(script_path, 900)
-                env_timeout = int(os.getenv('SCHEDULER_SCRIPT_TIMEOUT_SECONDS', str(default_timeout)))
-                # Choisir le plus grand pour éviter d'écraser les délais spécifiques
-                base_timeout = max(default_timeout, env_timeout)
-                # Échelle dynamique selon MAX_PRODUCTS (ex: 20 → x4), avec plafond configurable
                 try:
                     mp_val = int(env.get('MAX_PRODUCTS', '5'))
                 except Exception:
                     mp_val = 5
-                scale = max(1, mp_val // 5)  # 5→x1, 10→x2, 15→x3, 20→x4
-                max_cap_env = os.getenv('SCHEDULER_MAX_TIMEOUT_CAP_SECONDS', '21600')  # défaut 6h
-                try:
-                    max_cap = int(max_cap_env)
-                except Exception:
-                    max_cap = 21600
-                computed = int(base_timeout * scale)
-                timeout_s = computed if max_cap <= 0 else int(min(max_cap, computed))
+                timeout_s = self.script_timeout(script_path, mp_val)
+                model = self.history.model(script_path)
+                expected_products = mp_val if mp_val > 0 else None
+                predicted = model.predict(expected_products) if model else None
+                if model:
+                    logger.info(
+                        f"🧠 {script_path}: durée prévue {predicted/60:.1f} min "
+                        f"({model.seconds_per_product:.1f}s/produit + {model.listing_seconds:.0f}s listing), "
+                        f"timeout {timeout_s/60:.1f} min"
+                    )
                 try:
-                    process.wait(timeout=timeout_s)
+                    self._wait_with_eta(process, script_path, timeout_s, predicted)
                 except subprocess.TimeoutExpired:
                     process.kill()
                     t.join(timeout=5)
                     end_time = datetime.now()
                     duration = (end_time - start_time).total_seconds()
-                    logger.error(f"⏰ {script_path} a dépassé le timeout")
+                    logger.error(f"⏰ {script_path} a dépassé le timeout ({timeout_s}s)")
                     return {
                         'status': 'timeout',
                         'duration': duration,
                         'error': 'Timeout expired',
-                        'log_file': script_log_file
+                        'timeout': timeout_s,
+                        'predicted_seconds': round(predicted, 1) if predicted else None,
+                        'log_file': script_log_file,
+                        'output_tail': ''.join(captured_lines)
                     }
 
                 # S'assurer que le thread a fini d'écrire
@@ -186,19 +463,21 @@ class ScrapingScheduler:
 
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
-            output_text = ''.join(captured_lines)
-
-            # Essayer de détecter le chemin du JSON dans les sorties
-            raw_json_path = None
-            # Plusieurs scripts impriment ce motif
-            m = re.search(r"Données sauvées en JSON:\s*(.+)", output_text)
-            if not m:
-                # Certains scripts impriment le nom de fichier simple sans chemin
-                m2 = re.search(r"(\w+_servers_full\.json|\w+_storage_full\.json|hp_printers_scanners_schema\.json|epson_\w+\.json)", output_text)
-                if m2:
-                    raw_json_path = os.path.join(os.path.dirname(__file__), "..", m2.group(1))
-            else:
-                raw_json_path = m.group(1).strip()
+            output_tail = ''.join(captured_lines)
+
+            # Chemin du JSON produit: manifeste du scraper, sinon détection dans la fin de sortie
+            manifest = read_manifest(manifest_file)
+            raw_json_path = (manifest or {}).get('output_path')
+            if not raw_json_path:
+                # Plusieurs scripts impriment ce motif
+                m = re.search(r"Données sauvées en JSON:\s*(.+)", output_tail)
+                if not m:
+                    # Certains scripts impriment le nom de fichier simple sans chemin
+                    m2 = re.search(r"(\w+_servers_full\.json|\w+_storage_full\.json|hp_printers_scanners_schema\.json|epson_\w+\.json)", output_tail)
+                    if m2:
+                        raw_json_path = os.path.join(os.path.dirname(__file__), "..", m2.group(1))
+                else:
+                    raw_json_path = m.group(1).strip()
 
             # Post-traitement Gemini si activé (avec possibilité de le désactiver par catégorie)
             cleaned_json_path = None
@@ -249,120 +528,49 @@ class ScrapingScheduler:
                         '--out', cleaned_json_path,
                         '--batch-size', batch_size
                     ]
-                    subprocess.check_call(cmd)
+                    # Insertion DB par le scheduler sur le JSON final: pas d'écriture en continu côté nettoyage
+                    subprocess.check_call(cmd, env=dict(os.environ, RUNNING_UNDER_SCHEDULER="1"))
                 except subprocess.CalledProcessError as e:
                     logger.error(f"❌ Échec post-traitement Gemini: {e}")
                     cleaned_json_path = None
 
-            # Suppression globale des descriptions dans les fichiers JSON de sortie
-            def _strip_descriptions_inplace(path: str):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    def _strip(o):
-                        if isinstance(o, dict):
-                            return {k: _strip(v) for k, v in o.items() if k.lower() != 'description'}
-                        if isinstance(o, list):
-                            return [_strip(x) for x in o]
-                        return o
-                    new_data = _strip(data)
-                    with open(path, 'w', encoding='utf-8') as f:
-                        json.dump(new_data, f, ensure_ascii=False, indent=2)
-                    logger.info(f"🧺 Descriptions supprimées → {path}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Impossible de supprimer 'description' dans {path}: {e}")
-
+            # Post-traitement en une passe par fichier: suppression des descriptions,
+            # SKU hoisté, validation de tous les items, marques et stats, écriture atomique
             drop_desc_global = os.getenv('DROP_DESCRIPTION_GLOBAL', 'true').strip().lower() in {'1','true','yes','on'}
-            if drop_desc_global:
-                for p in [cleaned_json_path, raw_json_path]:
-                    if p and os.path.exists(p):
-                        _strip_descriptions_inplace(p)
-
-            # Normalisation: remonter SKU au niveau racine si présent dans tech_specs
-            def _hoist_sku(path: str):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    if not isinstance(data, list):
-                        return
-                    changed = False
-                    for item in data:
-                        if not isinstance(item, dict):
-                            continue
-                        ts = item.get('tech_specs') or {}
-                        if isinstance(ts, dict):
-                            sku_val = ts.pop('SKU', None) or ts.pop('sku', None)
-                            if sku_val:
-                                if not item.get('sku'):
-                                    item['sku'] = sku_val
-                                changed = True
-                    if changed:
-                        with open(path, 'w', encoding='utf-8') as f:
-                            json.dump(data, f, ensure_ascii=False, indent=2)
-                        logger.info(f"📦 Normalisé: 'sku' hoisté vers la racine → {path}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Normalisation SKU échouée pour {path}: {e}")
-
+            target_json = cleaned_json_path or raw_json_path
+            target_data = None
+            validation_findings = []
+            postprocess_stats = {}
             for p in [cleaned_json_path, raw_json_path]:
-                if p and os.path.exists(p):
-                    _hoist_sku(p)
-
-            # Validation légère du JSON et diagnostic
-            def _validate_json_file(path: str, context: str):
-                findings = []
+                if not (p and os.path.exists(p)):
+                    continue
                 try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    if not isinstance(data, list):
-                        findings.append('root_not_list')
-                        return findings
-                    if len(data) == 0:
-                        findings.append('empty_list')
-                    # Règles génériques
-                    spec_tokens = ['gb ram', 'tb', 'ssd', 'hdd', 'xeon', 'cores', 'core', 'silver', 'gold', 'bronze', 'w power']
-                    for idx, item in enumerate(data[:50]):  # limiter pour les gros fichiers
-                        if not isinstance(item, dict):
-                            findings.append(f'item_{idx}_not_dict')
-                            continue
-                        # Clés requises
-                        for key in ['brand', 'link', 'name', 'tech_specs']:
-                            if key not in item:
-                                findings.append(f'missing_{key}_at_{idx}')
-                        # Sanity name
-                        name = (item.get('name') or '').strip()
-                        if not name:
-                            findings.append(f'empty_name_{idx}')
-                        # Si le nom contient trop de specs, signaler
-                        name_low = name.lower()
-                        if any(tok in name_low for tok in spec_tokens):
-                            findings.append(f'name_may_contain_specs_{idx}')
-                        # tech_specs doit être un objet
-                        ts = item.get('tech_specs')
-                        if ts is None:
-                            findings.append(f'no_tech_specs_{idx}')
-                        elif not isinstance(ts, dict):
-                            findings.append(f'tech_specs_not_object_{idx}')
-                        # lien plausible
-                        link = item.get('link')
-                        if not (isinstance(link, str) and link.startswith('http')):
-                            findings.append(f'bad_link_{idx}')
-                    return findings
+                    data, findings, stats = postprocess_json(p, drop_description=drop_desc_global)
                 except Exception as e:
-                    return [f'exception:{e}']
+                    logger.warning(f"⚠️ Post-traitement impossible pour {p}: {e}")
+                    if p == target_json:
+                        validation_findings = [f'exception:{e}']
+                    continue
+                # Valeurs mesurées uniquement (tailles avant/après réécriture, temps de lecture/écriture)
+                postprocess_stats[os.path.basename(p)] = stats
+                logger.info(
+                    f"🧺 {p}: {stats['items']} items, {stats['descriptions_removed']} descriptions, "
+                    f"{stats['skus_hoisted']} SKU hoistés, {stats['bytes_in']} → {stats['bytes_out']} octets, "
+                    f"{stats['seconds']:.2f}s (lecture {stats['parse_seconds']:.2f}s, écriture {stats['write_seconds']:.2f}s)"
+                )
+                if p == target_json:
+                    target_data = data
+                    validation_findings = findings
 
-            validation_findings = []
-            json_for_validation = cleaned_json_path or raw_json_path
-            if json_for_validation and os.path.exists(json_for_validation):
-                validation_findings = _validate_json_file(json_for_validation, f'{category_name}/{brand_name}')
-                if validation_findings:
-                    logger.warning(f"🔎 Validation {category_name}/{brand_name}: {len(validation_findings)} avertissements")
-                    for fnd in validation_findings[:20]:
-                        logger.warning(f"   • {fnd}")
+            if validation_findings:
+                logger.warning(f"🔎 Validation {category_name}/{brand_name}: {len(validation_findings)} avertissements")
+                for fnd in validation_findings[:20]:
+                    logger.warning(f"   • {fnd}")
 
             # Insertion en base avec le JSON nettoyé si demandé
+            churn = None
             if os.getenv('ENABLE_DB', 'false').lower() == 'true':
-                target_json = cleaned_json_path or raw_json_path
-                if target_json and os.path.exists(target_json):
+                if isinstance(target_data, list):
                     # Choisir la table selon le chemin du script
                     table = 'imprimantes_scanners'
                     if 'serveurs' in script_path:
@@ -375,34 +583,49 @@ class ScrapingScheduler:
                     if max_products and max_products.isdigit() and int(max_products) > 0 and enable_deact:
                         logger.warning("⚠️ MAX_PRODUCTS>0 et ENABLE_DEACTIVATE_MISSING=true: cela peut désactiver des produits non traités lors d'un run de test.")
                     try:
-                        logger.info(f"💾 Insertion DB depuis {target_json} dans '{table}' (avec détection de la marque)")
-                        code = (
-                            "import json\n"
-                            "from database.mysql_connector import save_to_database\n"
-                            f"p=r'''{target_json}'''\n"
-                            "brand=None\n"
-                            "try:\n"
-                            "    with open(p,'r',encoding='utf-8') as f:\n"
-                            "        data=json.load(f)\n"
-                            "    brands=set((item.get('brand') or '').strip() for item in data if item.get('brand'))\n"
-                            "    brand=list(brands)[0] if len(brands)==1 else None\n"
-                            "except Exception:\n"
-                            "    brand=None\n"
-                            f"print(save_to_database(r'''{target_json}''', r'''{table}''', brand))\n"
-                        )
-                        subprocess.check_call([python_exec, '-c', code])
-                    except subprocess.CalledProcessError as e:
+                        # Marque unique du fichier → désactivation des non revus limitée à cette marque
+                        brands = postprocess_stats[os.path.basename(target_json)]['brands']
+                        brand = brands[0] if len(brands) == 1 else None
+                        logger.info(f"💾 Insertion DB depuis {target_json} dans '{table}' (marque: {brand or 'multiple'})")
+                        churn = self.upload_products(target_data, table, brand) or None
+                        if not churn:
+                            logger.error("❌ Insertion DB échouée")
+                    except Exception as e:
                         logger.error(f"❌ Insertion DB échouée: {e}")
 
+            # Volume produit (manifeste, sinon post-traitement) et comparaison à l'historique
+            products = ((manifest or {}).get('counts') or {}).get('products')
+            if products is None and raw_json_path:
+                products = (postprocess_stats.get(os.path.basename(raw_json_path)) or {}).get('items')
+            slow = regression(model, duration, products) if process.returncode == 0 else None
+            if slow:
+                logger.warning(
+                    f"🐢 Régression {script_path}: {duration/60:.1f} min vs {slow['predicted_seconds']/60:.1f} min prévues "
+                    f"(x{slow['slowdown']})"
+                )
+            timing_info = {
+                'products': products,
+                'max_products': mp_val,
+                'timeout': timeout_s,
+                'predicted_seconds': round(predicted, 1) if predicted else None,
+                'model': model.as_dict() if model else None,
+                'regression': slow,
+                'churn': churn
+            }
+
             if process.returncode == 0:
                 logger.info(f"✅ {script_path} terminé avec succès en {duration:.0f}s")
                 return {
                     'status': 'success',
                     'duration': duration,
-                    'output': output_text,
+                    'output_tail': output_tail,
                     'log_file': script_log_file,
                     'raw_json': raw_json_path,
-                    'cleaned_json': cleaned_json_path
+                    'cleaned_json': cleaned_json_path,
+                    'postprocess': postprocess_stats,
+                    'validation_findings': len(validation_findings),
+                    'manifest': manifest,
+                    **timing_info
                 }
             else:
                 logger.error(f"❌ {script_path} a échoué (code {process.returncode}). Voir {script_log_file}")
@@ -412,7 +635,11 @@ class ScrapingScheduler:
                     'error': f'Exit code {process.returncode}',
                     'log_file': script_log_file,
                     'raw_json': raw_json_path,
-                    'cleaned_json': cleaned_json_path
+                    'cleaned_json': cleaned_json_path,
+                    'postprocess': postprocess_stats,
+                    'validation_findings': len(validation_findings),
+                    'manifest': manifest,
+                    **timing_info
                 }
                 
         except subprocess.TimeoutExpired:
@@ -430,68 +657,306 @@ class ScrapingScheduler:
                 'error': str(e)
             }
     
+    def script_timeout(self, script_path, max_products):
+        """Timeout (s) d'un script: appris de l'historique, sinon délai statique mis à l'échelle de MAX_PRODUCTS"""
+        # Timeout configurable par env (override possible par script)
+        default_timeout = self.script_timeouts.get(script_path, 900)
+        env_timeout = int(os.getenv('SCHEDULER_SCRIPT_TIMEOUT_SECONDS', str(default_timeout)))
+        # Choisir le plus grand pour éviter d'écraser les délais spécifiques
+        base_timeout = max(default_timeout, env_timeout)
+        # Échelle dynamique selon MAX_PRODUCTS (ex: 20 → x4), avec plafond configurable
+        scale = max(1, max_products // 5)  # 5→x1, 10→x2, 15→x3, 20→x4
+        max_cap_env = os.getenv('SCHEDULER_MAX_TIMEOUT_CAP_SECONDS', '21600')  # défaut 6h
+        try:
+            max_cap = int(max_cap_env)
+        except Exception:
+            max_cap = 21600
+        computed = int(base_timeout * scale)
+        timeout_s = computed if max_cap <= 0 else int(min(max_cap, computed))
+        # Timeout appris de l'historique quand il y a assez de runs réussis
+        if self.history is None:
+            self.history = RunHistory(log_dir)
+        model = self.history.model(script_path)
+        if model:
+            timeout_s = model.timeout(max_products if max_products > 0 else None, cap=max_cap)
+        return timeout_s
+
+    def _wait_with_eta(self, process, script_path, timeout_s, predicted):
+        """Attend la fin du script en loggant l'ETA; lève TimeoutExpired au-delà de timeout_s"""
+        t0 = time.monotonic()
+        deadline = t0 + timeout_s
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(process.args, timeout_s)
+            try:
+                process.wait(timeout=min(SCHEDULER_ETA_LOG_SECONDS, remaining))
+                return
+            except subprocess.TimeoutExpired:
+                elapsed = time.monotonic() - t0
+                if predicted:
+                    logger.info(
+                        f"⏳ {script_path}: {elapsed/60:.1f} min écoulées, "
+                        f"ETA ~{max(0, predicted - elapsed)/60:.1f} min (prévu {predicted/60:.1f} min)"
+                    )
+                else:
+                    logger.info(f"⏳ {script_path}: {elapsed/60:.1f} min écoulées (pas d'historique)")
+
     def run_category(self, category):
         """Exécute tous les scripts d'une catégorie"""
         logger.info(f"📂 Démarrage de la catégorie: {category}")
         category_results = {}
-        
-        # Filtre optionnel de scripts (CSV) via env
-        scripts_filter = os.getenv('SCHEDULER_SCRIPTS')
-        scripts_to_run = self.scripts.get(category, [])
-        if scripts_filter:
-            wanted = {s.strip() for s in scripts_filter.split(',') if s.strip()}
-            scripts_to_run = [s for s in scripts_to_run if s in wanted]
 
-        for script in scripts_to_run:
+        for script in self.scripts_for(category):
             if os.path.exists(script):
                 result = self.run_script(script)
                 category_results[script] = result
             else:
-                abs_path = os.path.abspath(script)
-                logger.warning(f"⚠️ Script non trouvé: {script} (abs: {abs_path})")
-                category_results[script] = {
-                    'status': 'not_found',
-                    'duration': 0,
-                    'error': 'File not found'
-                }
+                category_results[script] = self._not_found(script)
         
         return category_results
+
+    def scripts_for(self, category):
+        """Scripts d'une catégorie, filtrés par SCHEDULER_SCRIPTS (CSV) si défini"""
+        scripts_filter = os.getenv('SCHEDULER_SCRIPTS')
+        scripts_to_run = self.scripts.get(category, [])
+        if scripts_filter:
+            wanted = {s.strip() for s in scripts_filter.split(',') if s.strip()}
+            scripts_to_run = [s for s in scripts_to_run if s in wanted]
+        if self._only_scripts is not None:
+            scripts_to_run = [s for s in scripts_to_run if s in self._only_scripts]
+        return scripts_to_run
+
+    def selected_categories(self):
+        """Catégories à exécuter (filtrables via env SCHEDULER_CATEGORIES)"""
+        categories_filter = os.getenv('SCHEDULER_CATEGORIES')
+        categories = list(self.scripts.keys())
+        if categories_filter:
+            wanted = {c.strip() for c in categories_filter.split(',') if c.strip()}
+            categories = [c for c in categories if c in wanted]
+        return categories
+
+    def _not_found(self, script):
+        abs_path = os.path.abspath(script)
+        logger.warning(f"⚠️ Script non trouvé: {script} (abs: {abs_path})")
+        return {
+            'status': 'not_found',
+            'duration': 0,
+            'error': 'File not found'
+        }
+
+    def run_parallel(self, categories, workers):
+        """Exécute les scripts de toutes les catégories en parallèle.
+
+        Au plus `workers` scripts simultanés, et au plus SCHEDULER_DOMAIN_CONCURRENCY
+        (défaut 1) par domaine fournisseur (ex: Dell serveurs et Dell stockage jamais ensemble).
+        Les résultats sont fusionnés dans self.results['categories'] comme en mode séquentiel.
+        """
+        domain_cap = max(1, int(os.getenv('SCHEDULER_DOMAIN_CONCURRENCY', '1')))
+        pending = []
+        for category in categories:
+            self.results['categories'].setdefault(category, {})
+            for script in self.scripts_for(category):
+                if os.path.exists(script):
+                    pending.append((category, script))
+                else:
+                    self.results['categories'][category][script] = self._not_found(script)
+        # Scripts les plus longs d'abord (durée apprise, sinon timeout statique):
+        # la durée totale tend vers celle du plus long
+        def expected_duration(item):
+            model = self.history.model(item[1]) if self.history else None
+            return model.predict() if model else self.script_timeouts.get(item[1], 900)
+        pending.sort(key=expected_duration, reverse=True)
+        logger.info(f"⚡ Mode parallèle: {len(pending)} scripts, {workers} workers, {domain_cap} par domaine")
+
+        running = {}
+        domain_load = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scraper') as pool:
+            while pending or running:
+                for item in list(pending):
+                    if len(running) >= workers:
+                        break
+                    domain = self.script_domains.get(item[1], item[1])
+                    if domain_load.get(domain, 0) >= domain_cap:
+                        continue
+                    pending.remove(item)
+                    domain_load[domain] = domain_load.get(domain, 0) + 1
+                    running[pool.submit(self.run_script, item[1])] = item
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    category, script = running.pop(future)
+                    domain_load[self.script_domains.get(script, script)] -= 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Erreur dans {script}: {e}")
+                        result = {'status': 'exception', 'duration': 0, 'error': str(e)}
+                    self.results['categories'][category][script] = result
+        # Rapport dans l'ordre de configuration, comme en mode séquentiel
+        for category in categories:
+            done_results = self.results['categories'][category]
+            self.results['categories'][category] = {s: done_results[s] for s in self.scripts_for(category) if s in done_results}
     
-    def run_all_scrapers(self):
-        """Exécute tous les scrapers"""
-        logger.info("🎯 === DÉMARRAGE DU SCRAPING HEBDOMADAIRE ===")
+    def run_distributed(self, categories):
+        """Coordinateur: publie un job par script et attend les résultats des workers.
+
+        Les workers (automation/worker.py, locaux ou sur d'autres hôtes) partagent la file
+        JOB_QUEUE_URL; baux, heartbeats et tentatives sont gérés par la file. L'attente
+        est bornée par la somme des timeouts prévus (toutes tentatives comprises) et
+        s'arrête si tous les workers locaux sont morts sans personne pour prendre le relais.
+        """
+        queue = get_job_queue()
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.results['run_id'] = run_id
+        # MAX_PRODUCTS par défaut des scripts lancés par les workers (cf. _run_script_once)
+        try:
+            max_products = int(os.getenv('MAX_PRODUCTS', '20'))
+        except Exception:
+            max_products = 20
+        attempts_per_job = max(1, JOB_MAX_ATTEMPTS) * (1 + max(0, SCHEDULER_RESUME_ATTEMPTS))
+        budget = JOB_LEASE_SECONDS
+        jobs = 0
+        for category in categories:
+            self.results['categories'].setdefault(category, {})
+            for script in self.scripts_for(category):
+                if not os.path.exists(script):
+                    self.results['categories'][category][script] = self._not_found(script)
+                    continue
+                # Scripts les plus longs d'abord, comme en mode parallèle
+                model = self.history.model(script) if self.history else None
+                priority = model.predict() if model else self.script_timeouts.get(script, 900)
+                queue.enqueue(run_id, {'category': category, 'script': script},
+                              domain=self.script_domains.get(script), priority=priority)
+                budget += self.script_timeout(script, max_products) * attempts_per_job
+                jobs += 1
+        logger.info(
+            f"🛰️ Mode distribué: {jobs} jobs publiés (run {run_id}, file {JOB_QUEUE_URL}), "
+            f"échéance {budget/3600:.1f} h"
+        )
+
+        workers = []
+        worker_logs = []
+        try:
+            for i in range(max(0, SCHEDULER_LOCAL_WORKERS)):
+                # Sortie de chaque worker sur disque: un crash au démarrage reste diagnosticable
+                log_path = os.path.join(log_dir, f"worker_{run_id}_{i + 1}.log")
+                logf = open(log_path, 'w', encoding='utf-8')
+                worker_logs.append(logf)
+                workers.append(subprocess.Popen(
+                    [sys.executable or 'python', os.path.join(_ROOT_DIR, 'automation', 'worker.py'),
+                     '--run-id', run_id, '--worker-id', f"local-{os.getpid()}-{i + 1}"],
+                    stdout=logf, stderr=subprocess.STDOUT
+                ))
+            if workers:
+                logger.info(f"👷 {len(workers)} workers locaux démarrés (logs: {log_dir}/worker_{run_id}_*.log)")
+                self.results['worker_logs'] = [f.name for f in worker_logs]
+
+            reason = self._wait_distributed(queue, run_id, workers, time.monotonic() + budget)
+            if reason:
+                cancelled = queue.cancel(run_id, reason)
+                logger.error(f"❌ Run {run_id} interrompu: {reason} ({cancelled} jobs abandonnés)")
+        finally:
+            for process in workers:
+                if process.poll() is None:
+                    process.terminate()
+            for process in workers:
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            for logf in worker_logs:
+                logf.close()
+
+        for job in queue.jobs(run_id):
+            result = job['result'] or {'status': 'error', 'duration': 0}
+            if job['status'] != 'done':
+                result.setdefault('error', job['error'])
+            result['attempts'] = job['attempts']
+            self.results['categories'][job['payload']['category']][job['payload']['script']] = result
+        # Rapport dans l'ordre de configuration
+        for category in categories:
+            done_results = self.results['categories'][category]
+            self.results['categories'][category] = {s: done_results[s] for s in self.scripts_for(category) if s in done_results}
+
+    def _wait_distributed(self, queue, run_id, workers, deadline):
+        """Attend que le run n'ait plus de job en attente ni en cours.
+
+        Retourne None, ou la raison de l'abandon: échéance (time.monotonic) dépassée,
+        ou workers locaux tous arrêtés alors que des jobs attendent sans bail.
+        """
+        last_log = 0.0
+        while True:
+            queue.requeue_expired()
+            status = queue.run_status(run_id)
+            if status['pending'] == 0 and status['leased'] == 0:
+                return None
+            if time.monotonic() >= deadline:
+                return f"échéance dépassée ({status['pending']} en attente, {status['leased']} en cours)"
+            # Un job encore sous bail (worker externe, ou bail d'un worker mort pas encore expiré)
+            # peut aboutir ou revenir en file: on n'abandonne que lorsque plus rien n'avance
+            if workers and status['leased'] == 0 and all(p.poll() is not None for p in workers):
+                codes = ', '.join(str(p.returncode) for p in workers)
+                return f"workers locaux arrêtés (codes {codes}) avec {status['pending']} jobs en attente"
+            if time.monotonic() - last_log >= SCHEDULER_ETA_LOG_SECONDS:
+                last_log = time.monotonic()
+                logger.info(
+                    f"⏳ Run {run_id}: {status['done']} terminés, {status['failed']} en échec, "
+                    f"{status['leased']} en cours, {status['pending']} en attente"
+                )
+            time.sleep(5)
+
+    def run_all_scrapers(self, only=None, plan=None):
+        """Exécute tous les scrapers (ou seulement `only`, ex: scripts dus du plan adaptatif)"""
+        logger.info("🎯 === DÉMARRAGE DU SCRAPING HEBDOMADAIRE ===" if only is None else "🎯 === DÉMARRAGE DU SCRAPING ADAPTATIF ===")
         start_time = datetime.now()
+        # Logs par script, logs des workers et rapport du run
+        os.makedirs(log_dir, exist_ok=True)
         
+        self.history = RunHistory(log_dir)
         self.results = {
             'start_time': start_time.isoformat(),
             'categories': {}
         }
+        if plan is not None:
+            self.results['adaptive_plan'] = plan
+        self._only_scripts = set(only) if only is not None else None
         
         # Exécuter chaque catégorie (filtrable via env SCHEDULER_CATEGORIES)
-        categories_filter = os.getenv('SCHEDULER_CATEGORIES')
-        categories = list(self.scripts.keys())
-        if categories_filter:
-            wanted = {c.strip() for c in categories_filter.split(',') if c.strip()}
-            categories = [c for c in categories if c in wanted]
+        categories = [c for c in self.selected_categories() if self.scripts_for(c)]
         pause_between = int(os.getenv('SCHEDULER_PAUSE_BETWEEN_CATEGORIES_SECONDS', '5'))
-        for category in categories:
-            try:
-                category_results = self.run_category(category)
-                self.results['categories'][category] = category_results
-                # Pause entre les catégories
-                time.sleep(pause_between)
-            except Exception as e:
-                logger.error(f"❌ Erreur dans la catégorie {category}: {e}")
-                self.results['categories'][category] = {
-                    'error': str(e)
-                }
+        workers = int(os.getenv('SCHEDULER_PARALLEL_WORKERS', '1'))
+        self.results['parallel_workers'] = max(1, workers)
+        if not SCHEDULER_DISTRIBUTED:
+            self.start_browser_pool()
+        try:
+            if SCHEDULER_DISTRIBUTED:
+                self.run_distributed(categories)
+            elif workers > 1:
+                self.run_parallel(categories, workers)
+            else:
+                for category in categories:
+                    try:
+                        category_results = self.run_category(category)
+                        self.results['categories'][category] = category_results
+                        # Pause entre les catégories
+                        time.sleep(pause_between)
+                    except Exception as e:
+                        logger.error(f"❌ Erreur dans la catégorie {category}: {e}")
+                        self.results['categories'][category] = {
+                            'error': str(e)
+                        }
+        finally:
+            # Même sur exception / Ctrl+C: pas de Chrome du pool ni de connexion DB orphelins
+            self.close_db()
+            self.stop_browser_pool()
+            self._only_scripts = None
         
         end_time = datetime.now()
         total_duration = (end_time - start_time).total_seconds()
         
         self.results['end_time'] = end_time.isoformat()
         self.results['total_duration'] = total_duration
-        
+
         # Sauvegarder le rapport
         self.save_report()
         
@@ -517,6 +982,8 @@ class ScrapingScheduler:
         total_scripts = 0
         successful_scripts = 0
         failed_scripts = 0
+        blocked_requests = 0
+        blocked_bytes = 0
         
         logger.info("\n📈 === RÉSUMÉ DU SCRAPING ===")
         
@@ -527,10 +994,17 @@ class ScrapingScheduler:
                 total_scripts += 1
                 status = result.get('status', 'unknown')
                 duration = result.get('duration', 0)
+                # Requêtes bloquées par scraping/blocking.py (manifeste du script)
+                counts = (result.get('manifest') or {}).get('counts') or {}
+                blocked_requests += counts.get('blocked_requests', 0)
+                blocked_bytes += counts.get('blocked_bytes_estimated', 0)
                 
                 if status == 'success':
                     successful_scripts += 1
                     logger.info(f"  ✅ {script} - {duration:.0f}s")
+                    if result.get('regression'):
+                        slow = result['regression']
+                        logger.info(f"     🐢 x{slow['slowdown']} vs prévision ({slow['predicted_seconds']:.0f}s)")
                 else:
                     failed_scripts += 1
                     error = result.get('error', 'Unknown error')
@@ -538,7 +1012,32 @@ class ScrapingScheduler:
         
         logger.info(f"\n🎯 TOTAL: {successful_scripts}/{total_scripts} succès")
         logger.info(f"⏱️ Durée totale: {self.results.get('total_duration', 0)/60:.1f} minutes")
+        if blocked_requests:
+            logger.info(f"🚫 Requêtes bloquées: {blocked_requests} (~{blocked_bytes / 1024 / 1024:.1f} Mo évités)")
     
+    def run_due_scrapers(self):
+        """Exécute les scripts dont l'échéance adaptative (churn / budget) est atteinte"""
+        history = RunHistory(log_dir)
+        scripts = [s for c in self.selected_categories() for s in self.scripts_for(c)]
+        plan = plan_cadences(scripts, history, self.script_timeouts)
+        due = [s for s in scripts if plan[s]['due']]
+        if not due:
+            logger.info("😴 Aucun script dû aujourd'hui")
+            return
+        self.run_all_scrapers(only=due, plan=plan)
+
+    def schedule_adaptive_run(self):
+        """Déclenchement quotidien: seuls les scripts dus selon leur cadence adaptative s'exécutent"""
+        run_at = os.getenv('SCHEDULER_RUN_AT', '02:00')
+        schedule.every().day.at(run_at).do(self.run_due_scrapers)
+
+        logger.info(f"📅 Scraping adaptatif programmé chaque jour à {run_at} (cadence par script selon le churn)")
+        logger.info("⏰ En attente du prochain déclenchement...")
+
+        while True:
+            schedule.run_pending()
+            time.sleep(60)  # Vérifier chaque minute
+
     def schedule_weekly_run(self):
         """Programme l'exécution hebdomadaire"""
         # Programmer pour chaque dimanche à 2h du matin
@@ -553,13 +1052,19 @@ class ScrapingScheduler:
 
 def run_manual_scraping():
     """Exécution manuelle pour test"""
+    configure_logging()
     scheduler = ScrapingScheduler()
     scheduler.run_all_scrapers()
 
 def start_scheduler():
     """Démarrer le scheduler automatique"""
+    configure_logging()
     scheduler = ScrapingScheduler()
-    scheduler.schedule_weekly_run()
+    # SCHEDULER_MODE=adaptive: cadence par script selon le churn, à budget d'heures constant
+    if os.getenv('SCHEDULER_MODE', 'weekly').strip().lower() == 'adaptive':
+        scheduler.schedule_adaptive_run()
+    else:
+        scheduler.schedule_weekly_run()
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,120 @@
+"""
+Worker du scheduler distribué: prend des jobs dans la file partagée et exécute les scripts.
+
+Chaque worker lance les scripts comme le scheduler local (run_script: timeout
+appris, post-traitement, upload DB, reprise depuis le journal) et prolonge son
+bail par des heartbeats pendant l'exécution. Plusieurs workers peuvent tourner
+sur des hôtes différents tant qu'ils partagent la file (JOB_QUEUE_URL).
+
+Usage:
+    python automation/worker.py                      # boucle infinie
+    python automation/worker.py --run-id 20250101_020000 --exit-when-idle
+"""
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+from automation.job_queue import JOB_HEARTBEAT_SECONDS, get_job_queue
+from automation.run_history import RunHistory
+from automation.scheduler import ScrapingScheduler, configure_logging, log_dir
+
+logger = logging.getLogger(__name__)
+
+# Attente (s) entre deux tentatives de prise de job quand la file est vide
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '5'))
+
+
+class Worker:
+    def __init__(self, queue=None, worker_id=None, run_id=None):
+        self.queue = queue or get_job_queue()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.run_id = run_id
+        self.scheduler = ScrapingScheduler()
+        self.domain_cap = max(1, int(os.getenv('SCHEDULER_DOMAIN_CONCURRENCY', '1')))
+        self.processed = 0
+
+    def run(self, exit_when_idle=False):
+        """Boucle principale; avec exit_when_idle, s'arrête quand le run n'a plus de job en attente ni en cours."""
+        configure_logging()
+        logger.info(f"👷 Worker {self.worker_id} démarré (run {self.run_id or 'tous'})")
+        self.scheduler.history = RunHistory(log_dir)
+        self.scheduler.start_browser_pool()
+        try:
+            while True:
+                job = self.queue.lease(self.worker_id, run_id=self.run_id, domain_cap=self.domain_cap)
+                if job is None:
+                    if exit_when_idle and self._idle():
+                        break
+                    time.sleep(JOB_POLL_SECONDS)
+                    continue
+                self.process(job)
+        finally:
+            self.scheduler.close_db()
+            self.scheduler.stop_browser_pool()
+            logger.info(f"👋 Worker {self.worker_id} arrêté ({self.processed} jobs)")
+
+    def _idle(self):
+        if not self.run_id:
+            return True
+        # Un job en cours ailleurs peut encore revenir en file (échec, bail expiré)
+        status = self.queue.run_status(self.run_id)
+        return status['pending'] == 0 and status['leased'] == 0
+
+    def process(self, job):
+        script = job['payload']['script']
+        logger.info(f"📥 Job {job['id']}: {script} (tentative {job['attempts']}/{job['max_attempts']})")
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def beat():
+            while not stop.wait(JOB_HEARTBEAT_SECONDS):
+                if not self.queue.heartbeat(job['id'], self.worker_id):
+                    lost.set()
+                    logger.warning(f"⚠️ Bail perdu pour le job {job['id']} ({script}), résultat ignoré")
+                    return
+
+        heartbeat = threading.Thread(target=beat, name=f"heartbeat-{job['id']}", daemon=True)
+        heartbeat.start()
+        try:
+            # Relance d'un job (bail expiré / échec ailleurs): reprise depuis le journal s'il existe
+            result = self.scheduler.run_script(script, resume=job['attempts'] > 1)
+        except Exception as e:
+            logger.error(f"❌ Job {job['id']} ({script}): {e}")
+            result = {'status': 'exception', 'duration': 0, 'error': str(e)}
+        finally:
+            stop.set()
+            heartbeat.join()
+        self.processed += 1
+        result['worker'] = self.worker_id
+        result['attempt'] = job['attempts']
+        if lost.is_set():
+            return
+        if result.get('status') == 'success':
+            self.queue.complete(job['id'], self.worker_id, result)
+        else:
+            # not_found: inutile de réessayer
+            self.queue.fail(job['id'], self.worker_id, result.get('error') or result.get('status'),
+                            retry=result.get('status') != 'not_found', result=result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker du scheduler distribué")
+    parser.add_argument('--worker-id', help="Identifiant (défaut: hôte-pid)")
+    parser.add_argument('--run-id', help="Ne traiter que les jobs de ce run")
+    parser.add_argument('--queue-url', help="File de jobs (défaut: JOB_QUEUE_URL)")
+    parser.add_argument('--exit-when-idle', action='store_true', help="S'arrêter quand la file est vide")
+    args = parser.parse_args()
+    Worker(get_job_queue(args.queue_url), args.worker_id, args.run_id).run(exit_when_idle=args.exit_when_idle)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
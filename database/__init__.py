@@ -1,3 +1,3 @@
 # Marks 'database' as a package for import resolution.
 # Expose common items for convenience if needed.
-# from .mysql_connector import save_to_database  # noqa: F401
+# from .save import save_to_database  # noqa: F401
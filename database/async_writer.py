@@ -0,0 +1,153 @@
+"""
+Écriture DB en arrière-plan pendant le scraping.
+
+Les producteurs (scrapers, ai_processing) poussent leurs produits dans une file
+bornée; un thread dédié les regroupe et les upserte par lots (taille atteinte ou
+délai écoulé). Le temps DB se cache ainsi derrière les chargements de pages, et
+un run interrompu (timeout du scheduler) conserve les lignes déjà flushées.
+
+Sous le scheduler, les lignes flushées sont la version brute du scraper: la sortie
+nettoyée (Gemini, SKU remonté) est upsertée en fin de run et les écrase (même lien,
+content_hash différent → mise à jour + historique du delta). Contrepartie: un
+produit nettoyé passe par deux écritures et product_history garde le delta
+brut → nettoyé; en échange, un run tué au timeout a déjà persisté ses lignes.
+
+Usage:
+    with AsyncDBWriter('serveurs', brand='HP') as writer:
+        for product in scrape():
+            writer.put(product)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Activation côté scrapers (en plus de ENABLE_DB)
+DB_STREAM_WRITES = os.getenv('DB_STREAM_WRITES', 'false').lower() == 'true'
+DB_WRITER_BATCH_SIZE = int(os.getenv('DB_WRITER_BATCH_SIZE', '200'))
+DB_WRITER_FLUSH_SECONDS = float(os.getenv('DB_WRITER_FLUSH_SECONDS', '5'))
+# File bornée: un producteur trop rapide est freiné plutôt que de gonfler la mémoire
+DB_WRITER_QUEUE_SIZE = int(os.getenv('DB_WRITER_QUEUE_SIZE', '2000'))
+
+_STOP = object()
+
+
+class AsyncDBWriter:
+    """File bornée + thread écrivain qui upserte par lots via le connecteur configuré."""
+
+    def __init__(self, table_name, brand=None, batch_size=None, flush_seconds=None, queue_size=None):
+        self.table_name = table_name
+        self.brand = brand
+        self.batch_size = max(1, batch_size or DB_WRITER_BATCH_SIZE)
+        self.flush_seconds = flush_seconds if flush_seconds is not None else DB_WRITER_FLUSH_SECONDS
+        self._queue = queue.Queue(maxsize=queue_size or DB_WRITER_QUEUE_SIZE)
+        self._thread = None
+        self._closed = False
+        self.error = None
+        self.stats = {'new': 0, 'changed': 0, 'unchanged': 0, 'batches': 0, 'failed': 0, 'db_seconds': 0.0}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"db-writer-{self.table_name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def put(self, product, timeout=None):
+        """Ajoute un produit (bloque si la file est pleine)."""
+        if self._closed:
+            raise RuntimeError("AsyncDBWriter fermé")
+        if self.brand and not product.get('brand'):
+            product = dict(product, brand=self.brand)
+        self._queue.put(product, timeout=timeout)
+
+    def put_many(self, products, timeout=None):
+        for product in products:
+            self.put(product, timeout=timeout)
+
+    def close(self, timeout=None):
+        """Vide la file, attend le dernier flush et retourne les statistiques."""
+        if not self._closed:
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join(timeout)
+        return self.stats
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _run(self):
+        # Import local: le connecteur (et sa connexion SQLite) appartient à ce thread
+        from database.common import get_connector
+
+        db = get_connector()
+        try:
+            if not db.connect():
+                raise RuntimeError("connexion impossible")
+            if not db.create_tables():
+                raise RuntimeError("schéma incomplet (migrations en échec)")
+        except Exception as e:
+            self.error = e
+            logger.error(f"❌ Écrivain DB {self.table_name}: {e} — les produits poussés seront ignorés")
+            db = None
+
+        pending = []
+        deadline = time.monotonic() + self.flush_seconds
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    break
+                if item is not None:
+                    pending.append(item)
+                if len(pending) >= self.batch_size or (pending and time.monotonic() >= deadline):
+                    self._flush(db, pending)
+                    pending = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_seconds
+            if pending:
+                self._flush(db, pending)
+        finally:
+            if db is not None:
+                db.close()
+            s = self.stats
+            logger.info(
+                f"✅ Écrivain DB {self.table_name}: {s['batches']} lots, {s['new']} nouveaux, "
+                f"{s['changed']} modifiés, {s['unchanged']} inchangés, {s['failed']} en échec "
+                f"({s['db_seconds']:.1f}s DB)"
+            )
+
+    def _flush(self, db, batch):
+        if db is None:
+            self.stats['failed'] += len(batch)
+            return
+        t0 = time.perf_counter()
+        try:
+            db.insert_products(batch, self.table_name)
+            for key in ('new', 'changed', 'unchanged'):
+                self.stats[key] += db.last_upsert_stats[key]
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['failed'] += len(batch)
+            logger.error(f"❌ Écrivain DB {self.table_name}: lot de {len(batch)} produits en échec: {e}")
+        finally:
+            self.stats['db_seconds'] += time.perf_counter() - t0
+
+
+def open_stream_writer(table_name, brand=None):
+    """Retourne un écrivain démarré si ENABLE_DB et DB_STREAM_WRITES sont actifs, sinon None."""
+    if not (DB_STREAM_WRITES and os.getenv('ENABLE_DB', 'false').lower() == 'true'):
+        return None
+    return AsyncDBWriter(table_name, brand=brand).start()
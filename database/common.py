@@ -0,0 +1,212 @@
+"""
+Éléments communs aux backends de persistance (MySQL, SQLite), sans dépendance à un pilote.
+
+Réglages d'écriture/lecture, colonnes produit, construction des lignes d'upsert,
+content_hash et classement nouveaux/modifiés/inchangés, deltas de tech_specs,
+politique des colonnes générées, et get_connector (choix du backend).
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from ai_processing.policies import FIELD_POLICY
+from database.config import DB_BACKEND
+
+# Taille des lots pour l'upsert multi-lignes (0 = chemin historique ligne par ligne)
+DB_UPSERT_BATCH_SIZE = int(os.getenv('DB_UPSERT_BATCH_SIZE', '500'))
+# Lots de clés (IN (...), table temporaire de désactivation, lectures d'historique)
+DEACTIVATE_STAGING_CHUNK = 1000
+# Historisation des deltas de tech_specs dans product_history
+DB_PRODUCT_HISTORY = os.getenv('DB_PRODUCT_HISTORY', 'true').strip().lower() in {'1', 'true', 'yes', 'on'}
+# Taille de page du parcours en flux iter_products
+DB_PAGE_SIZE = int(os.getenv('DB_PAGE_SIZE', '1000'))
+
+PRODUCT_TABLES = ('serveurs', 'stockage', 'imprimantes_scanners')
+
+# Colonnes écrites par l'upsert (ordre de _product_row), hors description
+PRODUCT_COLUMNS = (
+    'brand', 'link', 'name', 'sku', 'link_hash', 'tech_specs', 'scraped_at',
+    'datasheet_link', 'image_url', 'ai_processed', 'ai_processed_at', 'is_active', 'content_hash',
+)
+_COL = {name: idx for idx, name in enumerate(PRODUCT_COLUMNS)}
+
+# Types de colonnes générées sur tech_specs (le type SQL dépend du backend)
+SPEC_COLUMN_KINDS = ('num', 'text')
+
+
+def _link_hash(link_val):
+    """SHA-256 hexadécimal du lien produit (None si lien vide)."""
+    return hashlib.sha256(link_val.encode('utf-8')).hexdigest() if link_val else None
+
+
+def _to_str(val):
+    """Normalise les champs potentiellement non-scalaires vers des chaînes."""
+    if isinstance(val, list):
+        # prendre le premier élément chaîne non vide
+        for x in val:
+            if isinstance(x, str) and x.strip():
+                return x.strip()
+        return ''
+    if isinstance(val, (int, float)):
+        return str(val)
+    if isinstance(val, str):
+        return val
+    # objets/dicts non supportés pour TEXT → json.dumps compact
+    try:
+        return json.dumps(val, ensure_ascii=False)
+    except Exception:
+        return ''
+
+def indexed_spec_keys(table_name):
+    """Clés tech_specs exposées en colonnes générées indexées pour cette table: {clé: 'num' | 'text'}."""
+    policy = FIELD_POLICY.get(table_name, {})
+    allowed = set(policy.get('allowed', []))
+    return {k: kind for k, kind in policy.get('indexed', {}).items() if k in allowed and kind in SPEC_COLUMN_KINDS}
+
+
+def spec_column_name(key):
+    return f"spec_{key}"
+
+
+def _content_hash(values, tech_specs):
+    """Empreinte du produit normalisé, hors champs propres au run (scraped_at, is_active)."""
+    payload = [
+        values[_COL['brand']], values[_COL['link']], values[_COL['name']], values[_COL['sku']],
+        tech_specs, values[_COL['datasheet_link']], values[_COL['image_url']],
+        values[_COL['ai_processed']], values[_COL['ai_processed_at']],
+    ]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+
+def _known_rows(cursor, table_name, rows, in_list):
+    """(id, brand, sku, link_hash, content_hash) des produits en base qui correspondent au lot.
+
+    Lecture limitée aux clés du lot, (brand, sku) puis (brand, link_hash), par
+    paquets de DEACTIVATE_STAGING_CHUNK: le coût suit la taille du lot et non
+    celle de la marque (l'écrivain en flux envoie beaucoup de petits lots).
+    in_list(n): liste SQL de n couples de paramètres (syntaxe du backend).
+    """
+    sku_keys = sorted({(v[_COL['brand']], v[_COL['sku']]) for v in rows if v[_COL['sku']]})
+    link_keys = sorted({(v[_COL['brand']], v[_COL['link_hash']]) for v in rows if v[_COL['link_hash']]})
+    known = {}
+    for column, keys in (('sku', sku_keys), ('link_hash', link_keys)):
+        for start in range(0, len(keys), DEACTIVATE_STAGING_CHUNK):
+            chunk = keys[start:start + DEACTIVATE_STAGING_CHUNK]
+            # Une requête par clé unique (plutôt qu'un OR): chacune reste un accès par index
+            cursor.execute(
+                f"SELECT id, brand, sku, link_hash, content_hash FROM {table_name} "
+                f"WHERE (brand, {column}) IN {in_list(len(chunk))}",
+                tuple(value for key in chunk for value in key)
+            )
+            for row in cursor.fetchall():
+                known[row[0]] = tuple(row)
+    return list(known.values())
+
+
+def _classify_rows(rows, known_rows):
+    """Classe les lignes d'upsert en nouvelles / modifiées / inchangées d'après les content_hash en base.
+
+    known_rows: (id, brand, sku, link_hash, content_hash) des produits existants.
+    Retourne (stats, lignes à écrire, ids inchangés, [(id, lignes modifiées)]).
+    """
+    known = {}
+    for row_id, brand, sku, link_hash, content_hash in known_rows:
+        if sku:
+            known[(brand, 'sku', sku)] = (row_id, content_hash)
+        if link_hash:
+            known[(brand, 'lh', link_hash)] = (row_id, content_hash)
+    stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+    to_write = []
+    unchanged_ids = []
+    changed = []
+    for values in rows:
+        brand, sku, link_hash = values[_COL['brand']], values[_COL['sku']], values[_COL['link_hash']]
+        match = (sku and known.get((brand, 'sku', sku))) or known.get((brand, 'lh', link_hash))
+        if not match:
+            stats['new'] += 1
+            to_write.append(values)
+        elif match[1] == values[_COL['content_hash']]:
+            stats['unchanged'] += 1
+            unchanged_ids.append(match[0])
+        else:
+            stats['changed'] += 1
+            to_write.append(values)
+            changed.append((match[0], values))
+    return stats, to_write, unchanged_ids, changed
+
+
+def _load_specs(raw):
+    """tech_specs tel que renvoyé par la base (dict, str/bytes JSON) → dict."""
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode('utf-8')
+    try:
+        specs = json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+    return specs if isinstance(specs, dict) else {}
+
+
+def spec_delta(old, new):
+    """Delta par clé entre deux versions de tech_specs (None si identiques).
+
+    Format: {"added": {k: nouveau}, "removed": {k: ancien}, "changed": {k: [ancien, nouveau]}},
+    réversible dans les deux sens.
+    """
+    delta = {
+        'added': {k: v for k, v in new.items() if k not in old},
+        'removed': {k: v for k, v in old.items() if k not in new},
+        'changed': {k: [old[k], v] for k, v in new.items() if k in old and old[k] != v},
+    }
+    delta = {part: keys for part, keys in delta.items() if keys}
+    return delta or None
+
+
+def revert_delta(specs, delta):
+    """Annule un delta: version suivante → version précédente."""
+    previous = dict(specs)
+    for k in delta.get('added', {}):
+        previous.pop(k, None)
+    previous.update(delta.get('removed', {}))
+    for k, (old, _new) in delta.get('changed', {}).items():
+        previous[k] = old
+    return previous
+
+
+def _product_row(product, has_description):
+    """Construit le tuple de valeurs d'upsert pour un produit (ordre de PRODUCT_COLUMNS)."""
+    # No description: we drop any description and never persist marketing text
+    ts = product.get('tech_specs', {})
+    if isinstance(ts, str):
+        # Coerce to empty JSON object if AI produced a string
+        ts = {}
+    link_val = product.get('link', '') or ''
+    values = (
+        product.get('brand', ''),
+        link_val,
+        product.get('name', ''),
+        product.get('sku'),
+        _link_hash(link_val),
+        json.dumps(ts, ensure_ascii=False),
+        product.get('scraped_at', datetime.now().isoformat()),
+        _to_str(product.get('datasheet_link')),
+        _to_str(product.get('image_url', '')),
+        1 if product.get('ai_processed') else 0,
+        product.get('ai_processed_at'),
+        1,
+    )
+    values += (_content_hash(values, ts),)
+    if has_description:
+        values += (None,)
+    return values
+
+
+def get_connector(backend=None):
+    """Connecteur du backend configuré (DB_BACKEND: 'mysql' par défaut, ou 'sqlite')."""
+    if (backend or DB_BACKEND) == 'sqlite':
+        from database.sqlite_connector import SQLiteConnector
+        return SQLiteConnector()
+    from database.mysql_connector import MySQLConnector
+    return MySQLConnector()
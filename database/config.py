@@ -1,5 +1,6 @@
 # Configuration de la base de données MySQL
 # Modifiez ces paramètres selon votre installation MySQL
+import os
 
 DB_CONFIG = {
     'host': 'localhost',
@@ -30,3 +31,12 @@ DB_CONFIG_NO_DB = {
     'port': 3306,
     'charset': 'utf8mb4'
 }
+
+# Backend de persistance: 'mysql' (défaut) ou 'sqlite' (fichier local, sans serveur MySQL)
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').strip().lower()
+
+# Configuration SQLite (DB_BACKEND=sqlite)
+SQLITE_CONFIG = {
+    'path': os.getenv('SQLITE_PATH', 'scraping.db'),
+    'timeout': 30,
+}
@@ -1,26 +1,33 @@
 #!/usr/bin/env python3
 r"""
-db_cli.py — Petit outil console pour parcourir la base MySQL
+db_cli.py — Petit outil console pour parcourir la base (MySQL, ou SQLite si DB_BACKEND=sqlite)
 
 Fonctionnalités clés:
-- test: vérifie la connexion MySQL
-- list: liste des produits d'une table, filtrable par marque
+- test: vérifie la connexion à la base
+- list: liste des produits d'une table, filtrable par marque et par specs indexées (--min/--max/--eq)
 - brands: récapitulatif des marques par table
-- export: exporte une sélection vers un fichier JSON
+- export: exporte une sélection en flux vers JSON/NDJSON (gzip/zstd), ou les trois tables en parallèle
+- history: versions historisées des tech_specs d'un produit (reconstruction à une date)
 
 Exemples PowerShell:
 	python -m database.db_cli test
 	python -m database.db_cli list --table serveurs --brand HP --limit 5
+	python -m database.db_cli list --table serveurs --min ram_max_gb=2048
+	python -m database.db_cli list --table stockage --min max_capacity_tb=100 --max max_capacity_tb=500
 	python -m database.db_cli brands --table serveurs
 	python -m database.db_cli export --table serveurs --brand HP --out hp_serveurs.json
+	python -m database.db_cli export --all-tables --format ndjson --compress gzip
+	python -m database.db_cli history --table serveurs --id 42 --at 2025-06-01
 """
 
 import argparse
+import gzip
+import io
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
-
-import mysql.connector
+from typing import List, Optional, Tuple
 
 import os
 import sys
@@ -32,65 +39,50 @@ _ROOT_DIR = os.path.abspath(os.path.join(_CURR_DIR, os.pardir))
 if _ROOT_DIR not in sys.path:
 		sys.path.insert(0, _ROOT_DIR)
 
-from database.config import DB_CONFIG
+from database.config import DB_BACKEND
+from database.common import get_connector, indexed_spec_keys, revert_delta, spec_column_name
 
 
 VALID_TABLES = {"serveurs", "stockage", "imprimantes_scanners"}
-
-
-def _connect():
-	cn = mysql.connector.connect(**DB_CONFIG)
-	return cn
+_COMPRESS_SUFFIX = {"none": "", "gzip": ".gz", "zstd": ".zst"}
 
 
 def cmd_test() -> int:
+	db = get_connector()
 	try:
-		cn = _connect()
-		cn.close()
-		print(f"✅ Connexion MySQL OK (db={DB_CONFIG.get('database')})")
+		if not db.connect():
+			print(f"❌ Connexion {DB_BACKEND} échouée")
+			return 1
+		print(f"✅ Connexion {DB_BACKEND} OK ({db.describe()})")
 		return 0
 	except Exception as e:
-		print(f"❌ Connexion MySQL échouée: {e}")
+		print(f"❌ Connexion {DB_BACKEND} échouée: {e}")
 		return 1
+	finally:
+		db.close()
+
 
+def _spec_filters(table: str, mins: List[str], maxs: List[str], eqs: List[str]) -> List[Tuple[str, str, str]]:
+	"""Convertit les options --min/--max/--eq clé=valeur en conditions sur les colonnes générées indexées."""
+	indexed = indexed_spec_keys(table)
+	filters = []
+	for op, specs in ((">=", mins), ("<=", maxs), ("=", eqs)):
+		for spec in specs or []:
+			key, sep, value = spec.partition("=")
+			key = key.strip()
+			if not sep or key not in indexed:
+				raise ValueError(f"Filtre invalide '{spec}' (clés indexées pour {table}: {sorted(indexed)})")
+			filters.append((spec_column_name(key), op, value.strip()))
+	return filters
 
-def cmd_list(table: str, brand: Optional[str], limit: int) -> int:
+
+def cmd_list(table: str, brand: Optional[str], limit: int, filters: Optional[List[Tuple[str, str, str]]] = None) -> int:
 	if table not in VALID_TABLES:
 		print(f"❌ Table invalide: {table}. Choisir parmi {sorted(VALID_TABLES)}")
 		return 2
+	db = get_connector()
 	try:
-		cn = _connect()
-		cur = cn.cursor(dictionary=True)
-		if brand:
-			cur.execute(
-				f"""
-				SELECT id, brand, name, sku,
-					   JSON_LENGTH(tech_specs) AS spec_keys,
-					   is_active, DATE_FORMAT(scraped_at, '%Y-%m-%d %H:%i') AS scraped_at,
-					   LEFT(link, 128) AS link
-				FROM {table}
-				WHERE brand = %s
-				ORDER BY id DESC
-				LIMIT %s
-				""",
-				(brand, limit),
-			)
-		else:
-			cur.execute(
-				f"""
-				SELECT id, brand, name, sku,
-					   JSON_LENGTH(tech_specs) AS spec_keys,
-					   is_active, DATE_FORMAT(scraped_at, '%Y-%m-%d %H:%i') AS scraped_at,
-					   LEFT(link, 128) AS link
-				FROM {table}
-				ORDER BY id DESC
-				LIMIT %s
-				""",
-				(limit,),
-			)
-		rows = cur.fetchall()
-		cur.close()
-		cn.close()
+		rows = db.list_products(table, brand=brand, limit=limit, filters=filters)
 		if not rows:
 			print("(aucun résultat)")
 			return 0
@@ -99,21 +91,17 @@ def cmd_list(table: str, brand: Optional[str], limit: int) -> int:
 	except Exception as e:
 		print(f"❌ Erreur list: {e}")
 		return 1
+	finally:
+		db.close()
 
 
 def cmd_brands(table: str) -> int:
 	if table not in VALID_TABLES:
 		print(f"❌ Table invalide: {table}. Choisir parmi {sorted(VALID_TABLES)}")
 		return 2
+	db = get_connector()
 	try:
-		cn = _connect()
-		cur = cn.cursor()
-		cur.execute(
-			f"SELECT brand, COUNT(*) AS cnt FROM {table} GROUP BY brand ORDER BY cnt DESC, brand ASC"
-		)
-		rows = cur.fetchall()
-		cur.close()
-		cn.close()
+		rows = db.brand_counts(table)
 		for brand, cnt in rows:
 			print(f"{brand}: {cnt}")
 		if not rows:
@@ -122,60 +110,146 @@ def cmd_brands(table: str) -> int:
 	except Exception as e:
 		print(f"❌ Erreur brands: {e}")
 		return 1
-
-
-def cmd_export(table: str, brand: Optional[str], out: str) -> int:
+	finally:
+		db.close()
+
+
+def _open_export(path: str, compress: str):
+	"""Ouvre le fichier d'export en texte, compressé à la volée si demandé."""
+	if compress == "gzip":
+		return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+	if compress == "zstd":
+		try:
+			import zstandard
+		except ImportError:
+			raise RuntimeError("compression zstd indisponible: pip install zstandard")
+		raw = open(path, "wb")
+		return io.TextIOWrapper(zstandard.ZstdCompressor(level=3).stream_writer(raw), encoding="utf-8")
+	return open(path, "w", encoding="utf-8")
+
+
+def _row_json(row: dict) -> str:
+	"""Sérialise une ligne en réutilisant tel quel le texte JSON brut de tech_specs (pas de décodage)."""
+	if row.get("tech_specs") is None:
+		return json.dumps(row, ensure_ascii=False, default=str)
+	specs = row.pop("tech_specs")
+	line = json.dumps(row, ensure_ascii=False, default=str)
+	if isinstance(specs, (bytes, bytearray)):
+		specs = specs.decode("utf-8")
+	return f'{line[:-1]}, "tech_specs": {specs}}}' if row else f'{{"tech_specs": {specs}}}'
+
+
+def cmd_export(table: str, brand: Optional[str], out: str, fmt: str = "json", compress: str = "none") -> int:
 	if table not in VALID_TABLES:
 		print(f"❌ Table invalide: {table}. Choisir parmi {sorted(VALID_TABLES)}")
 		return 2
+	db = get_connector()
 	try:
-		cn = _connect()
-		cur = cn.cursor(dictionary=True)
-		if brand:
-			cur.execute(
-				f"SELECT * FROM {table} WHERE brand = %s ORDER BY id DESC",
-				(brand,),
-			)
-		else:
-			cur.execute(f"SELECT * FROM {table} ORDER BY id DESC")
-		rows = cur.fetchall()
-		cur.close()
-		cn.close()
-		# Convertir JSON string -> dict pour tech_specs
-		for r in rows:
-			ts = r.get("tech_specs")
-			if isinstance(ts, str):
-				try:
-					r["tech_specs"] = json.loads(ts)
-				except Exception:
-					r["tech_specs"] = {}
-		with open(out, "w", encoding="utf-8") as f:
-			json.dump(rows, f, ensure_ascii=False, indent=2)
-		print(f"✅ Exporté {len(rows)} lignes → {out}")
+		if not db.connect():
+			print(f"❌ Connexion {DB_BACKEND} échouée")
+			return 1
+		# Projection sans les colonnes générées spec_* (dérivées de tech_specs)
+		columns = sorted(c for c in db.table_columns(table) if not c.startswith("spec_"))
+		count = 0
+		t0 = time.perf_counter()
+		with _open_export(out, compress) as f:
+			if fmt == "json":
+				f.write("[\n")
+			for row in db.iter_products(table, brand=brand, columns=columns, decode_specs=False):
+				if fmt == "json" and count:
+					f.write(",\n")
+				f.write(_row_json(row))
+				if fmt == "ndjson":
+					f.write("\n")
+				count += 1
+			if fmt == "json":
+				f.write("\n]\n")
+		elapsed = time.perf_counter() - t0
+		rate = count / elapsed if elapsed > 0 else 0
+		print(f"✅ Exporté {count} lignes → {out} ({elapsed:.1f}s, {rate:.0f} lignes/s)")
 		return 0
 	except Exception as e:
 		print(f"❌ Erreur export: {e}")
 		return 1
+	finally:
+		db.close()
+
+
+def cmd_export_all(prefix: str, brand: Optional[str], fmt: str, compress: str) -> int:
+	"""Exporte les trois tables en parallèle, un fichier par table."""
+	suffix = fmt + _COMPRESS_SUFFIX[compress]
+	t0 = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=len(VALID_TABLES)) as pool:
+		futures = {
+			table: pool.submit(cmd_export, table, brand, f"{prefix}_{table}.{suffix}", fmt, compress)
+			for table in sorted(VALID_TABLES)
+		}
+		codes = {table: fut.result() for table, fut in futures.items()}
+	print(f"⏱️ Export parallèle terminé en {time.perf_counter() - t0:.1f}s")
+	return max(codes.values())
+
+
+def cmd_history(table: str, product_id: int, at: Optional[str]) -> int:
+	"""Liste les versions de tech_specs d'un produit, ou reconstruit celle en vigueur à une date."""
+	if table not in VALID_TABLES:
+		print(f"❌ Table invalide: {table}. Choisir parmi {sorted(VALID_TABLES)}")
+		return 2
+	db = get_connector()
+	try:
+		specs, deltas = db.product_history(table, product_id)
+		if specs is None:
+			print(f"(produit {product_id} introuvable dans {table})")
+			return 1
+		if not at:
+			print(f"Version courante: {len(specs)} clés, {len(deltas)} modifications historisées")
+			for hid, changed_at, delta in deltas:
+				parts = ", ".join(f"{part}={sorted(keys)}" for part, keys in delta.items())
+				print(f"  #{hid} {changed_at:%Y-%m-%d %H:%M} {parts}")
+			return 0
+		target = datetime.fromisoformat(at)
+		# Remonter le temps: annuler les deltas postérieurs à la date demandée
+		for _hid, changed_at, delta in deltas:
+			if changed_at <= target:
+				break
+			specs = revert_delta(specs, delta)
+		print(json.dumps(specs, indent=2, ensure_ascii=False))
+		return 0
+	except Exception as e:
+		print(f"❌ Erreur history: {e}")
+		return 1
+	finally:
+		db.close()
 
 
 def build_parser():
-	p = argparse.ArgumentParser(description="CLI MySQL pour parcourir la base de scraping")
+	p = argparse.ArgumentParser(description="CLI pour parcourir la base de scraping (MySQL ou SQLite)")
 	sub = p.add_subparsers(dest="cmd", required=True)
 
-	sub.add_parser("test", help="Vérifier la connexion MySQL")
+	sub.add_parser("test", help="Vérifier la connexion à la base")
 
 	p_list = sub.add_parser("list", help="Lister des produits")
 	p_list.add_argument("--table", required=True, choices=sorted(VALID_TABLES))
 	p_list.add_argument("--brand", required=False)
 	p_list.add_argument("--limit", type=int, default=10)
+	p_list.add_argument("--min", action="append", metavar="CLE=VALEUR", help="tech_specs indexé >= valeur (ex: ram_max_gb=2048)")
+	p_list.add_argument("--max", action="append", metavar="CLE=VALEUR", help="tech_specs indexé <= valeur")
+	p_list.add_argument("--eq", action="append", metavar="CLE=VALEUR", help="tech_specs indexé = valeur (ex: form_factor=2U)")
 
 	p_brands = sub.add_parser("brands", help="Lister les marques et leurs volumes")
 	p_brands.add_argument("--table", required=True, choices=sorted(VALID_TABLES))
 
-	p_export = sub.add_parser("export", help="Exporter vers un JSON")
-	p_export.add_argument("--table", required=True, choices=sorted(VALID_TABLES))
+	p_export = sub.add_parser("export", help="Exporter vers un JSON / NDJSON (en flux, compression optionnelle)")
+	p_export.add_argument("--table", required=False, choices=sorted(VALID_TABLES))
+	p_export.add_argument("--all-tables", action="store_true", help="Exporter les trois tables en parallèle (--out = préfixe)")
 	p_export.add_argument("--brand", required=False)
 	p_export.add_argument("--out", required=False, default=None)
+	p_export.add_argument("--format", choices=["json", "ndjson"], default="json")
+	p_export.add_argument("--compress", choices=sorted(_COMPRESS_SUFFIX), default="none")
+
+	p_history = sub.add_parser("history", help="Historique des tech_specs d'un produit")
+	p_history.add_argument("--table", required=True, choices=sorted(VALID_TABLES))
+	p_history.add_argument("--id", type=int, required=True, help="id du produit")
+	p_history.add_argument("--at", required=False, help="Date ISO (ex: 2025-06-01) de la version à reconstruire")
 
 	return p
 
@@ -187,12 +261,27 @@ def main():
 	if args.cmd == "test":
 		return cmd_test()
 	if args.cmd == "list":
-		return cmd_list(args.table, args.brand, args.limit)
+		try:
+			filters = _spec_filters(args.table, args.min, args.max, args.eq)
+		except ValueError as e:
+			print(f"❌ {e}")
+			return 2
+		return cmd_list(args.table, args.brand, args.limit, filters)
 	if args.cmd == "brands":
 		return cmd_brands(args.table)
 	if args.cmd == "export":
-		out = args.out or f"export_{args.table}_{(args.brand or 'all').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-		return cmd_export(args.table, args.brand, out)
+		stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+		if args.all_tables:
+			prefix = args.out or f"export_{(args.brand or 'all').lower()}_{stamp}"
+			return cmd_export_all(prefix, args.brand, args.format, args.compress)
+		if not args.table:
+			print("❌ --table requis (ou --all-tables)")
+			return 2
+		suffix = args.format + _COMPRESS_SUFFIX[args.compress]
+		out = args.out or f"export_{args.table}_{(args.brand or 'all').lower()}_{stamp}.{suffix}"
+		return cmd_export(args.table, args.brand, out, args.format, args.compress)
+	if args.cmd == "history":
+		return cmd_history(args.table, args.id, args.at)
 	return 0
 
 
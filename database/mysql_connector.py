@@ -1,15 +1,15 @@
-import mysql.connector
 from mysql.connector import Error
 import json
 import logging
-from datetime import datetime
 import os
-import hashlib
+import tempfile
+import time
 
 # Importer la configuration
 try:
-    from database.config import DB_CONFIG, DB_CONFIG_NO_DB
+    from database.config import DB_BACKEND, DB_CONFIG, DB_CONFIG_NO_DB
 except ImportError:
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').strip().lower()
     # Configuration par défaut si le fichier config n'existe pas
     DB_CONFIG = {
         'host': 'localhost',
@@ -26,10 +26,149 @@ except ImportError:
         'charset': 'utf8mb4'
     }
 
+from database.common import (  # noqa: F401 (réexportés: API historique de ce module)
+    DB_PAGE_SIZE,
+    DB_PRODUCT_HISTORY,
+    DB_UPSERT_BATCH_SIZE,
+    DEACTIVATE_STAGING_CHUNK,
+    PRODUCT_COLUMNS,
+    PRODUCT_TABLES,
+    _COL,
+    _classify_rows,
+    _known_rows,
+    _link_hash,
+    _load_specs,
+    _product_row,
+    _to_str,
+    get_connector,
+    indexed_spec_keys,
+    revert_delta,
+    spec_column_name,
+    spec_delta,
+)
+# save_products / save_to_database vivent dans database/save.py (sans pilote MySQL)
+from database.save import DB_LOAD_MODE, save_products, save_to_database  # noqa: F401
+from database.pool import DB_HEALTHCHECK_INTERVAL, get_connection, ensure_database, is_healthy
+
 # Configuration de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Stratégie de désactivation des produits non revus: 'staging' (table temporaire) ou 'in_list'
+DB_DEACTIVATE_MODE = os.getenv('DB_DEACTIVATE_MODE', 'staging').strip().lower()
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Migrations ordonnées (version, description, instructions). Chacune n'est appliquée qu'une fois,
+# l'état étant tracé dans schema_version (une ligne par version appliquée). Une migration en échec
+# n'empêche pas les suivantes et est retentée au prochain démarrage. Instructions idempotentes
+# (rejouables après un échec partiel). Ajouter les nouvelles migrations en fin de liste uniquement.
+SCHEMA_MIGRATIONS = [
+    (1, "colonnes sku, link_hash, description, ai_processed, lifecycle", [
+        "ALTER TABLE {table} ADD COLUMN sku VARCHAR(100) NULL",
+        "ALTER TABLE {table} ADD COLUMN link_hash CHAR(64) NULL",
+        "ALTER TABLE {table} ADD COLUMN description TEXT NULL",
+        "ALTER TABLE {table} ADD COLUMN ai_processed TINYINT(1) DEFAULT 0",
+        "ALTER TABLE {table} ADD COLUMN ai_processed_at TIMESTAMP NULL",
+        "ALTER TABLE {table} ADD COLUMN is_active TINYINT(1) NOT NULL DEFAULT 1",
+        "ALTER TABLE {table} ADD COLUMN last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+    ]),
+    # Indices uniques: remplacer (brand, name) par (brand, sku) et (brand, link_hash)
+    (2, "suppression de l'index unique (brand, name)", [
+        "ALTER TABLE {table} DROP INDEX unique_product",
+    ]),
+    (3, "clés uniques (brand, sku) et (brand, link_hash)", [
+        # Bases historiques: doublons possibles sur les nouvelles clés, on garde la ligne la plus récente
+        "DELETE t1 FROM {table} t1 JOIN {table} t2 ON t1.brand = t2.brand AND t1.sku = t2.sku AND t1.id < t2.id",
+        "DELETE t1 FROM {table} t1 JOIN {table} t2 ON t1.brand = t2.brand AND t1.link_hash = t2.link_hash AND t1.id < t2.id",
+        "CREATE UNIQUE INDEX unique_brand_sku ON {table} (brand, sku)",
+        "CREATE UNIQUE INDEX unique_brand_linkhash ON {table} (brand, link_hash)",
+    ]),
+    (4, "index de parcours (brand, id), (brand, created_at) et (created_at)", [
+        "CREATE INDEX idx_brand_id ON {table} (brand, id)",
+        "CREATE INDEX idx_brand_created ON {table} (brand, created_at)",
+        "CREATE INDEX idx_created_at ON {table} (created_at)",
+    ]),
+    (5, "colonne content_hash (upsert sans écriture si produit inchangé)", [
+        "ALTER TABLE {table} ADD COLUMN content_hash CHAR(64) NULL",
+    ]),
+    (6, "table product_history (deltas de tech_specs par produit)", [
+        """
+        CREATE TABLE IF NOT EXISTS product_history (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            product_table VARCHAR(32) NOT NULL,
+            product_id INT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            delta JSON NOT NULL,
+            INDEX idx_history_product (product_table, product_id, id)
+        )
+        """,
+    ]),
+]
+
+# Les affectations sont évaluées de gauche à droite: content_hash doit rester en dernier pour que
+# les IF comparent l'ancien hash. Hash identique → seuls is_active/last_seen changent.
+UPSERT_UPDATE_CLAUSE = """
+    sku = IF(content_hash <=> VALUES(content_hash), sku, VALUES(sku)),
+    link_hash = IF(content_hash <=> VALUES(content_hash), link_hash, VALUES(link_hash)),
+    tech_specs = IF(content_hash <=> VALUES(content_hash), tech_specs, VALUES(tech_specs)),
+    scraped_at = IF(content_hash <=> VALUES(content_hash), scraped_at, VALUES(scraped_at)),
+    datasheet_link = IF(content_hash <=> VALUES(content_hash), datasheet_link, VALUES(datasheet_link)),
+    image_url = IF(content_hash <=> VALUES(content_hash), image_url, VALUES(image_url)),
+    ai_processed = IF(content_hash <=> VALUES(content_hash), ai_processed, VALUES(ai_processed)),
+    ai_processed_at = IF(content_hash <=> VALUES(content_hash), ai_processed_at, VALUES(ai_processed_at)),
+    is_active = 1,
+    last_seen = CURRENT_TIMESTAMP,
+    updated_at = IF(content_hash <=> VALUES(content_hash), updated_at, CURRENT_TIMESTAMP),
+    content_hash = VALUES(content_hash)
+"""
+
+# updated_at et last_seen sont ON UPDATE CURRENT_TIMESTAMP: toute UPDATE de suivi (last_seen, is_active)
+# doit les réaffecter explicitement (updated_at = updated_at) sous peine de marquer le produit modifié.
+
+# ER_DUP_FIELDNAME, ER_DUP_KEYNAME, ER_CANT_DROP_FIELD_OR_KEY
+_MIGRATION_IGNORED_ERRNOS = {1060, 1061, 1091}
+
+# Types SQL des colonnes générées sur tech_specs (voir FIELD_POLICY[...]['indexed'])
+_SPEC_COLUMN_TYPES = {'num': 'DECIMAL(14,2)', 'text': 'VARCHAR(100)'}
+
+SCHEMA_MIGRATION_LOCK = 'scraping_schema_migration'
+SCHEMA_MIGRATION_LOCK_TIMEOUT = int(os.getenv('DB_MIGRATION_LOCK_TIMEOUT', '60'))
+
+# Descripteur de schéma par base: {table: {colonnes}}, rempli une fois par processus
+_schema_cache = {}
+
+
+def _spec_column_expr(key, kind):
+    """Type + expression d'une colonne générée; valeurs non conformes → NULL (pas d'erreur à l'écriture)."""
+    path = f"'$.{key}'"
+    if kind == 'num':
+        return (
+            f"{_SPEC_COLUMN_TYPES[kind]} AS (CASE WHEN JSON_TYPE(JSON_EXTRACT(tech_specs, {path})) "
+            f"IN ('INTEGER', 'UNSIGNED INTEGER', 'DECIMAL', 'DOUBLE') "
+            f"THEN CAST(JSON_UNQUOTE(JSON_EXTRACT(tech_specs, {path})) AS DECIMAL(14,2)) END)"
+        )
+    return f"{_SPEC_COLUMN_TYPES[kind]} AS (LEFT(JSON_UNQUOTE(JSON_EXTRACT(tech_specs, {path})), 100))"
+
+
+def _tsv_field(val):
+    """Encode une valeur au format texte de LOAD DATA (échappements par défaut, NULL = \\N)."""
+    if val is None:
+        return '\\N'
+    return (
+        str(val)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
 class MySQLConnector:
     def __init__(self, config=None):
         """
@@ -40,13 +179,17 @@ class MySQLConnector:
         else:
             self.config = DB_CONFIG.copy()
         self.connection = None
+        self._last_health_check = 0.0
+        # Bilan du dernier insert_products: {'new', 'changed', 'unchanged'}
+        self.last_upsert_stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+        # Produits désactivés par le dernier deactivate_missing (churn par marque)
+        self.last_deactivated = 0
         
     def test_mysql_availability(self):
         """Teste si MySQL est disponible et accessible"""
         try:
-            # Test avec configuration sans base de données
-            test_config = DB_CONFIG_NO_DB.copy()
-            test_connection = mysql.connector.connect(**test_config)
+            # Test avec configuration sans base de données (connexion empruntée au pool)
+            test_connection = get_connection(DB_CONFIG_NO_DB)
             test_connection.close()
             logger.info("✅ MySQL est accessible")
             return True
@@ -58,42 +201,53 @@ class MySQLConnector:
             return False
         
     def connect(self):
-        """Établit la connexion à la base de données"""
+        """Établit la connexion à la base de données (connexion empruntée au pool partagé)"""
         try:
-            # D'abord tester si MySQL est disponible
-            if not self.test_mysql_availability():
-                return False
-                
-            # Créer la base de données si elle n'existe pas
+            # Créer la base de données si elle n'existe pas (une fois par processus)
             self.create_database()
             
             # Se connecter à la base de données
-            self.connection = mysql.connector.connect(**self.config)
-            if self.connection.is_connected():
-                logger.info(f"✅ Connexion réussie à MySQL - Base: {self.config['database']}")
-                return True
+            self.connection = get_connection(self.config)
+            self._last_health_check = time.monotonic()
+            logger.info(f"✅ Connexion réussie à MySQL - Base: {self.config['database']}")
+            return True
         except Error as e:
             logger.error(f"❌ Erreur de connexion MySQL: {e}")
+            logger.info("💡 Vérifiez que MySQL est installé et démarré")
             return False
+
+    def _ensure_connection(self):
+        """Garantit une connexion saine: ping léger, nouvelle connexion du pool seulement si elle est morte."""
+        now = time.monotonic()
+        if self.connection is not None and now - self._last_health_check < DB_HEALTHCHECK_INTERVAL:
+            return True
+        if is_healthy(self.connection):
+            self._last_health_check = now
+            return True
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Error:
+                pass
+            self.connection = None
+        return self.connect()
     
     def create_database(self):
         """Crée la base de données si elle n'existe pas"""
         try:
-            temp_config = DB_CONFIG_NO_DB.copy()
-            temp_connection = mysql.connector.connect(**temp_config)
-            cursor = temp_connection.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.config['database']}")
-            cursor.close()
-            temp_connection.close()
+            ensure_database(DB_CONFIG_NO_DB, self.config['database'])
             logger.info(f"✅ Base de données '{self.config['database']}' créée/vérifiée")
         except Error as e:
             logger.error(f"❌ Erreur création base de données: {e}")
             raise
     
     def create_tables(self):
-        """Crée les tables selon le schéma du cahier des charges"""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        """Crée les tables selon le schéma du cahier des charges et applique les migrations.
+
+        Retourne False si le schéma est incomplet (migration en échec, verrou de migration
+        non obtenu): les écritures ne doivent pas avoir lieu.
+        """
+        self._ensure_connection()
         
         tables = {
             'serveurs': """
@@ -161,241 +315,402 @@ class MySQLConnector:
             """
         }
         
+        database = self.config.get('database')
+        if database in _schema_cache:
+            # Schéma déjà migré et décrit dans ce processus
+            return True
+
         try:
             cursor = self.connection.cursor()
-            for table_name, query in tables.items():
-                cursor.execute(query)
-                logger.info(f"✅ Table '{table_name}' créée/vérifiée")
-                # Migration légère: ajouter colonnes/index si table existait déjà
-                self._migrate_table_schema(cursor, table_name)
-            
+            cursor.execute(SCHEMA_VERSION_TABLE)
+            if self._pending_migrations(cursor):
+                # Verrou applicatif: un seul processus migre à la fois (1 = obtenu, 0 = délai dépassé, NULL = erreur)
+                cursor.execute("SELECT GET_LOCK(%s, %s)", (SCHEMA_MIGRATION_LOCK, SCHEMA_MIGRATION_LOCK_TIMEOUT))
+                locked = cursor.fetchone()[0]
+                if locked != 1:
+                    logger.error(
+                        f"❌ Verrou de migration '{SCHEMA_MIGRATION_LOCK}' non obtenu en {SCHEMA_MIGRATION_LOCK_TIMEOUT}s "
+                        f"(migration en cours ailleurs?): schéma non vérifié, écritures annulées"
+                    )
+                    cursor.close()
+                    return False
+                try:
+                    for table_name, query in tables.items():
+                        cursor.execute(query)
+                        logger.info(f"✅ Table '{table_name}' créée/vérifiée")
+                    # Relu sous verrou: un autre processus a pu migrer entre-temps
+                    failed = self._apply_migrations(cursor, self._applied_versions(cursor))
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (SCHEMA_MIGRATION_LOCK,))
+                    cursor.fetchone()
+                if failed:
+                    self.connection.commit()
+                    cursor.close()
+                    logger.error(
+                        f"❌ Schéma incomplet, migrations en échec: {', '.join(map(str, failed))} "
+                        f"(voir les avertissements ci-dessus; retentées au prochain démarrage)"
+                    )
+                    return False
+
+            # Option: supprimer la colonne description si demandée
+            drop_desc = os.getenv("DB_DROP_DESCRIPTION", "false").strip().lower() in {"1", "true", "yes", "on"}
+            if drop_desc:
+                self._drop_description(cursor)
+
             self.connection.commit()
+            schema = self._load_schema(cursor)
+            if self._sync_spec_columns(cursor, schema):
+                self._load_schema(cursor)
             cursor.close()
+            return True
             
         except Error as e:
             logger.error(f"❌ Erreur création tables: {e}")
+            return False
 
-    def _migrate_table_schema(self, cursor, table_name: str):
-        """Ajoute les colonnes/index si manquants et ajuste les clés uniques pour un upsert robuste."""
-        # Colonnes à ajouter
-        alter_statements = [
-            f"ALTER TABLE {table_name} ADD COLUMN sku VARCHAR(100) NULL",
-            f"ALTER TABLE {table_name} ADD COLUMN link_hash CHAR(64) NULL",
-            f"ALTER TABLE {table_name} ADD COLUMN description TEXT NULL",
-            f"ALTER TABLE {table_name} ADD COLUMN ai_processed TINYINT(1) DEFAULT 0",
-            f"ALTER TABLE {table_name} ADD COLUMN ai_processed_at TIMESTAMP NULL",
-            f"ALTER TABLE {table_name} ADD COLUMN is_active TINYINT(1) NOT NULL DEFAULT 1",
-            f"ALTER TABLE {table_name} ADD COLUMN last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
-        ]
-        for stmt in alter_statements:
-            try:
-                cursor.execute(stmt)
-                logger.info(f"🔧 {table_name}: colonne ajoutée ({stmt})")
-            except Error as e:
-                # Ignorer si la colonne existe déjà
-                if 'Duplicate column name' in str(e):
-                    pass
-                else:
-                    logger.debug(f"ℹ️ Ignoré: {e}")
+    @staticmethod
+    def _applied_versions(cursor):
+        cursor.execute("SELECT version FROM schema_version")
+        return {row[0] for row in cursor.fetchall()}
+
+    def _pending_migrations(self, cursor):
+        applied = self._applied_versions(cursor)
+        return [version for version, _description, _statements in SCHEMA_MIGRATIONS if version not in applied]
+
+    def _apply_migrations(self, cursor, applied):
+        """Applique, dans l'ordre, les migrations absentes de `applied` et les enregistre dans schema_version.
+
+        Une migration en échec n'est pas enregistrée mais n'empêche pas les suivantes
+        (indépendantes); retourne la liste des versions en échec.
+        """
+        failed = []
+        for version, description, statements in SCHEMA_MIGRATIONS:
+            if version in applied:
+                continue
+            error = None
+            for stmt in statements:
+                # Les instructions paramétrées par {table} s'appliquent à chaque table produit
+                targets = PRODUCT_TABLES if '{table}' in stmt else (None,)
+                for table_name in targets:
+                    sql = stmt.format(table=table_name) if table_name else stmt
+                    try:
+                        cursor.execute(sql)
+                    except Error as e:
+                        # Bases antérieures au versionnement: colonne/index déjà présent ou absent
+                        if e.errno in _MIGRATION_IGNORED_ERRNOS:
+                            logger.debug(f"ℹ️ Ignoré: {e}")
+                            continue
+                        error = e
+                        logger.warning(f"⚠️ Migration {version} en échec ({' '.join(sql.split())}): {e}")
+                        break
+                if error:
+                    break
+            if error:
+                failed.append(version)
+                continue
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            logger.info(f"🔧 Migration {version} appliquée: {description}")
+        return failed
 
-        # Option: supprimer la colonne description si demandée
-        drop_desc = os.getenv("DB_DROP_DESCRIPTION", "false").strip().lower() in {"1", "true", "yes", "on"}
-        if drop_desc:
+    def _drop_description(self, cursor):
+        for table_name in PRODUCT_TABLES:
             try:
                 cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN description")
                 logger.info(f"🔧 {table_name}: colonne description supprimée")
             except Error as e:
                 # Ignore si colonne absente
-                if 'check that column/key exists' in str(e).lower() or 'unknown column' in str(e).lower():
-                    pass
-                else:
+                if e.errno not in _MIGRATION_IGNORED_ERRNOS:
                     logger.debug(f"ℹ️ Suppression description ignorée: {e}")
 
-        # Indices uniques: remplacer (brand, name) par (brand, sku) et (brand, link_hash)
-        try:
-            cursor.execute(f"ALTER TABLE {table_name} DROP INDEX unique_product")
-            logger.info(f"🔧 {table_name}: index unique_product supprimé")
-        except Error:
-            pass
+    def _sync_spec_columns(self, cursor, schema):
+        """Ajoute les colonnes générées indexées manquantes (FIELD_POLICY[...]['indexed']), d'après le schéma en cache."""
+        changed = False
+        for table_name in PRODUCT_TABLES:
+            existing = schema.get(table_name, set())
+            for key, kind in indexed_spec_keys(table_name).items():
+                column = spec_column_name(key)
+                if column in existing:
+                    continue
+                try:
+                    cursor.execute(
+                        f"ALTER TABLE {table_name} ADD COLUMN {column} {_spec_column_expr(key, kind)} VIRTUAL, "
+                        f"ADD INDEX idx_{column} ({column})"
+                    )
+                    logger.info(f"🔧 {table_name}: colonne générée indexée {column} ajoutée")
+                    changed = True
+                except Error as e:
+                    logger.warning(f"⚠️ {table_name}: colonne générée {column} ignorée: {e}")
+        return changed
 
-        # Ajouter unique(brand, sku)
-        try:
-            cursor.execute(f"CREATE UNIQUE INDEX unique_brand_sku ON {table_name} (brand, sku)")
-            logger.info(f"🔧 {table_name}: index unique_brand_sku créé")
-        except Error as e:
-            if 'Duplicate key name' in str(e):
-                pass
-            else:
-                logger.warning(f"⚠️ {table_name}: création unique_brand_sku ignorée: {e}")
+    def _load_schema(self, cursor):
+        """Charge en une requête la description (colonnes par table) de la base et la met en cache."""
+        database = self.config.get('database')
+        cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = %s",
+            (database,)
+        )
+        schema = {}
+        for table_name, column_name in cursor.fetchall():
+            schema.setdefault(table_name, set()).add(column_name)
+        _schema_cache[database] = schema
+        return schema
 
-        # Ajouter unique(brand, link_hash) pour dédup sans SKU
-        try:
-            cursor.execute(f"CREATE UNIQUE INDEX unique_brand_linkhash ON {table_name} (brand, link_hash)")
-            logger.info(f"🔧 {table_name}: index unique_brand_linkhash créé")
-        except Error as e:
-            if 'Duplicate key name' in str(e):
-                pass
-            else:
-                logger.warning(f"⚠️ {table_name}: création unique_brand_linkhash ignorée: {e}")
+    def table_columns(self, table_name):
+        """Colonnes de la table d'après le descripteur de schéma en cache (chargé au besoin)."""
+        schema = _schema_cache.get(self.config.get('database'))
+        if schema is None:
+            cursor = self.connection.cursor()
+            try:
+                schema = self._load_schema(cursor)
+            finally:
+                cursor.close()
+        return schema.get(table_name, set())
     
-    def insert_products(self, products_data, table_name):
+    def _known_content_hashes(self, cursor, table_name, rows):
+        """(id, brand, sku, link_hash, content_hash) des produits du lot déjà en base (clés du lot seulement)."""
+        return _known_rows(cursor, table_name, rows, lambda n: f"({', '.join(['(%s, %s)'] * n)})")
+
+    def _record_history(self, cursor, table_name, changed):
+        """Enregistre dans product_history le delta de tech_specs des produits modifiés (ids existants)."""
+        new_specs = {row_id: values[_COL['tech_specs']] for row_id, values in changed}
+        ids = list(new_specs)
+        history = []
+        for start in range(0, len(ids), DEACTIVATE_STAGING_CHUNK):
+            chunk = ids[start:start + DEACTIVATE_STAGING_CHUNK]
+            cursor.execute(
+                f"SELECT id, tech_specs FROM {table_name} WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                tuple(chunk)
+            )
+            for row_id, old_raw in cursor.fetchall():
+                delta = spec_delta(_load_specs(old_raw), _load_specs(new_specs[row_id]))
+                if delta:
+                    history.append((table_name, row_id, json.dumps(delta, ensure_ascii=False)))
+        if history:
+            cursor.executemany(
+                "INSERT INTO product_history (product_table, product_id, delta) VALUES (%s, %s, %s)",
+                history
+            )
+            logger.info(f"🕓 {table_name}: {len(history)} versions de specs historisées")
+
+    def product_history(self, table_name, product_id):
+        """Specs courantes et deltas (du plus récent au plus ancien) d'un produit."""
+        self._ensure_connection()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT tech_specs FROM {table_name} WHERE id = %s", (product_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None, []
+            cursor.execute(
+                "SELECT id, changed_at, delta FROM product_history WHERE product_table = %s AND product_id = %s ORDER BY id DESC",
+                (table_name, product_id)
+            )
+            deltas = [(hid, changed_at, _load_specs(delta)) for hid, changed_at, delta in cursor.fetchall()]
+            return _load_specs(row[0]), deltas
+        finally:
+            cursor.close()
+
+    def insert_products(self, products_data, table_name, batch_size=None):
         """
         Insère les produits dans la table spécifiée
+
+        Chaque ligne porte un content_hash du produit normalisé: les produits inchangés ne reçoivent
+        qu'une mise à jour de last_seen/is_active. Le bilan nouveaux/modifiés/inchangés est conservé
+        dans self.last_upsert_stats; le retour reste (insérés, mis à jour).
+
+        batch_size > 0 active l'upsert multi-lignes par lots; 0 écrit ligne par ligne.
+        Par défaut: DB_UPSERT_BATCH_SIZE.
         """
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        self._ensure_connection()
+
+        if batch_size is None:
+            batch_size = DB_UPSERT_BATCH_SIZE
         
         try:
             cursor = self.connection.cursor()
 
-            # Détecter la présence de la colonne description
-            has_description = False
-            try:
-                cursor.execute(
-                    """
-                    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
-                    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = 'description'
-                    """,
-                    (self.config.get('database'), table_name)
-                )
-                has_description = cursor.fetchone() is not None
-            except Error:
-                has_description = False
+            # Présence de la colonne description d'après le descripteur de schéma en cache
+            has_description = 'description' in self.table_columns(table_name)
             
             # Requête d'insertion avec gestion des doublons (clé: brand+sku ou brand+link_hash)
-            if has_description:
-                query = f"""
-                    INSERT INTO {table_name}
-                    (brand, link, name, sku, link_hash, tech_specs, scraped_at, datasheet_link, image_url, ai_processed, ai_processed_at, is_active, description)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                        sku = VALUES(sku),
-                        link_hash = VALUES(link_hash),
-                        tech_specs = VALUES(tech_specs),
-                        scraped_at = VALUES(scraped_at),
-                        datasheet_link = VALUES(datasheet_link),
-                        image_url = VALUES(image_url),
-                        ai_processed = VALUES(ai_processed),
-                        ai_processed_at = VALUES(ai_processed_at),
-                        is_active = 1,
-                        last_seen = CURRENT_TIMESTAMP,
-                        updated_at = CURRENT_TIMESTAMP
-                """
-            else:
-                query = f"""
-                    INSERT INTO {table_name}
-                    (brand, link, name, sku, link_hash, tech_specs, scraped_at, datasheet_link, image_url, ai_processed, ai_processed_at, is_active)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                        sku = VALUES(sku),
-                        link_hash = VALUES(link_hash),
-                        tech_specs = VALUES(tech_specs),
-                        scraped_at = VALUES(scraped_at),
-                        datasheet_link = VALUES(datasheet_link),
-                        image_url = VALUES(image_url),
-                        ai_processed = VALUES(ai_processed),
-                        ai_processed_at = VALUES(ai_processed_at),
-                        is_active = 1,
-                        last_seen = CURRENT_TIMESTAMP,
-                        updated_at = CURRENT_TIMESTAMP
-                """
-            
-            inserted_count = 0
-            updated_count = 0
-            
-            for product in products_data:
-                # Filet de sécurité: si tech_specs est une string, la déplacer en description et mettre {}
-                # No description: we drop any description and never persist marketing text
-                description_val = None
-                ts = product.get('tech_specs', {})
-                if isinstance(ts, str):
-                    # Coerce to empty JSON object if AI produced a string
-                    ts = {}
-                tech_specs_json = json.dumps(ts, ensure_ascii=False)
-                link_val = product.get('link', '') or ''
-                link_hash = hashlib.sha256(link_val.encode('utf-8')).hexdigest() if link_val else None
-                ai_processed = 1 if product.get('ai_processed') else 0
-                ai_processed_at = product.get('ai_processed_at')
-
-                # Normaliser les champs potentiellement non-scalaires vers des chaînes
-                def _to_str(val):
-                    if isinstance(val, list):
-                        # prendre le premier élément chaîne non vide
-                        for x in val:
-                            if isinstance(x, str) and x.strip():
-                                return x.strip()
-                        return ''
-                    if isinstance(val, (int, float)):
-                        return str(val)
-                    if isinstance(val, str):
-                        return val
-                    # objets/dicts non supportés pour TEXT → json.dumps compact
-                    try:
-                        return json.dumps(val, ensure_ascii=False)
-                    except Exception:
-                        return ''
-
-                datasheet_val = _to_str(product.get('datasheet_link'))
-                image_val = _to_str(product.get('image_url', ''))
-                
-                if has_description:
-                    values = (
-                        product.get('brand', ''),
-                        link_val,
-                        product.get('name', ''),
-                        product.get('sku'),
-                        link_hash,
-                        tech_specs_json,
-                        product.get('scraped_at', datetime.now().isoformat()),
-                        datasheet_val,
-                        image_val,
-                        ai_processed,
-                        ai_processed_at,
-                        1,
-                        description_val
-                    )
-                else:
-                    values = (
-                        product.get('brand', ''),
-                        link_val,
-                        product.get('name', ''),
-                        product.get('sku'),
-                        link_hash,
-                        tech_specs_json,
-                        product.get('scraped_at', datetime.now().isoformat()),
-                        datasheet_val,
-                        image_val,
-                        ai_processed,
-                        ai_processed_at,
-                        1,
-                    )
-                
-                # Vérifier si le produit existe déjà (préfère SKU, sinon link_hash)
-                check_query = f"SELECT id FROM {table_name} WHERE brand = %s AND ((sku IS NOT NULL AND sku = %s) OR (sku IS NULL AND link_hash = %s)) LIMIT 1"
-                cursor.execute(check_query, (product.get('brand'), product.get('sku'), link_hash))
-                exists = cursor.fetchone()
-                
-                cursor.execute(query, values)
-                
-                if exists:
-                    updated_count += 1
-                else:
-                    inserted_count += 1
+            columns = PRODUCT_COLUMNS + (('description',) if has_description else ())
+            query = f"""
+                INSERT INTO {table_name}
+                ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(columns))})
+                ON DUPLICATE KEY UPDATE {UPSERT_UPDATE_CLAUSE}
+            """
             
+            rows = [_product_row(product, has_description) for product in products_data]
+
+            # Classer chaque produit (nouveau / modifié / inchangé) d'après les hash déjà en base
+            known = self._known_content_hashes(cursor, table_name, rows)
+            stats, to_write, unchanged_ids, changed = _classify_rows(rows, known)
+
+            # Historique: deltas de tech_specs lus avant écrasement par l'upsert
+            if changed and DB_PRODUCT_HISTORY:
+                self._record_history(cursor, table_name, changed)
+
+            # Inchangés: seulement last_seen / is_active (updated_at figé, cf. ON UPDATE)
+            for start in range(0, len(unchanged_ids), DEACTIVATE_STAGING_CHUNK):
+                chunk = unchanged_ids[start:start + DEACTIVATE_STAGING_CHUNK]
+                cursor.execute(
+                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP, updated_at = updated_at WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                    tuple(chunk)
+                )
+
+            if batch_size > 0:
+                # Upsert multi-lignes: executemany réécrit en un seul INSERT ... VALUES (...), (...)
+                for start in range(0, len(to_write), batch_size):
+                    cursor.executemany(query, to_write[start:start + batch_size])
+            else:
+                for values in to_write:
+                    cursor.execute(query, values)
+
             self.connection.commit()
             cursor.close()
-            
-            logger.info(f"✅ {inserted_count} nouveaux produits insérés, {updated_count} mis à jour dans '{table_name}'")
+
+            self.last_upsert_stats = stats
+            inserted_count = stats['new']
+            updated_count = stats['changed'] + stats['unchanged']
+            logger.info(
+                f"✅ '{table_name}': {stats['new']} nouveaux, {stats['changed']} modifiés, "
+                f"{stats['unchanged']} inchangés (last_seen seulement)"
+            )
             return inserted_count, updated_count
             
         except Error as e:
             logger.error(f"❌ Erreur insertion dans {table_name}: {e}")
             return 0, 0
     
+    def load_products_bulk(self, products_data, table_name):
+        """
+        Chargement massif: TSV temporaire → LOAD DATA LOCAL INFILE dans une table de staging,
+        puis fusion en un seul INSERT ... SELECT ... ON DUPLICATE KEY UPDATE.
+        Destiné aux ré-imports complets / backfills de dumps JSON historiques.
+
+        Même contrat que insert_products: classement nouveaux/modifiés/inchangés par content_hash
+        (fait en SQL sur la table de staging), historique des modifiés, inchangés limités à
+        last_seen/is_active, bilan dans self.last_upsert_stats.
+        """
+        # LOAD DATA LOCAL doit être autorisé côté client: connexion dédiée (pool distinct)
+        connection = get_connection(dict(self.config, allow_local_infile=True))
+        tsv_path = None
+        try:
+            # link_hash et _to_str appliqués pendant l'écriture du fichier (via _product_row)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv', delete=False) as tsv:
+                tsv_path = tsv.name
+                for product in products_data:
+                    tsv.write('\t'.join(_tsv_field(v) for v in _product_row(product, False)))
+                    tsv.write('\n')
+
+            cursor = connection.cursor()
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS staging_products")
+            cursor.execute(
+                """
+                CREATE TEMPORARY TABLE staging_products (
+                    brand VARCHAR(100) NOT NULL,
+                    link TEXT NOT NULL,
+                    name VARCHAR(500) NOT NULL,
+                    sku VARCHAR(100) NULL,
+                    link_hash CHAR(64) NULL,
+                    tech_specs LONGTEXT,
+                    scraped_at VARCHAR(40),
+                    datasheet_link TEXT,
+                    image_url TEXT,
+                    ai_processed TINYINT(1),
+                    ai_processed_at VARCHAR(40) NULL,
+                    is_active TINYINT(1),
+                    content_hash CHAR(64) NULL,
+                    match_id INT NULL,
+                    match_hash CHAR(64) NULL
+                ) CHARACTER SET utf8mb4
+                """
+            )
+            # Format par défaut de LOAD DATA: tabulations, échappement '\', NULL = \N
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE staging_products CHARACTER SET utf8mb4 ({', '.join(PRODUCT_COLUMNS)})",
+                (tsv_path,)
+            )
+            staged = cursor.rowcount
+
+            # Rapprochement avec la table cible (même priorité que _classify_rows: sku, puis link_hash)
+            cursor.execute(
+                f"""
+                UPDATE staging_products s JOIN {table_name} t ON t.brand = s.brand AND t.sku = s.sku
+                SET s.match_id = t.id, s.match_hash = t.content_hash
+                WHERE s.sku IS NOT NULL AND s.sku <> ''
+                """
+            )
+            cursor.execute(
+                f"""
+                UPDATE staging_products s JOIN {table_name} t ON t.brand = s.brand AND t.link_hash = s.link_hash
+                SET s.match_id = t.id, s.match_hash = t.content_hash
+                WHERE s.match_id IS NULL
+                """
+            )
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(match_id IS NULL), 0),
+                       COALESCE(SUM(match_id IS NOT NULL AND NOT (match_hash <=> content_hash)), 0),
+                       COALESCE(SUM(match_id IS NOT NULL AND match_hash <=> content_hash), 0)
+                FROM staging_products
+                """
+            )
+            stats = dict(zip(('new', 'changed', 'unchanged'), (int(n) for n in cursor.fetchone())))
+
+            # Historique: deltas de tech_specs lus avant écrasement par la fusion
+            if stats['changed'] and DB_PRODUCT_HISTORY:
+                cursor.execute(
+                    f"""
+                    SELECT match_id, {', '.join(PRODUCT_COLUMNS)} FROM staging_products
+                    WHERE match_id IS NOT NULL AND NOT (match_hash <=> content_hash)
+                    """
+                )
+                changed = [(row[0], tuple(row[1:])) for row in cursor.fetchall()]
+                self._record_history(cursor, table_name, changed)
+
+            # Inchangés: seulement last_seen / is_active
+            cursor.execute(
+                f"""
+                UPDATE {table_name} t JOIN staging_products s ON s.match_id = t.id
+                SET t.is_active = 1, t.last_seen = CURRENT_TIMESTAMP, t.updated_at = t.updated_at
+                WHERE s.match_hash <=> s.content_hash
+                """
+            )
+            # Nouveaux et modifiés: fusion
+            cursor.execute(
+                f"""
+                INSERT INTO {table_name} ({', '.join(PRODUCT_COLUMNS)})
+                SELECT {', '.join(PRODUCT_COLUMNS)} FROM staging_products
+                WHERE match_id IS NULL OR NOT (match_hash <=> content_hash)
+                ON DUPLICATE KEY UPDATE {UPSERT_UPDATE_CLAUSE}
+                """
+            )
+            connection.commit()
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS staging_products")
+            cursor.close()
+
+            self.last_upsert_stats = stats
+            logger.info(
+                f"✅ LOAD DATA: {staged} lignes chargées dans '{table_name}': {stats['new']} nouveaux, "
+                f"{stats['changed']} modifiés, {stats['unchanged']} inchangés (last_seen seulement)"
+            )
+            return stats['new'], stats['changed'] + stats['unchanged']
+        except Error as e:
+            logger.error(f"❌ Erreur chargement massif dans {table_name}: {e}")
+            return 0, 0
+        finally:
+            connection.close()
+            if tsv_path and os.path.exists(tsv_path):
+                os.remove(tsv_path)
+    
     def get_products(self, table_name, brand=None):
-        """Récupère les produits d'une table"""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        """Récupère les produits d'une table (tout en mémoire; préférer iter_products pour un parcours complet)"""
+        self._ensure_connection()
         
         try:
             cursor = self.connection.cursor(dictionary=True)
@@ -424,20 +739,153 @@ class MySQLConnector:
             logger.error(f"❌ Erreur récupération depuis {table_name}: {e}")
             return []
     
+    def iter_products(self, table_name, brand=None, columns=None, page_size=None, decode_specs=True):
+        """
+        Parcourt les produits d'une table en flux, page par page (pagination par clé sur (brand, id)).
+
+        Prédicat de reprise en constructeur de ligne `(brand, id) > (%s, %s)`: parcours d'intervalle
+        sur idx_brand_id (EXPLAIN: type=range, key=idx_brand_id), là où la forme OR développée
+        peut retomber sur un parcours complet.
+
+        columns: projection (id et brand toujours inclus); None = toutes les colonnes.
+        decode_specs: False laisse tech_specs en chaîne JSON brute (décodage à la charge de l'appelant).
+        Utilise une connexion dédiée du pool et un curseur non bufferisé: la mémoire ne dépend
+        que de page_size, pas de la taille de la table.
+        """
+        self._ensure_connection()
+        page_size = page_size or DB_PAGE_SIZE
+
+        if columns:
+            known = self.table_columns(table_name)
+            unknown = [c for c in columns if c not in known]
+            if unknown:
+                raise ValueError(f"Colonnes inconnues pour {table_name}: {unknown}")
+            select_cols = ', '.join(dict.fromkeys(['id', 'brand', *columns]))
+        else:
+            select_cols = '*'
+
+        connection = get_connection(self.config)
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            last_brand, last_id = None, 0
+            while True:
+                if brand:
+                    cursor.execute(
+                        f"SELECT {select_cols} FROM {table_name} WHERE brand = %s AND id > %s ORDER BY id LIMIT %s",
+                        (brand, last_id, page_size)
+                    )
+                elif last_brand is None:
+                    cursor.execute(
+                        f"SELECT {select_cols} FROM {table_name} ORDER BY brand, id LIMIT %s",
+                        (page_size,)
+                    )
+                else:
+                    cursor.execute(
+                        f"""
+                        SELECT {select_cols} FROM {table_name}
+                        WHERE (brand, id) > (%s, %s)
+                        ORDER BY brand, id LIMIT %s
+                        """,
+                        (last_brand, last_id, page_size)
+                    )
+                fetched = 0
+                while True:
+                    rows = cursor.fetchmany(256)
+                    if not rows:
+                        break
+                    for row in rows:
+                        fetched += 1
+                        last_brand, last_id = row['brand'], row['id']
+                        # Colonne JSON: str ou bytes selon le serveur/connecteur (cf. _load_specs)
+                        if decode_specs and isinstance(row.get('tech_specs'), (str, bytes, bytearray)):
+                            row['tech_specs'] = _load_specs(row['tech_specs'])
+                        yield row
+                if fetched < page_size:
+                    break
+            cursor.close()
+        finally:
+            # Parcours interrompu: vider le résultat en cours avant de rendre la connexion
+            try:
+                connection.consume_results()
+            except Error:
+                pass
+            connection.close()
+
+    def list_products(self, table_name, brand=None, limit=10, filters=None):
+        """Aperçu des derniers produits (db_cli list). filters: [(colonne spec_*, opérateur, valeur)]."""
+        self._ensure_connection()
+        conditions = []
+        params = []
+        if brand:
+            conditions.append("brand = %s")
+            params.append(brand)
+        # Filtres sur colonnes générées indexées → parcours d'intervalle d'index
+        for column, op, value in filters or []:
+            conditions.append(f"{column} {op} %s")
+            params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(
+                f"""
+                SELECT id, brand, name, sku,
+                       JSON_LENGTH(tech_specs) AS spec_keys,
+                       is_active, DATE_FORMAT(scraped_at, '%Y-%m-%d %H:%i') AS scraped_at,
+                       LEFT(link, 128) AS link
+                FROM {table_name}
+                {where}
+                ORDER BY id DESC
+                LIMIT %s
+                """,
+                (*params, limit)
+            )
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def brand_counts(self, table_name):
+        """[(marque, nombre de produits)] par volume décroissant."""
+        self._ensure_connection()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT brand, COUNT(*) AS cnt FROM {table_name} GROUP BY brand ORDER BY cnt DESC, brand ASC"
+            )
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def describe(self):
+        return f"db={self.config.get('database')}"
+
     def close(self):
-        """Ferme la connexion"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            logger.info("✅ Connexion MySQL fermée")
+        """Rend la connexion au pool"""
+        if self.connection is not None:
+            try:
+                self.connection.close()
+                logger.info("✅ Connexion MySQL fermée")
+            except Error as e:
+                logger.debug(f"ℹ️ Fermeture connexion ignorée: {e}")
+            self.connection = None
+
+    def deactivate_missing(self, table_name: str, brand: str, current_skus: set, current_link_hashes: set, mode=None):
+        """
+        Marque inactifs les produits d'une marque non présents dans le lot courant (par SKU ou link_hash).
 
-    def deactivate_missing(self, table_name: str, brand: str, current_skus: set, current_link_hashes: set):
-        """Marque inactifs les produits d'une marque non présents dans le lot courant (par SKU ou link_hash)."""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        mode='staging' charge les clés du run dans une table temporaire puis réactive/désactive
+        par jointures dans une seule transaction; mode='in_list' conserve les listes IN/NOT IN.
+        Par défaut: DB_DEACTIVATE_MODE. Retourne le nombre de produits passés inactifs
+        (aussi dans self.last_deactivated).
+        """
+        self._ensure_connection()
+        self.last_deactivated = 0
 
         if not brand:
             logger.warning("⚠️ deactivate_missing: brand non spécifié, opération ignorée")
-            return
+            return 0
+
+        if (mode or DB_DEACTIVATE_MODE) == 'staging':
+            return self._deactivate_missing_staging(table_name, brand, current_skus, current_link_hashes)
 
         try:
             cursor = self.connection.cursor()
@@ -446,14 +894,14 @@ class MySQLConnector:
             if current_skus:
                 sku_list = ','.join(['%s'] * len(current_skus))
                 cursor.execute(
-                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP WHERE brand = %s AND sku IN ({sku_list})",
+                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP, updated_at = updated_at WHERE brand = %s AND sku IN ({sku_list})",
                     (brand, *list(current_skus))
                 )
 
             if current_link_hashes:
                 lh_list = ','.join(['%s'] * len(current_link_hashes))
                 cursor.execute(
-                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP WHERE brand = %s AND (sku IS NULL OR sku = '') AND link_hash IN ({lh_list})",
+                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP, updated_at = updated_at WHERE brand = %s AND (sku IS NULL OR sku = '') AND link_hash IN ({lh_list})",
                     (brand, *list(current_link_hashes))
                 )
 
@@ -461,9 +909,10 @@ class MySQLConnector:
             if current_skus:
                 sku_list = ','.join(['%s'] * len(current_skus))
                 cursor.execute(
-                    f"UPDATE {table_name} SET is_active = 0 WHERE brand = %s AND sku IS NOT NULL AND sku <> '' AND sku NOT IN ({sku_list})",
+                    f"UPDATE {table_name} SET is_active = 0, last_seen = last_seen WHERE brand = %s AND is_active = 1 AND sku IS NOT NULL AND sku <> '' AND sku NOT IN ({sku_list})",
                     (brand, *list(current_skus))
                 )
+                self.last_deactivated += cursor.rowcount
             else:
                 # Aucun SKU dans ce lot: ne pas désactiver en masse par SKU
                 pass
@@ -472,77 +921,103 @@ class MySQLConnector:
             if current_link_hashes:
                 lh_list = ','.join(['%s'] * len(current_link_hashes))
                 cursor.execute(
-                    f"UPDATE {table_name} SET is_active = 0 WHERE brand = %s AND (sku IS NULL OR sku = '') AND link_hash IS NOT NULL AND link_hash <> '' AND link_hash NOT IN ({lh_list})",
+                    f"UPDATE {table_name} SET is_active = 0, last_seen = last_seen WHERE brand = %s AND is_active = 1 AND (sku IS NULL OR sku = '') AND link_hash IS NOT NULL AND link_hash <> '' AND link_hash NOT IN ({lh_list})",
                     (brand, *list(current_link_hashes))
                 )
+                self.last_deactivated += cursor.rowcount
 
             self.connection.commit()
             cursor.close()
-            logger.info(f"🟡 {table_name}:{brand} - désactivation des produits non vus terminée")
+            logger.info(f"🟡 {table_name}:{brand} - désactivation des produits non vus terminée ({self.last_deactivated} désactivés)")
         except Error as e:
             logger.error(f"❌ Erreur désactivation des produits manquants: {e}")
+        return self.last_deactivated
 
-def save_to_database(json_file_path, table_name, brand_filter=None):
-    """
-    Fonction utilitaire pour sauvegarder un fichier JSON en base
-    """
-    db = None
-    try:
-        # Initialiser le connecteur
-        db = MySQLConnector()
-
-        # Tester la disponibilité de MySQL
-        if not db.test_mysql_availability():
-            logger.error("❌ MySQL n'est pas disponible")
-            return False
+    def _deactivate_missing_staging(self, table_name, brand, current_skus, current_link_hashes):
+        """Variante ensembliste: clés du run en table temporaire, réactivation/désactivation par (anti-)jointure."""
+        try:
+            cursor = self.connection.cursor()
+            # Table temporaire propre à la session (détruite au retour de la connexion dans le pool)
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS run_keys")
+            cursor.execute(
+                """
+                CREATE TEMPORARY TABLE run_keys (
+                    key_type TINYINT NOT NULL,
+                    key_val VARCHAR(100) NOT NULL,
+                    PRIMARY KEY (key_type, key_val)
+                )
+                """
+            )
+            # 1 = SKU, 2 = link_hash
+            keys = [(1, sku) for sku in current_skus] + [(2, lh) for lh in current_link_hashes]
 
-        # Se connecter à la base
-        if not db.connect():
-            logger.error("❌ Impossible de se connecter à MySQL")
-            return False
+            self.connection.start_transaction()
+            for start in range(0, len(keys), DEACTIVATE_STAGING_CHUNK):
+                cursor.executemany(
+                    "INSERT IGNORE INTO run_keys (key_type, key_val) VALUES (%s, %s)",
+                    keys[start:start + DEACTIVATE_STAGING_CHUNK]
+                )
 
-        # Créer les tables
-        db.create_tables()
+            # Réactiver les actuels (sécurité si relance)
+            if current_skus:
+                cursor.execute(
+                    f"""
+                    UPDATE {table_name} t JOIN run_keys k ON k.key_type = 1 AND k.key_val = t.sku
+                    SET t.is_active = 1, t.last_seen = CURRENT_TIMESTAMP, t.updated_at = t.updated_at
+                    WHERE t.brand = %s
+                    """,
+                    (brand,)
+                )
+            if current_link_hashes:
+                cursor.execute(
+                    f"""
+                    UPDATE {table_name} t JOIN run_keys k ON k.key_type = 2 AND k.key_val = t.link_hash
+                    SET t.is_active = 1, t.last_seen = CURRENT_TIMESTAMP, t.updated_at = t.updated_at
+                    WHERE t.brand = %s AND (t.sku IS NULL OR t.sku = '')
+                    """,
+                    (brand,)
+                )
+
+            # Désactiver ceux non vus avec SKU (aucun SKU dans ce lot: pas de désactivation en masse)
+            if current_skus:
+                cursor.execute(
+                    f"""
+                    UPDATE {table_name} t LEFT JOIN run_keys k ON k.key_type = 1 AND k.key_val = t.sku
+                    SET t.is_active = 0, t.last_seen = t.last_seen
+                    WHERE t.brand = %s AND t.is_active = 1 AND t.sku IS NOT NULL AND t.sku <> '' AND k.key_val IS NULL
+                    """,
+                    (brand,)
+                )
+                self.last_deactivated += cursor.rowcount
 
-        # Charger les données JSON
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            products_data = json.load(f)
-
-        # Filtrer par marque si spécifié
-        if brand_filter:
-            products_data = [p for p in products_data if p.get('brand', '').lower() == brand_filter.lower()]
-
-        # Sauvegarder en base
-        inserted, updated = db.insert_products(products_data, table_name)
-
-        # Désactiver les produits non vus de la même marque (si brand_filter fourni et si activé)
-        enable_deactivate = os.getenv('ENABLE_DEACTIVATE_MISSING', 'true').lower() == 'true'
-        if brand_filter and enable_deactivate:
-            current_skus = {p.get('sku') for p in products_data if p.get('sku')}
-            current_link_hashes = set()
-            for p in products_data:
-                link_val = p.get('link') or ''
-                if link_val:
-                    current_link_hashes.add(hashlib.sha256(link_val.encode('utf-8')).hexdigest())
-            db.deactivate_missing(table_name, brand_filter, current_skus, current_link_hashes)
-        elif brand_filter and not enable_deactivate:
-            logger.info(f"⏭️ Désactivation des produits non vus SKIPPED (ENABLE_DEACTIVATE_MISSING=false) pour {table_name}:{brand_filter}")
-
-        logger.info(f"✅ Sauvegarde terminée: {inserted} insertions, {updated} mises à jour")
-        return True
-
-    except FileNotFoundError:
-        logger.error(f"❌ Fichier JSON non trouvé: {json_file_path}")
-        return False
-    except json.JSONDecodeError:
-        logger.error(f"❌ Fichier JSON invalide: {json_file_path}")
-        return False
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la sauvegarde: {e}")
-        return False
-    finally:
-        if db:
-            db.close()
+            # Désactiver ceux non vus sans SKU (par link_hash)
+            if current_link_hashes:
+                cursor.execute(
+                    f"""
+                    UPDATE {table_name} t LEFT JOIN run_keys k ON k.key_type = 2 AND k.key_val = t.link_hash
+                    SET t.is_active = 0, t.last_seen = t.last_seen
+                    WHERE t.brand = %s AND t.is_active = 1 AND (t.sku IS NULL OR t.sku = '')
+                      AND t.link_hash IS NOT NULL AND t.link_hash <> '' AND k.key_val IS NULL
+                    """,
+                    (brand,)
+                )
+                self.last_deactivated += cursor.rowcount
+
+            self.connection.commit()
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS run_keys")
+            cursor.close()
+            logger.info(
+                f"🟡 {table_name}:{brand} - désactivation des produits non vus terminée "
+                f"({self.last_deactivated} désactivés, {len(keys)} clés en table temporaire)"
+            )
+        except Error as e:
+            self.last_deactivated = 0
+            try:
+                self.connection.rollback()
+            except Error:
+                pass
+            logger.error(f"❌ Erreur désactivation des produits manquants: {e}")
+        return self.last_deactivated
 
 if __name__ == "__main__":
     # Test de connexion
@@ -0,0 +1,85 @@
+"""
+Pool de connexions MySQL partagé par tout le processus.
+
+Un pool `mysql.connector.pooling` est créé paresseusement par configuration
+(DB_CONFIG, DB_CONFIG_NO_DB, ou config personnalisée). `close()` sur une
+connexion empruntée la rend au pool au lieu de fermer la socket.
+"""
+import logging
+import os
+import threading
+
+import mysql.connector
+from mysql.connector import Error, pooling
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+# Intervalle minimal (s) entre deux pings de santé d'une même connexion
+DB_HEALTHCHECK_INTERVAL = float(os.getenv('DB_HEALTHCHECK_INTERVAL_SECONDS', '30'))
+
+_pools = {}
+_ensured_databases = set()
+_lock = threading.Lock()
+
+
+def _config_key(config):
+    return tuple(sorted((k, str(v)) for k, v in config.items()))
+
+
+def get_pool(config):
+    """Retourne (et crée au besoin) le pool associé à cette configuration."""
+    key = _config_key(config)
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"scraping_pool_{len(_pools)}",
+                pool_size=DB_POOL_SIZE,
+                pool_reset_session=True,
+                **config
+            )
+            _pools[key] = pool
+            logger.info(f"🔌 Pool MySQL créé ({DB_POOL_SIZE} connexions, db={config.get('database', '-')})")
+        return pool
+
+
+def get_connection(config):
+    """Emprunte une connexion au pool; repli sur une connexion directe si le pool est épuisé."""
+    try:
+        return get_pool(config).get_connection()
+    except pooling.PoolError as e:
+        logger.warning(f"⚠️ Pool MySQL épuisé ({e}), connexion directe")
+        return mysql.connector.connect(**config)
+
+
+def ensure_database(server_config, database):
+    """Crée la base si nécessaire, une seule fois par processus."""
+    if database in _ensured_databases:
+        return
+    cn = get_connection(server_config)
+    try:
+        cursor = cn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        cursor.close()
+    finally:
+        cn.close()
+    _ensured_databases.add(database)
+
+
+def is_healthy(connection):
+    """Vérifie la connexion par un ping léger (COM_PING, sans reconnexion)."""
+    if connection is None:
+        return False
+    try:
+        connection.ping(reconnect=False)
+        return True
+    except Error:
+        return False
+
+
+def reset_pools():
+    """Oublie les pools existants (ex: après un fork)."""
+    with _lock:
+        _pools.clear()
+        _ensured_databases.clear()
@@ -0,0 +1,122 @@
+"""
+Sauvegarde des produits scrapés, quel que soit le backend (DB_BACKEND).
+
+Séparé de database/mysql_connector.py pour que scrapers, scheduler et outils
+fonctionnent avec DB_BACKEND=sqlite sur une machine sans pilote MySQL: le
+connecteur est choisi par get_connector, qui n'importe MySQL qu'à la demande.
+
+    save_to_database("hp_servers.json", "serveurs", "HP")
+    save_products(products, "serveurs", "HP", db=connecteur_deja_ouvert)
+    deactivate_missing_products(products, "serveurs", "HP")   # après un écrivain en flux
+"""
+import json
+import logging
+import os
+
+from database.common import _link_hash, get_connector
+from database.config import DB_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Mode de chargement de save_to_database: 'upsert' (insert_products) ou 'load_data' (TSV + LOAD DATA, MySQL)
+DB_LOAD_MODE = os.getenv('DB_LOAD_MODE', 'upsert').strip().lower()
+
+
+def save_products(products_data, table_name, brand_filter=None, load_mode=None, db=None):
+    """
+    Sauvegarde une liste de produits déjà chargée en mémoire
+
+    `db`: connecteur déjà connecté (create_tables fait) à réutiliser, ex: celui du
+    scheduler; sinon un connecteur est ouvert puis rendu pour cet appel.
+    load_mode='load_data' passe par un TSV + LOAD DATA LOCAL INFILE (ré-imports massifs);
+    'upsert' (défaut, DB_LOAD_MODE) utilise insert_products.
+    """
+    own_db = db is None
+    try:
+        if own_db:
+            # Initialiser le connecteur du backend configuré (DB_BACKEND)
+            db = get_connector()
+
+            # Se connecter à la base (pool partagé: pas de nouvelle poignée de main si déjà ouvert)
+            if not db.connect():
+                logger.error(f"❌ Impossible de se connecter à la base ({DB_BACKEND})")
+                return False
+
+            # Créer les tables (schéma incomplet: on n'écrit pas)
+            if not db.create_tables():
+                logger.error("❌ Schéma de base incomplet, sauvegarde annulée")
+                return False
+
+        # Filtrer par marque si spécifié
+        if brand_filter:
+            products_data = [p for p in products_data if p.get('brand', '').lower() == brand_filter.lower()]
+
+        # Sauvegarder en base (LOAD DATA: MySQL seulement, upsert sinon)
+        bulk = (load_mode or DB_LOAD_MODE) == 'load_data' and hasattr(db, 'load_products_bulk')
+        if bulk:
+            db.load_products_bulk(products_data, table_name)
+        else:
+            db.insert_products(products_data, table_name)
+
+        # Désactiver les produits non vus de la même marque (si brand_filter fourni et si activé)
+        if brand_filter:
+            _deactivate_unseen(db, products_data, table_name, brand_filter)
+
+        stats = db.last_upsert_stats
+        logger.info(
+            f"✅ Sauvegarde terminée: {stats['new']} nouveaux, {stats['changed']} modifiés, "
+            f"{stats['unchanged']} inchangés"
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la sauvegarde: {e}")
+        return False
+    finally:
+        if own_db and db:
+            db.close()
+
+def _deactivate_unseen(db, products_data, table_name, brand):
+    if os.getenv('ENABLE_DEACTIVATE_MISSING', 'true').lower() != 'true':
+        logger.info(f"⏭️ Désactivation des produits non vus SKIPPED (ENABLE_DEACTIVATE_MISSING=false) pour {table_name}:{brand}")
+        return
+    current_skus = {p.get('sku') for p in products_data if p.get('sku')}
+    current_link_hashes = {_link_hash(p.get('link')) for p in products_data if p.get('link')}
+    db.deactivate_missing(table_name, brand, current_skus, current_link_hashes)
+
+
+def deactivate_missing_products(products_data, table_name, brand):
+    """Désactive seulement les produits de `brand` absents de products_data.
+
+    Fin d'un run dont les produits sont déjà partis en base par l'écrivain en flux
+    (database/async_writer.py): pas de second upsert des mêmes lignes.
+    """
+    db = get_connector()
+    try:
+        if not db.connect():
+            logger.error(f"❌ Impossible de se connecter à la base ({DB_BACKEND})")
+            return False
+        _deactivate_unseen(db, products_data, table_name, brand)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la désactivation des produits non vus: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def save_to_database(json_file_path, table_name, brand_filter=None, load_mode=None):
+    """
+    Fonction utilitaire pour sauvegarder un fichier JSON en base (voir save_products)
+    """
+    try:
+        # Charger les données JSON
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            products_data = json.load(f)
+    except FileNotFoundError:
+        logger.error(f"❌ Fichier JSON non trouvé: {json_file_path}")
+        return False
+    except json.JSONDecodeError:
+        logger.error(f"❌ Fichier JSON invalide: {json_file_path}")
+        return False
+    return save_products(products_data, table_name, brand_filter, load_mode)
@@ -0,0 +1,478 @@
+"""
+Backend SQLite embarqué, même interface que MySQLConnector.
+
+Activé par DB_BACKEND=sqlite (fichier SQLITE_PATH). Permet de faire tourner le pipeline,
+les tests et les benchmarks DB sans serveur MySQL ni pilote mysql-connector (helpers partagés
+dans database.common): WAL, transactions par lot, JSON1 pour tech_specs, clés uniques
+(brand, sku) et (brand, link_hash). Requiert SQLite >= 3.35 (UPSERT sans cible de conflit,
+colonnes générées).
+"""
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+from database.config import SQLITE_CONFIG
+from database.common import (
+    DB_PAGE_SIZE,
+    DB_PRODUCT_HISTORY,
+    DB_UPSERT_BATCH_SIZE,
+    DEACTIVATE_STAGING_CHUNK,
+    PRODUCT_COLUMNS,
+    PRODUCT_TABLES,
+    _COL,
+    _classify_rows,
+    _known_rows,
+    _load_specs,
+    _product_row,
+    indexed_spec_keys,
+    spec_column_name,
+    spec_delta,
+)
+
+logger = logging.getLogger(__name__)
+
+# Version du schéma SQLite (PRAGMA user_version)
+SQLITE_SCHEMA_VERSION = 1
+
+PRODUCT_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        brand TEXT NOT NULL,
+        link TEXT NOT NULL,
+        name TEXT NOT NULL,
+        sku TEXT NULL,
+        link_hash TEXT NULL,
+        tech_specs TEXT CHECK (tech_specs IS NULL OR json_valid(tech_specs)),
+        description TEXT,
+        scraped_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        datasheet_link TEXT,
+        image_url TEXT,
+        ai_processed INTEGER DEFAULT 0,
+        ai_processed_at TEXT NULL,
+        is_active INTEGER NOT NULL DEFAULT 1,
+        last_seen TEXT DEFAULT CURRENT_TIMESTAMP,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        content_hash TEXT NULL,
+        UNIQUE (brand, sku),
+        UNIQUE (brand, link_hash)
+    )
+"""
+
+PRODUCT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_{table}_brand_id ON {table} (brand, id)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at)",
+]
+
+HISTORY_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS product_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_table TEXT NOT NULL,
+        product_id INTEGER NOT NULL,
+        changed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        delta TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_history_product ON product_history (product_table, product_id, id)",
+]
+
+# Pas de ON DUPLICATE KEY: UPSERT SQLite, la dernière clause sans cible couvre les deux clés uniques.
+# Les produits inchangés sont filtrés en amont (content_hash), seules les lignes nouvelles/modifiées arrivent ici.
+UPSERT_UPDATE_CLAUSE = """
+    sku = excluded.sku,
+    link_hash = excluded.link_hash,
+    tech_specs = excluded.tech_specs,
+    scraped_at = excluded.scraped_at,
+    datasheet_link = excluded.datasheet_link,
+    image_url = excluded.image_url,
+    ai_processed = excluded.ai_processed,
+    ai_processed_at = excluded.ai_processed_at,
+    is_active = 1,
+    last_seen = CURRENT_TIMESTAMP,
+    updated_at = CURRENT_TIMESTAMP,
+    content_hash = excluded.content_hash
+"""
+
+_SPEC_COLUMN_TYPES = {'num': 'REAL', 'text': 'TEXT'}
+
+# Descripteur de schéma par fichier: {table: {colonnes}}, rempli une fois par processus
+_schema_cache = {}
+
+
+def _spec_column_expr(key, kind):
+    path = f"'$.{key}'"
+    if kind == 'num':
+        return (
+            f"REAL GENERATED ALWAYS AS (CASE WHEN json_type(tech_specs, {path}) IN ('integer', 'real') "
+            f"THEN json_extract(tech_specs, {path}) END) VIRTUAL"
+        )
+    return f"TEXT GENERATED ALWAYS AS (substr(json_extract(tech_specs, {path}), 1, 100)) VIRTUAL"
+
+
+class SQLiteConnector:
+    def __init__(self, config=None):
+        self.config = config or SQLITE_CONFIG.copy()
+        self.connection = None
+        # Bilan du dernier insert_products: {'new', 'changed', 'unchanged'}
+        self.last_upsert_stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+        # Produits désactivés par le dernier deactivate_missing
+        self.last_deactivated = 0
+
+    def connect(self):
+        """Ouvre le fichier SQLite en mode WAL (lecteurs non bloqués par l'écrivain)."""
+        try:
+            path = self.config['path']
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            # isolation_level=None: transactions explicites (BEGIN IMMEDIATE ... COMMIT) par lot
+            # check_same_thread=False: un connecteur partagé (scheduler) est utilisé sous verrou par plusieurs threads
+            self.connection = sqlite3.connect(
+                path, timeout=self.config.get('timeout', 30), isolation_level=None, check_same_thread=False
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA foreign_keys=ON")
+            logger.info(f"✅ Connexion SQLite réussie - Fichier: {path}")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"❌ Erreur de connexion SQLite: {e}")
+            return False
+
+    def _ensure_connection(self):
+        if self.connection is None:
+            return self.connect()
+        return True
+
+    def describe(self):
+        return f"fichier={self.config['path']}"
+
+    def create_tables(self):
+        """Crée les tables, index, historique et colonnes générées (une fois par processus); False si échec."""
+        self._ensure_connection()
+        path = self.config['path']
+        if path in _schema_cache:
+            return True
+        try:
+            cur = self.connection.cursor()
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            if version < SQLITE_SCHEMA_VERSION:
+                cur.execute("BEGIN IMMEDIATE")
+                for table_name in PRODUCT_TABLES:
+                    cur.execute(PRODUCT_TABLE_DDL.format(table=table_name))
+                    for stmt in PRODUCT_INDEXES:
+                        cur.execute(stmt.format(table=table_name))
+                    logger.info(f"✅ Table '{table_name}' créée/vérifiée")
+                for stmt in HISTORY_DDL:
+                    cur.execute(stmt)
+                cur.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+                cur.execute("COMMIT")
+            schema = self._load_schema(cur)
+            if self._sync_spec_columns(cur, schema):
+                self._load_schema(cur)
+            cur.close()
+            return True
+        except sqlite3.Error as e:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            logger.error(f"❌ Erreur création tables: {e}")
+            return False
+
+    def _sync_spec_columns(self, cur, schema):
+        """Colonnes générées indexées pour FIELD_POLICY[...]['indexed'] (équivalent MySQL)."""
+        changed = False
+        for table_name in PRODUCT_TABLES:
+            existing = schema.get(table_name, set())
+            for key, kind in indexed_spec_keys(table_name).items():
+                column = spec_column_name(key)
+                if column in existing:
+                    continue
+                try:
+                    cur.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {_spec_column_expr(key, kind)}")
+                    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {table_name} ({column})")
+                    logger.info(f"🔧 {table_name}: colonne générée indexée {column} ajoutée")
+                    changed = True
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ {table_name}: colonne générée {column} ignorée: {e}")
+        return changed
+
+    def _load_schema(self, cur):
+        schema = {}
+        for table_name in PRODUCT_TABLES:
+            # table_xinfo (et non table_info) liste aussi les colonnes générées
+            rows = cur.execute(f"PRAGMA table_xinfo({table_name})").fetchall()
+            schema[table_name] = {row[1] for row in rows}
+        _schema_cache[self.config['path']] = schema
+        return schema
+
+    def table_columns(self, table_name):
+        schema = _schema_cache.get(self.config['path'])
+        if schema is None:
+            self._ensure_connection()
+            schema = self._load_schema(self.connection.cursor())
+        return schema.get(table_name, set())
+
+    def insert_products(self, products_data, table_name, batch_size=None):
+        """
+        Upsert des produits dans une seule transaction, par lots executemany.
+        Même contrat que MySQLConnector.insert_products (content_hash, historique, last_upsert_stats).
+        """
+        self._ensure_connection()
+        if batch_size is None:
+            batch_size = DB_UPSERT_BATCH_SIZE
+        batch_size = batch_size if batch_size > 0 else 1
+
+        has_description = 'description' in self.table_columns(table_name)
+        columns = PRODUCT_COLUMNS + (('description',) if has_description else ())
+        query = f"""
+            INSERT INTO {table_name} ({', '.join(columns)})
+            VALUES ({', '.join(['?'] * len(columns))})
+            ON CONFLICT DO UPDATE SET {UPSERT_UPDATE_CLAUSE}
+        """
+        rows = [_product_row(product, has_description) for product in products_data]
+
+        cur = self.connection.cursor()
+        try:
+            # BEGIN IMMEDIATE: classement et écriture sous le même verrou d'écriture
+            cur.execute("BEGIN IMMEDIATE")
+            # Valeurs de ligne SQLite: IN (VALUES (?, ?), ...) sur les clés du lot seulement
+            known = _known_rows(cur, table_name, rows, lambda n: f"(VALUES {', '.join(['(?, ?)'] * n)})")
+            stats, to_write, unchanged_ids, changed = _classify_rows(rows, known)
+
+            if changed and DB_PRODUCT_HISTORY:
+                self._record_history(cur, table_name, changed)
+
+            for start in range(0, len(unchanged_ids), DEACTIVATE_STAGING_CHUNK):
+                chunk = unchanged_ids[start:start + DEACTIVATE_STAGING_CHUNK]
+                cur.execute(
+                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP WHERE id IN ({', '.join(['?'] * len(chunk))})",
+                    chunk
+                )
+            for start in range(0, len(to_write), batch_size):
+                cur.executemany(query, to_write[start:start + batch_size])
+            cur.execute("COMMIT")
+
+            self.last_upsert_stats = stats
+            logger.info(
+                f"✅ '{table_name}': {stats['new']} nouveaux, {stats['changed']} modifiés, "
+                f"{stats['unchanged']} inchangés (last_seen seulement)"
+            )
+            return stats['new'], stats['changed'] + stats['unchanged']
+        except sqlite3.Error as e:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            logger.error(f"❌ Erreur insertion dans {table_name}: {e}")
+            return 0, 0
+        finally:
+            cur.close()
+
+    # Un seul fichier local: l'upsert transactionnel par lots est déjà le chemin le plus rapide
+    load_products_bulk = insert_products
+
+    def _record_history(self, cur, table_name, changed):
+        new_specs = {row_id: values[_COL['tech_specs']] for row_id, values in changed}
+        ids = list(new_specs)
+        history = []
+        for start in range(0, len(ids), DEACTIVATE_STAGING_CHUNK):
+            chunk = ids[start:start + DEACTIVATE_STAGING_CHUNK]
+            fetched = cur.execute(
+                f"SELECT id, tech_specs FROM {table_name} WHERE id IN ({', '.join(['?'] * len(chunk))})",
+                chunk
+            ).fetchall()
+            for row_id, old_raw in fetched:
+                delta = spec_delta(_load_specs(old_raw), _load_specs(new_specs[row_id]))
+                if delta:
+                    history.append((table_name, row_id, json.dumps(delta, ensure_ascii=False)))
+        if history:
+            cur.executemany(
+                "INSERT INTO product_history (product_table, product_id, delta) VALUES (?, ?, ?)",
+                history
+            )
+            logger.info(f"🕓 {table_name}: {len(history)} versions de specs historisées")
+
+    def product_history(self, table_name, product_id):
+        """Specs courantes et deltas (du plus récent au plus ancien) d'un produit."""
+        self._ensure_connection()
+        row = self.connection.execute(f"SELECT tech_specs FROM {table_name} WHERE id = ?", (product_id,)).fetchone()
+        if row is None:
+            return None, []
+        fetched = self.connection.execute(
+            "SELECT id, changed_at, delta FROM product_history WHERE product_table = ? AND product_id = ? ORDER BY id DESC",
+            (table_name, product_id)
+        ).fetchall()
+        deltas = [(hid, datetime.fromisoformat(changed_at), _load_specs(delta)) for hid, changed_at, delta in fetched]
+        return _load_specs(row[0]), deltas
+
+    def get_products(self, table_name, brand=None):
+        """Récupère les produits d'une table (tout en mémoire; préférer iter_products pour un parcours complet)"""
+        self._ensure_connection()
+        try:
+            cur = self.connection.cursor()
+            cur.row_factory = sqlite3.Row
+            if brand:
+                cur.execute(f"SELECT * FROM {table_name} WHERE brand = ? ORDER BY created_at DESC", (brand,))
+            else:
+                cur.execute(f"SELECT * FROM {table_name} ORDER BY created_at DESC")
+            products = [dict(row) for row in cur.fetchall()]
+            cur.close()
+            for product in products:
+                if product.get('tech_specs'):
+                    product['tech_specs'] = _load_specs(product['tech_specs'])
+            return products
+        except sqlite3.Error as e:
+            logger.error(f"❌ Erreur récupération depuis {table_name}: {e}")
+            return []
+
+    def iter_products(self, table_name, brand=None, columns=None, page_size=None, decode_specs=True):
+        """Parcours en flux, pagination par clé sur (brand, id) — cf. MySQLConnector.iter_products."""
+        self._ensure_connection()
+        page_size = page_size or DB_PAGE_SIZE
+        if columns:
+            known = self.table_columns(table_name)
+            unknown = [c for c in columns if c not in known]
+            if unknown:
+                raise ValueError(f"Colonnes inconnues pour {table_name}: {unknown}")
+            select_cols = ', '.join(dict.fromkeys(['id', 'brand', *columns]))
+        else:
+            select_cols = '*'
+
+        cur = self.connection.cursor()
+        cur.row_factory = sqlite3.Row
+        try:
+            last_brand, last_id = None, 0
+            while True:
+                if brand:
+                    cur.execute(
+                        f"SELECT {select_cols} FROM {table_name} WHERE brand = ? AND id > ? ORDER BY id LIMIT ?",
+                        (brand, last_id, page_size)
+                    )
+                elif last_brand is None:
+                    cur.execute(f"SELECT {select_cols} FROM {table_name} ORDER BY brand, id LIMIT ?", (page_size,))
+                else:
+                    cur.execute(
+                        f"""
+                        SELECT {select_cols} FROM {table_name}
+                        WHERE (brand, id) > (?, ?)
+                        ORDER BY brand, id LIMIT ?
+                        """,
+                        (last_brand, last_id, page_size)
+                    )
+                fetched = 0
+                for sqlite_row in cur:
+                    row = dict(sqlite_row)
+                    fetched += 1
+                    last_brand, last_id = row['brand'], row['id']
+                    if decode_specs and isinstance(row.get('tech_specs'), (str, bytes)):
+                        row['tech_specs'] = _load_specs(row['tech_specs'])
+                    yield row
+                if fetched < page_size:
+                    break
+        finally:
+            cur.close()
+
+    def list_products(self, table_name, brand=None, limit=10, filters=None):
+        """Aperçu des derniers produits (db_cli list). filters: [(colonne spec_*, opérateur, valeur)]."""
+        self._ensure_connection()
+        conditions = []
+        params = []
+        if brand:
+            conditions.append("brand = ?")
+            params.append(brand)
+        for column, op, value in filters or []:
+            conditions.append(f"{column} {op} ?")
+            params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cur = self.connection.cursor()
+        cur.row_factory = sqlite3.Row
+        try:
+            cur.execute(
+                f"""
+                SELECT id, brand, name, sku,
+                       (SELECT COUNT(*) FROM json_each({table_name}.tech_specs)) AS spec_keys,
+                       is_active, strftime('%Y-%m-%d %H:%M', scraped_at) AS scraped_at,
+                       substr(link, 1, 128) AS link
+                FROM {table_name}
+                {where}
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (*params, limit)
+            )
+            return [dict(row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+
+    def brand_counts(self, table_name):
+        self._ensure_connection()
+        return self.connection.execute(
+            f"SELECT brand, COUNT(*) AS cnt FROM {table_name} GROUP BY brand ORDER BY cnt DESC, brand ASC"
+        ).fetchall()
+
+    def deactivate_missing(self, table_name, brand, current_skus, current_link_hashes, mode=None):
+        """Désactive les produits de la marque absents du lot courant (table temporaire + sous-requêtes, une transaction).
+
+        Retourne le nombre de produits passés inactifs (aussi dans self.last_deactivated).
+        """
+        self._ensure_connection()
+        self.last_deactivated = 0
+        if not brand:
+            logger.warning("⚠️ deactivate_missing: brand non spécifié, opération ignorée")
+            return 0
+        deactivated = 0
+        cur = self.connection.cursor()
+        try:
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS run_keys (key_type INTEGER NOT NULL, key_val TEXT NOT NULL, PRIMARY KEY (key_type, key_val))")
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("DELETE FROM run_keys")
+            # 1 = SKU, 2 = link_hash
+            cur.executemany(
+                "INSERT OR IGNORE INTO run_keys (key_type, key_val) VALUES (?, ?)",
+                [(1, sku) for sku in current_skus] + [(2, lh) for lh in current_link_hashes]
+            )
+            if current_skus:
+                cur.execute(
+                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP "
+                    f"WHERE brand = ? AND sku IN (SELECT key_val FROM run_keys WHERE key_type = 1)",
+                    (brand,)
+                )
+            if current_link_hashes:
+                cur.execute(
+                    f"UPDATE {table_name} SET is_active = 1, last_seen = CURRENT_TIMESTAMP "
+                    f"WHERE brand = ? AND (sku IS NULL OR sku = '') AND link_hash IN (SELECT key_val FROM run_keys WHERE key_type = 2)",
+                    (brand,)
+                )
+            # Aucun SKU dans ce lot: pas de désactivation en masse par SKU
+            if current_skus:
+                cur.execute(
+                    f"UPDATE {table_name} SET is_active = 0 "
+                    f"WHERE brand = ? AND is_active = 1 AND sku IS NOT NULL AND sku <> '' "
+                    f"AND sku NOT IN (SELECT key_val FROM run_keys WHERE key_type = 1)",
+                    (brand,)
+                )
+                deactivated += cur.rowcount
+            if current_link_hashes:
+                cur.execute(
+                    f"UPDATE {table_name} SET is_active = 0 "
+                    f"WHERE brand = ? AND is_active = 1 AND (sku IS NULL OR sku = '') AND link_hash IS NOT NULL AND link_hash <> '' "
+                    f"AND link_hash NOT IN (SELECT key_val FROM run_keys WHERE key_type = 2)",
+                    (brand,)
+                )
+                deactivated += cur.rowcount
+            cur.execute("COMMIT")
+            self.last_deactivated = deactivated
+            logger.info(f"🟡 {table_name}:{brand} - désactivation des produits non vus terminée ({deactivated} désactivés)")
+        except sqlite3.Error as e:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            logger.error(f"❌ Erreur désactivation des produits manquants: {e}")
+        finally:
+            cur.close()
+        return self.last_deactivated
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            logger.info("✅ Connexion SQLite fermée")
@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,17 +12,22 @@ import random
 
 # Ajouter le chemin du module database
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database.mysql_connector import save_to_database
+from database.save import save_to_database
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
 
 # ✅ CONFIGURATION EPSON SCANNERS
 BRAND = "EPSON"
 OUTPUT_JSON = "epson_scanners_full.json"
-CHROMEDRIVER_PATH = os.path.join(os.path.dirname(__file__), "..", "chromedriver.exe")
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").lower() == "true"
 JITTER_RANGE = (0.8, 1.6)
 # Si lancé par le scheduler, on laisse le scheduler gérer l'insertion DB pour éviter les doublons
 RUNNING_UNDER_SCHEDULER = os.getenv("RUNNING_UNDER_SCHEDULER", "0") in {"1", "true", "True"}
 ENABLE_DB = (os.getenv("ENABLE_DB", "false").lower() == "true") and not RUNNING_UNDER_SCHEDULER  # Laisser à false en test
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest(BRAND, "imprimantes_scanners")
+# Journal de reprise (SCRAPER_CHECKPOINT_DIR): produits déjà extraits
+CHECKPOINT = Checkpoint("epson_scanners")
 MAX_PRODUCTS = int(os.getenv("MAX_PRODUCTS", "0"))  # 0 = pas de limite
 
 # Delais
@@ -41,28 +44,9 @@ BASE_URLS = {
 def setup_driver():
     """Configuration du driver Chrome avec options anti-détection"""
     try:
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        if HEADLESS_MODE:
-            options.add_argument("--headless=new")
-
-        # Utiliser Selenium Manager par défaut; fallback local si nécessaire
-        try:
-            driver = webdriver.Chrome(options=options)
-        except Exception:
-            if os.path.exists(CHROMEDRIVER_PATH):
-                service = Service(CHROMEDRIVER_PATH)
-                driver = webdriver.Chrome(service=service, options=options)
-            else:
-                raise
+        # Profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+        driver = create_driver(manifest=MANIFEST)
 
-        # Anti-détection
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         driver.implicitly_wait(10)
         return driver
     except Exception as e:
@@ -368,10 +352,16 @@ def scrape_epson_scanners():
         # Extraction détails
         for i, info in enumerate(deduped, 1):
             print(f"\n📦 Traitement produit {i}/{len(deduped)}")
+            # Produit déjà extrait lors d'un run interrompu: pas de nouvelle visite PDP
+            done = CHECKPOINT.product(info['url'])
+            if done is not None:
+                all_products.append(done)
+                continue
             try:
                 details = extract_product_details(driver, info)
                 if details:
                     all_products.append(details)
+                    CHECKPOINT.add_product(details)
                     print("✅ Produit traité")
                 else:
                     print("❌ Échec produit")
@@ -398,6 +388,8 @@ def save_results(products_data):
         json_path = os.path.join(os.path.dirname(__file__), "..", OUTPUT_JSON)
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(products_data, f, indent=2, ensure_ascii=False)
+        MANIFEST.finish(json_path, len(products_data))
+        CHECKPOINT.complete()
         print(f"✅ Données sauvées en JSON: {json_path}")
 
         if ENABLE_DB:
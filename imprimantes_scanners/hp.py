@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,14 +12,19 @@ from urllib.parse import urlparse, parse_qs
 
 # Ajouter le chemin du module database
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database.mysql_connector import save_to_database
+from database.save import save_to_database
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
 
 # ✅ CONFIGURATION HP IMPRIMANTES & SCANNERS (mix sur même page)
 BRAND = "HP"
 OUTPUT_JSON = "hp_printers_scanners_schema.json"
-CHROMEDRIVER_PATH = os.path.join(os.path.dirname(__file__), "..", "chromedriver.exe")
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").lower() == "true"
 ENABLE_DB = os.getenv("ENABLE_DB", "false").lower() == "true"
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest(BRAND, "imprimantes_scanners")
+# Journal de reprise (SCRAPER_CHECKPOINT_DIR): produits déjà extraits
+CHECKPOINT = Checkpoint("hp_printers_scanners")
 HP_MAX_PRODUCTS = int(os.getenv("HP_MAX_PRODUCTS", "0"))  # 0 = pas de limite
 DELAY_FOR_PAGE_LOAD = 3
 
@@ -48,28 +51,9 @@ DELAY_FOR_PAGE_LOAD = 2
 def setup_driver():
     """Configuration du driver Chrome avec options anti-détection"""
     try:
-        options = webdriver.ChromeOptions()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        if HEADLESS_MODE:
-            options.add_argument("--headless=new")
-
-        # Utiliser Selenium Manager par défaut; fallback local si nécessaire
-        try:
-            driver = webdriver.Chrome(options=options)
-        except Exception:
-            if os.path.exists(CHROMEDRIVER_PATH):
-                service = Service(CHROMEDRIVER_PATH)
-                driver = webdriver.Chrome(service=service, options=options)
-            else:
-                raise
+        # Profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+        driver = create_driver(manifest=MANIFEST)
 
-        # Anti-détection
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         driver.implicitly_wait(10)
         print("✅ Driver Chrome initialisé")
         return driver
@@ -422,6 +406,11 @@ def scrape_all_hp_products():
         links = extract_products_from_listing(driver, PRINTER_SCANNER_LISTING)
         total = len(links)
         for i, url in enumerate(links, 1):
+            # Produit déjà extrait lors d'un run interrompu: pas de nouvelle visite PDP
+            done = CHECKPOINT.product(url)
+            if done is not None:
+                all_products.append(done)
+                continue
             info = extract_hp_product_schema_info(driver, url, i, total)
             if not info:
                 continue
@@ -430,6 +419,7 @@ def scrape_all_hp_products():
                 print("⏭️ Accessoire ignoré")
                 continue
             all_products.append(info)
+            CHECKPOINT.add_product(info)
             time.sleep(1)
 
         # Déduplication (SKU prioritaire, sinon URL sans fragment)
@@ -456,6 +446,8 @@ if __name__ == "__main__":
             out_path = os.path.join(os.path.dirname(__file__), "..", OUTPUT_JSON)
             with open(out_path, "w", encoding="utf-8") as f:
                 json.dump(products, f, ensure_ascii=False, indent=2)
+            MANIFEST.finish(out_path, len(products))
+            CHECKPOINT.complete()
             print(f"💾 Données HP sauvegardées dans {out_path}")
 
             specs_ok = sum(1 for p in products if p.get('tech_specs'))
@@ -479,3 +471,4 @@ if __name__ == "__main__":
             print("⚠️ Aucun produit HP extrait")
     except Exception as e:
         print(f"❌ Erreur fatale HP: {e}")
+        MANIFEST.error(e)
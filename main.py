@@ -67,8 +67,11 @@ def setup_database():
         db = MySQLConnector()
         db.create_database()
         if db.connect():
-            db.create_tables()
+            ready = db.create_tables()
             db.close()
+            if not ready:
+                logger.error("❌ Schéma de base incomplet (migrations en échec)")
+                return False
             logger.info("✅ Base de données configurée")
             return True
         else:
@@ -139,7 +142,7 @@ def main():
     
     parser.add_argument(
         '--mode', 
-        choices=['setup', 'scrape', 'schedule', 'ai-process'],
+        choices=['setup', 'scrape', 'schedule', 'worker', 'ai-process'],
         default='setup',
         help='Mode d\'exécution'
     )
@@ -194,6 +197,7 @@ def main():
         logger.info("\n📖 Utilisation:")
         logger.info("  python main.py --mode scrape --brand asus --category serveurs")
         logger.info("  python main.py --mode schedule")
+        logger.info("  python main.py --mode worker")
         logger.info("  python main.py --mode ai-process --input-file data.json")
         
         return 0
@@ -221,6 +225,16 @@ def main():
             logger.error(f"❌ Erreur scheduler: {e}")
             return 1
     
+    # Mode worker - Exécution des jobs du scheduler distribué (SCHEDULER_DISTRIBUTED=true)
+    elif args.mode == 'worker':
+        try:
+            from automation.worker import Worker
+            Worker().run()
+            return 0
+        except Exception as e:
+            logger.error(f"❌ Erreur worker: {e}")
+            return 1
+    
     # Mode ai-process - Traitement IA
     elif args.mode == 'ai-process':
         if not args.input_file:
@@ -0,0 +1 @@
+"""Utilitaires partagés par les scrapers (manifeste de run, ...)."""
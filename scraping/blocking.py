@@ -0,0 +1,187 @@
+"""
+Blocage réseau (CDP Network.setBlockedURLs) des ressources inutiles au scraping.
+
+Trackers, analytics, widgets de chat et vidéos retardent `readyState=complete`
+et gonflent la mémoire des longs runs sans rien apporter aux données. La liste
+est organisée par site (BLOCKLISTS); les motifs tiers s'appliquent partout, les
+motifs propres à un site portent son domaine et ne touchent que lui.
+Extensible sans code par SCRAPER_BLOCKLIST_FILE (JSON {"site": ["motif", ...]}).
+
+Les requêtes bloquées sont relevées dans le journal « performance » de
+chromedriver (Network.loadingFailed) et comptées dans le manifeste de run;
+les octets évités sont estimés par la taille moyenne des ressources du même
+type réellement chargées pendant le run.
+
+    blocker = RequestBlocker(driver, manifest=MANIFEST).apply()
+    ...
+    blocker.report()
+"""
+import json
+import os
+from collections import Counter
+from urllib.parse import urlparse
+
+# Trackers / analytics / chat / vidéos (false: seules polices et médias restent bloqués)
+SCRAPER_BLOCK_TRACKERS = os.getenv("SCRAPER_BLOCK_TRACKERS", "true").strip().lower() in {"1", "true", "yes", "on"}
+SCRAPER_BLOCKLIST_FILE = os.getenv("SCRAPER_BLOCKLIST_FILE")
+
+# Polices et médias: jamais lus par les scrapers
+RESOURCE_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg",
+]
+
+BLOCKLISTS = {
+    # Tiers communs à tous les sites
+    "*": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+        "*facebook.net*", "*connect.facebook.com*", "*bat.bing.com*", "*clarity.ms*",
+        "*hotjar.com*", "*contentsquare.net*", "*quantummetric.com*", "*mouseflow.com*",
+        "*demdex.net*", "*omtrdc.net*", "*everesttech.net*", "*adsrvr.org*", "*linkedin.com/px*",
+        "*snap.licdn.com*", "*tiktok.com/i18n/pixel*", "*twitter.com/i/adsct*",
+        "*youtube.com/embed*", "*ytimg.com*", "*players.brightcove.net*", "*vimeo.com*",
+        "*liveperson.net*", "*lpsnmedia.net*", "*salesforceliveagent.com*", "*zopim.com*", "*intercom.io*",
+        "*qualtrics.com*", "*medallia.com*", "*kampyle.com*", "*foresee.com*",
+    ],
+    "dell.com": [
+        "*nexus.ensighten.com*", "*dell.com/*/chat/*", "*dell.com/*/csbapi/*", "*mktg.dell.com*",
+    ],
+    "hp.com": [
+        "*tags.tiqcdn.com*", "*hp.com/*/webchat*", "*hpanalytics.net*", "*siteintercept.qualtrics.com*",
+    ],
+    "lenovo.com": [
+        "*lenovo.com/*/chatbot*", "*zowie.ai*", "*lenovo.com/*/tracking/*", "*bazaarvoice.com*",
+    ],
+    "epson.com": [
+        "*bazaarvoice.com*", "*epson.com/*/livechat*", "*yottaa.net*",
+    ],
+}
+
+# Taille par défaut (octets) d'une ressource bloquée, par type CDP, avant mesure du run
+DEFAULT_TYPE_BYTES = {
+    "Script": 60_000, "Image": 40_000, "Font": 35_000, "Media": 500_000,
+    "XHR": 5_000, "Fetch": 5_000, "Stylesheet": 25_000, "Document": 50_000, "Other": 10_000,
+}
+
+
+def blocklist(site=None):
+    """Motifs à bloquer: communs + ceux du site (ou de tous les sites si non précisé)."""
+    lists = dict(BLOCKLISTS)
+    if SCRAPER_BLOCKLIST_FILE:
+        with open(SCRAPER_BLOCKLIST_FILE, "r", encoding="utf-8") as f:
+            for key, patterns in json.load(f).items():
+                lists[key] = lists.get(key, []) + list(patterns)
+    # Site inconnu: motifs communs seulement; sans site: tous les sites
+    keys = ["*"] + ([site] if site else [k for k in lists if k != "*"])
+    patterns = []
+    for key in keys:
+        for pattern in lists.get(key, []):
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+def logging_capabilities(options):
+    """Active le journal « performance » (événements Network) nécessaire au comptage."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+class RequestBlocker:
+    def __init__(self, driver, site=None, manifest=None, trackers=None):
+        self.driver = driver
+        self.manifest = manifest
+        trackers = SCRAPER_BLOCK_TRACKERS if trackers is None else trackers
+        self.patterns = RESOURCE_PATTERNS + (blocklist(site) if trackers else [])
+        self.blocked = Counter()         # par type CDP
+        self.blocked_hosts = Counter()
+        self.loaded_bytes = Counter()    # par type CDP (ressources chargées)
+        self.loaded_count = Counter()
+        self._types = {}
+        self._urls = {}
+        self._started = {}               # requêtes en cours -> horodatage (ms), pour scraping/waits.network_idle
+        self.last_activity = 0.0         # horodatage (ms) du dernier événement réseau
+        self._logging = True
+
+    def apply(self):
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        except Exception as e:
+            print(f"⚠️ Blocage réseau indisponible: {e}")
+        return self
+
+    @property
+    def logging(self):
+        return self._logging
+
+    def inflight(self, max_age_ms=None):
+        """Requêtes sans réponse; max_age_ms ignore les plus anciennes (long polling, websockets)."""
+        if max_age_ms is None:
+            return len(self._started)
+        newest = max(self.last_activity, max(self._started.values(), default=0))
+        return sum(1 for ts in self._started.values() if newest - ts <= max_age_ms)
+
+    def collect(self):
+        """Vide le journal performance de chromedriver et met à jour les compteurs."""
+        if not self._logging:
+            return
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            # Journal non activé (driver attaché sans capacité de log): pas de comptage
+            self._logging = False
+            return
+        for entry in entries:
+            self.last_activity = max(self.last_activity, entry.get("timestamp") or 0)
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params") or {}
+            rid = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                self._started[rid] = entry.get("timestamp") or 0
+                self._types[rid] = params.get("type", "Other")
+                self._urls[rid] = (params.get("request") or {}).get("url", "")
+            elif method == "Network.loadingFinished":
+                rtype = self._types.pop(rid, "Other")
+                self._urls.pop(rid, None)
+                self._started.pop(rid, None)
+                self.loaded_bytes[rtype] += params.get("encodedDataLength") or 0
+                self.loaded_count[rtype] += 1
+            elif method == "Network.loadingFailed":
+                rtype = params.get("type") or self._types.get(rid, "Other")
+                url = self._urls.pop(rid, "")
+                self._types.pop(rid, None)
+                self._started.pop(rid, None)
+                if params.get("blockedReason") or "BLOCKED_BY_CLIENT" in (params.get("errorText") or ""):
+                    self.blocked[rtype] += 1
+                    self.blocked_hosts[urlparse(url).netloc or "?"] += 1
+        if self.manifest is not None:
+            self.manifest.count("blocked_requests", sum(self.blocked.values()))
+            self.manifest.count("blocked_bytes_estimated", self.estimated_bytes())
+
+    def estimated_bytes(self):
+        total = 0
+        for rtype, n in self.blocked.items():
+            if self.loaded_count[rtype]:
+                avg = self.loaded_bytes[rtype] / self.loaded_count[rtype]
+            else:
+                avg = DEFAULT_TYPE_BYTES.get(rtype, DEFAULT_TYPE_BYTES["Other"])
+            total += n * avg
+        return int(total)
+
+    def report(self):
+        self.collect()
+        if not self._logging:
+            return
+        blocked = sum(self.blocked.values())
+        loaded = sum(self.loaded_count.values())
+        top = ", ".join(f"{h} ({n})" for h, n in self.blocked_hosts.most_common(5))
+        print(
+            f"🚫 Requêtes bloquées: {blocked} (~{self.estimated_bytes() / 1024:.0f} Ko évités) "
+            f"vs {loaded} chargées ({sum(self.loaded_bytes.values()) / 1024:.0f} Ko)"
+            + (f" — {top}" if top else "")
+        )
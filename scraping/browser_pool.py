@@ -0,0 +1,250 @@
+"""
+Pool de Chrome headless « chauds » partagé entre les scripts du scheduler.
+
+Le scheduler lance CHROME_POOL_SIZE instances Chrome avec un port de débogage
+distant et passe l'adresse d'une instance libre au script via
+SCRAPER_CHROME_ADDRESS. Le script s'y attache (launch_driver) au lieu de
+démarrer son propre Chrome: pas de démarrage à froid, et les cookies (bannières
+déjà acceptées) sont conservés d'un script à l'autre. Une instance est
+recyclée après CHROME_POOL_RECYCLE_PAGES pages pour plafonner la mémoire.
+
+Sans pool (exécution directe, pool désactivé ou Chrome introuvable), les
+scripts lancent Chrome localement comme avant.
+
+    driver = create_driver(manifest=MANIFEST)   # scraping/driver.py (attache au pool ici)
+"""
+import atexit
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CHROME_ADDRESS_ENV = "SCRAPER_CHROME_ADDRESS"
+# Nombre d'instances Chrome gardées chaudes par le scheduler (0 = désactivé)
+CHROME_POOL_SIZE = int(os.getenv("CHROME_POOL_SIZE", "0"))
+# Pages servies par une instance avant redémarrage (mémoire des longs runs)
+CHROME_POOL_RECYCLE_PAGES = int(os.getenv("CHROME_POOL_RECYCLE_PAGES", "300"))
+CHROME_POOL_START_TIMEOUT = float(os.getenv("CHROME_POOL_START_TIMEOUT", "30"))
+# Attente max (s) d'une instance libre avant repli sur un Chrome lancé par le script
+CHROME_POOL_ACQUIRE_TIMEOUT = float(os.getenv("CHROME_POOL_ACQUIRE_TIMEOUT", "60"))
+CHROME_BINARY = os.getenv("CHROME_BINARY")
+
+_WEBDRIVER_PATCH = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+_CHROME_CANDIDATES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+_WINDOWS_CHROME = (
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+)
+
+
+def find_chrome():
+    """Chemin de l'exécutable Chrome (CHROME_BINARY, PATH, emplacements Windows), sinon None."""
+    if CHROME_BINARY:
+        return CHROME_BINARY
+    for name in _CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in _WINDOWS_CHROME:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class PooledChrome:
+    """Une instance Chrome lancée avec --remote-debugging-port, profil temporaire dédié."""
+
+    def __init__(self, binary, headless=True, profile=None):
+        # Import local: scraping.driver importe ce module
+        from scraping.driver import chrome_arguments
+
+        self.profile_dir = tempfile.mkdtemp(prefix="chrome-pool-")
+        # Mêmes arguments que les drivers lancés localement (profil de la fabrique);
+        # le cache disque reste dans le profil temporaire de l'instance
+        args = [binary, "--remote-debugging-port=0", f"--user-data-dir={self.profile_dir}"]
+        args += chrome_arguments(profile, headless=headless, cache_name=False)
+        args.append("about:blank")
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.address = self._wait_for_port()
+        self.pages = 0
+        self.runs = 0
+
+    def _wait_for_port(self):
+        # Port choisi par Chrome (port=0), publié dans DevToolsActivePort du profil
+        port_file = os.path.join(self.profile_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + CHROME_POOL_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with open(port_file, "r", encoding="utf-8") as f:
+                    port = f.readline().strip()
+                if port:
+                    return f"127.0.0.1:{port}"
+            except OSError:
+                pass
+            time.sleep(0.1)
+        self.close()
+        raise RuntimeError("Chrome n'a pas publié de port de débogage")
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class ChromePool:
+    """Instances Chrome chaudes, prêtées à un script à la fois (acquire / release)."""
+
+    def __init__(self, size, recycle_pages=None, headless=True, profile=None):
+        self.size = size
+        self.recycle_pages = recycle_pages or CHROME_POOL_RECYCLE_PAGES
+        self.headless = headless
+        self.profile = profile
+        self.binary = find_chrome()
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._all = []
+        self._closed = False
+        self.stats = {"launched": 0, "reused": 0, "recycled": 0, "pages": 0}
+
+    def start(self):
+        """Lance les instances; retourne False (pool inutilisable) si Chrome est introuvable."""
+        if not self.binary:
+            logger.warning("⚠️ Chrome introuvable (CHROME_BINARY): pool désactivé, lancement local par script")
+            return False
+        t0 = time.monotonic()
+        for _ in range(self.size):
+            try:
+                self._idle.put(self._launch())
+            except Exception as e:
+                logger.warning(f"⚠️ Instance Chrome du pool non démarrée: {e}")
+        if not self._all:
+            return False
+        # Scheduler interrompu: pas de Chrome orphelins
+        atexit.register(self.close)
+        logger.info(f"🔥 Pool Chrome: {len(self._all)} instances prêtes en {time.monotonic() - t0:.1f}s")
+        return True
+
+    def _launch(self):
+        instance = PooledChrome(self.binary, headless=self.headless, profile=self.profile)
+        with self._lock:
+            self._all.append(instance)
+            self.stats["launched"] += 1
+        return instance
+
+    def _retire(self, instance):
+        instance.close()
+        with self._lock:
+            if instance in self._all:
+                self._all.remove(instance)
+
+    def acquire(self, timeout=None):
+        """Instance libre (attend au plus timeout s, défaut CHROME_POOL_ACQUIRE_TIMEOUT), sinon None.
+
+        None: pool vide ou toutes les instances restées prêtées (ex: relance après
+        recyclage en échec); l'appelant lance alors Chrome localement.
+        """
+        if not self._all or self._closed:
+            return None
+        try:
+            instance = self._idle.get(timeout=CHROME_POOL_ACQUIRE_TIMEOUT if timeout is None else timeout)
+        except queue.Empty:
+            return None
+        if not instance.alive():
+            self._retire(instance)
+            instance = self._launch()
+        elif instance.runs:
+            self.stats["reused"] += 1
+        instance.runs += 1
+        return instance
+
+    def release(self, instance, pages=None, healthy=True):
+        """Rend une instance; recyclée si elle a servi trop de pages ou si le run a mal fini."""
+        instance.pages += pages or 0
+        self.stats["pages"] += pages or 0
+        if not healthy or not instance.alive() or instance.pages >= self.recycle_pages:
+            logger.info(f"♻️ Recyclage d'une instance Chrome ({instance.pages} pages, {instance.runs} runs)")
+            self._retire(instance)
+            self.stats["recycled"] += 1
+            try:
+                instance = self._launch()
+            except Exception as e:
+                logger.warning(f"⚠️ Relance d'une instance Chrome impossible: {e}")
+                return
+        self._idle.put(instance)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            instances = list(self._all)
+            self._all.clear()
+        for instance in instances:
+            instance.close()
+        s = self.stats
+        logger.info(
+            f"🔥 Pool Chrome fermé: {s['launched']} lancements, {s['reused']} réutilisations, "
+            f"{s['recycled']} recyclages, {s['pages']} pages"
+        )
+
+
+def launch_driver(options, manifest=None, service=None):
+    """Driver attaché au Chrome du pool (SCRAPER_CHROME_ADDRESS), sinon Chrome lancé localement.
+
+    Le patch navigator.webdriver est injecté pour chaque nouveau document, et le
+    nombre de pages chargées est compté dans le manifeste (recyclage du pool).
+    """
+    from selenium import webdriver
+
+    driver = None
+    address = os.getenv(CHROME_ADDRESS_ENV)
+    if address:
+        # Attachement: les arguments de lancement ne s'appliquent pas; stratégie de chargement
+        # et journal réseau (comptage des requêtes bloquées) sont repris
+        attach = webdriver.ChromeOptions()
+        attach.page_load_strategy = options.page_load_strategy
+        attach.debugger_address = address
+        if "goog:loggingPrefs" in options.capabilities:
+            attach.set_capability("goog:loggingPrefs", options.capabilities["goog:loggingPrefs"])
+        try:
+            driver = webdriver.Chrome(options=attach)
+            print(f"🔥 Attaché au Chrome du pool ({address})")
+        except Exception as e:
+            print(f"⚠️ Attachement au pool impossible ({e}), lancement local")
+    if driver is None:
+        if service is not None:
+            driver = webdriver.Chrome(service=service, options=options)
+        else:
+            driver = webdriver.Chrome(options=options)
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _WEBDRIVER_PATCH})
+    except Exception:
+        pass
+    driver.execute_script(_WEBDRIVER_PATCH)
+
+    if manifest is not None:
+        get = driver.get
+        pages = [0]
+
+        def counted_get(url):
+            pages[0] += 1
+            manifest.count("pages", pages[0])
+            return get(url)
+
+        driver.get = counted_get
+    return driver
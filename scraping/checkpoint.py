@@ -0,0 +1,114 @@
+"""
+Journal de reprise des scrapers (JSONL append-only).
+
+Chaque page de listing terminée et chaque produit enrichi (PDP) sont ajoutés au
+journal au fil de l'eau, indexés par URL de page / lien produit: un run tué au
+milieu d'une catégorie ne refait que les produits non journalisés. Si le run est
+tué (timeout du scheduler), une relance avec SCRAPER_RESUME=1 relit le journal
+et saute le travail déjà fait. Le journal est supprimé après un run complet.
+
+    CHECKPOINT = Checkpoint("dell_servers")
+    cached = CHECKPOINT.page(url)          # None si la page est à (re)faire
+    CHECKPOINT.save_page(url, products)
+    done = CHECKPOINT.product(link)        # produit déjà enrichi, ou None
+    CHECKPOINT.add_product(product)
+    CHECKPOINT.add_product(product, key=f"{category}|{name}")   # lien non unique
+    CHECKPOINT.complete()
+"""
+import json
+import os
+
+CHECKPOINT_ENV = "SCRAPER_CHECKPOINT_PATH"
+RESUME_ENV = "SCRAPER_RESUME"
+CHECKPOINT_DIR = os.getenv("SCRAPER_CHECKPOINT_DIR", "checkpoints")
+SCRAPER_CHECKPOINT = os.getenv("SCRAPER_CHECKPOINT", "true").lower() == "true"
+
+
+def checkpoint_path(name):
+    return os.path.abspath(os.path.join(CHECKPOINT_DIR, f"{name}.jsonl"))
+
+
+def journal_entries(path):
+    """Nombre d'entrées d'un journal (0 si absent)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+    except OSError:
+        return 0
+
+
+class Checkpoint:
+    def __init__(self, name, path=None, resume=None):
+        self.enabled = SCRAPER_CHECKPOINT
+        self.path = path or os.getenv(CHECKPOINT_ENV) or checkpoint_path(name)
+        if resume is None:
+            resume = os.getenv(RESUME_ENV, "0").lower() in {"1", "true", "yes", "on"}
+        self.pages = {}
+        self.products = {}
+        self._fh = None
+        if not self.enabled:
+            return
+        if resume:
+            self._load()
+            if self.pages or self.products:
+                print(f"♻️ Reprise depuis {self.path}: {len(self.pages)} pages, {len(self.products)} produits déjà traités")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Run neuf: journal tronqué; reprise: on continue d'y ajouter
+        self._fh = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un kill: ignorée
+                        continue
+                    if entry.get("type") == "page":
+                        self.pages[entry["key"]] = entry["products"]
+                    elif entry.get("type") == "product":
+                        self.products[entry["link"]] = entry["product"]
+        except OSError:
+            pass
+
+    def _append(self, entry):
+        if self._fh is None:
+            return
+        self._fh.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        # flush (sans fsync): suffisant pour survivre à un kill du processus
+        self._fh.flush()
+
+    def page(self, key):
+        """Produits d'une page de listing déjà terminée, sinon None."""
+        return self.pages.get(key)
+
+    def save_page(self, key, products):
+        # Une page vide est plus probablement un échec de chargement qu'un résultat: à refaire
+        if not products:
+            return
+        self.pages[key] = products
+        self._append({"type": "page", "key": key, "products": products})
+
+    def product(self, key):
+        """Produit déjà traité (clé: lien produit, ou celle passée à add_product), sinon None."""
+        return self.products.get(key) if key else None
+
+    def add_product(self, product, key=None):
+        # Clé explicite quand le lien n'identifie pas le produit (ex: fiche technique partagée)
+        key = key or product.get("link")
+        if not key:
+            return
+        self.products[key] = product
+        self._append({"type": "product", "link": key, "product": product})
+
+    def complete(self):
+        """Run terminé et sortie écrite: le journal n'est plus utile."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self.enabled:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,189 @@
+"""
+Fabrique de drivers Chrome commune à tous les scrapers.
+
+Un seul endroit pour les options Chrome, la recherche de chromedriver (Selenium
+Manager, puis chromedriver.exe local) et l'attachement au pool du scheduler.
+Profils:
+    fast  (défaut) chargement 'eager', images / polices / médias bloqués,
+          trackers / analytics / chat / vidéos bloqués (scraping/blocking.py),
+          pas d'extensions, fenêtre fixe, cache disque persistant par script
+    full  même base, ressources chargées (débogage visuel, captures)
+
+    driver = create_driver(manifest=MANIFEST)
+    driver = create_driver("full", headless=False)
+
+Profil par défaut réglable par env SCRAPER_DRIVER_PROFILE (ex: full pour déboguer).
+"""
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+from scraping.blocking import RequestBlocker, logging_capabilities
+from scraping.browser_pool import launch_driver
+
+SCRAPER_DRIVER_PROFILE = os.getenv("SCRAPER_DRIVER_PROFILE", "").strip().lower()
+# Cache HTTP disque conservé entre les runs (un sous-dossier par script)
+SCRAPER_CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", os.path.join(os.path.dirname(__file__), os.pardir, ".cache", "chrome"))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+WINDOW_SIZE = "1920,1080"
+
+PROFILES = {
+    "fast": {"images": False, "block_resources": True},
+    "full": {"images": True, "block_resources": False},
+}
+
+_LOCAL_CHROMEDRIVERS = (
+    os.path.join(os.getcwd(), "chromedriver.exe"),
+    os.path.join(os.path.dirname(__file__), os.pardir, "chromedriver.exe"),
+)
+
+
+def _flag(name, default="false"):
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def resolve_profile(profile=None):
+    name = profile or SCRAPER_DRIVER_PROFILE or "fast"
+    if name not in PROFILES:
+        raise ValueError(f"Profil de driver inconnu: {name} (connus: {', '.join(PROFILES)})")
+    return name
+
+
+def cache_dir(name=None):
+    """Dossier de cache disque du script (nom dérivé du script lancé par défaut)."""
+    if not name:
+        script = os.path.abspath(sys.argv[0]) if sys.argv and sys.argv[0] else "scraper"
+        parent = os.path.basename(os.path.dirname(script))
+        name = f"{parent}_{os.path.splitext(os.path.basename(script))[0]}"
+    return os.path.abspath(os.path.join(SCRAPER_CACHE_DIR, re.sub(r"[^\w.-]", "_", name)))
+
+
+def chrome_arguments(profile=None, headless=True, cache_name=None):
+    """Arguments de ligne de commande Chrome du profil (partagés avec le pool du scheduler)."""
+    settings = PROFILES[resolve_profile(profile)]
+    args = [
+        "--disable-blink-features=AutomationControlled",
+        "--disable-extensions",
+        "--disable-notifications",
+        "--disable-gpu",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--mute-audio",
+        "--autoplay-policy=user-gesture-required",
+        "--log-level=3",
+        f"--window-size={WINDOW_SIZE}",
+        f"--user-agent={USER_AGENT}",
+    ]
+    if cache_name is not False:
+        args.append(f"--disk-cache-dir={cache_dir(cache_name)}")
+    if not settings["images"]:
+        args.append("--blink-settings=imagesEnabled=false")
+    if headless:
+        args.append("--headless=new")
+    return args
+
+
+def build_options(profile=None, headless=None, extra_args=None, cache_name=None):
+    """ChromeOptions du profil; headless suit HEADLESS_MODE si non précisé."""
+    from selenium import webdriver
+
+    if headless is None:
+        headless = _flag("HEADLESS_MODE")
+    settings = PROFILES[resolve_profile(profile)]
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = "eager"
+    for arg in chrome_arguments(profile, headless=headless, cache_name=cache_name):
+        options.add_argument(arg)
+    for arg in extra_args or []:
+        options.add_argument(arg)
+    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    options.add_experimental_option("useAutomationExtension", False)
+    if not settings["images"]:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if settings["block_resources"]:
+        logging_capabilities(options)
+    return options
+
+
+def _track(driver, blocker):
+    # Journal réseau vidé avant chaque navigation (mémoire bornée), bilan à la fermeture
+    get, quit_ = driver.get, driver.quit
+
+    def tracked_get(url):
+        blocker.collect()
+        return get(url)
+
+    def tracked_quit():
+        try:
+            blocker.report()
+        except Exception:
+            pass
+        return quit_()
+
+    driver.get = tracked_get
+    driver.quit = tracked_quit
+    driver.request_blocker = blocker
+
+
+def _site_of(manifest):
+    # Marque du manifeste -> clé de scraping/blocking.BLOCKLISTS (ex: Dell -> dell.com)
+    brand = (manifest.data.get("brand") or "") if manifest is not None else ""
+    return f"{brand.strip().lower()}.com" if brand else None
+
+
+def create_driver(profile=None, manifest=None, headless=None, extra_args=None, cache_name=None, site=None):
+    """Driver Chrome prêt à l'emploi (pool du scheduler si disponible, sinon lancement local).
+
+    site: clé de la liste de blocage (défaut: dérivée de la marque du manifeste).
+    """
+    from selenium.webdriver.chrome.service import Service
+
+    name = resolve_profile(profile)
+    options = build_options(name, headless=headless, extra_args=extra_args, cache_name=cache_name)
+    try:
+        driver = launch_driver(options, manifest=manifest)
+    except Exception:
+        # Selenium Manager indisponible: chromedriver.exe local (Windows)
+        local = next((p for p in _LOCAL_CHROMEDRIVERS if os.path.exists(p)), None)
+        if not local:
+            raise
+        driver = launch_driver(options, manifest=manifest, service=Service(local))
+    if PROFILES[name]["block_resources"]:
+        _track(driver, RequestBlocker(driver, site or _site_of(manifest), manifest).apply())
+    if manifest is not None:
+        manifest.data["driver_profile"] = name
+    # Cumul des attentes conditionnelles (scraping/waits.py)
+    driver.manifest = manifest
+    return driver
+
+
+class CommandCount:
+    def __init__(self):
+        self.count = 0
+
+
+@contextmanager
+def count_commands(driver):
+    """Compte les commandes WebDriver (allers-retours vers chromedriver) envoyées dans le bloc.
+
+        with count_commands(driver) as calls:
+            ...
+        print(calls.count)
+    """
+    calls = CommandCount()
+    execute = driver.execute
+
+    def counted_execute(command, params=None):
+        calls.count += 1
+        return execute(command, params)
+
+    # Les WebElement passent aussi par driver.execute (parent)
+    driver.execute = counted_execute
+    try:
+        yield calls
+    finally:
+        driver.execute = execute
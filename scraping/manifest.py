@@ -0,0 +1,104 @@
+"""
+Manifeste de run écrit par chaque scraper pour le scheduler.
+
+Le scheduler fournit un chemin via SCRAPER_MANIFEST_PATH; le scraper y écrit un
+JSON (fichier de sortie, compteurs, durées, erreurs) au lieu que le scheduler
+cherche le nom du fichier dans stdout. Sans cette variable (exécution directe),
+rien n'est écrit.
+
+    MANIFEST = RunManifest("Dell", "serveurs")
+    ...
+    MANIFEST.finish(OUTPUT_JSON, len(products))
+"""
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+MANIFEST_ENV = "SCRAPER_MANIFEST_PATH"
+# Nombre maximal d'erreurs conservées (les suivantes sont seulement comptées)
+MAX_ERRORS = 50
+
+
+class RunManifest:
+    def __init__(self, brand, category, path=None):
+        self.path = path or os.getenv(MANIFEST_ENV)
+        self._t0 = time.monotonic()
+        self._written = False
+        self.data = {
+            "script": os.path.relpath(os.path.abspath(sys.argv[0])) if sys.argv and sys.argv[0] else None,
+            "brand": brand,
+            "category": category,
+            "pid": os.getpid(),
+            "status": "running",
+            "started_at": datetime.now().isoformat(),
+            "output_path": None,
+            "counts": {},
+            "timings": {},
+            "errors": [],
+            "error_count": 0,
+        }
+        if self.path:
+            # Run terminé sans finish() (exception, aucun produit): manifeste quand même écrit
+            atexit.register(self._write_on_exit)
+
+    def count(self, name, value):
+        self.data["counts"][name] = value
+
+    def timing(self, name, seconds):
+        self.data["timings"][name] = round(seconds, 3)
+
+    @contextmanager
+    def phase(self, name):
+        """Chronomètre un bloc (ex: 'listing', 'pdp')."""
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timing(name, self.data["timings"].get(name, 0) + time.monotonic() - t0)
+
+    def error(self, message):
+        self.data["error_count"] += 1
+        if len(self.data["errors"]) < MAX_ERRORS:
+            self.data["errors"].append(str(message)[:500])
+
+    def finish(self, output_path=None, products=None, status=None):
+        """Enregistre le fichier produit et écrit le manifeste."""
+        if output_path:
+            self.data["output_path"] = os.path.abspath(output_path)
+        if products is not None:
+            self.count("products", products)
+        self.data["status"] = status or ("partial" if self.data["error_count"] else "success")
+        self.write()
+
+    def write(self):
+        if not self.path:
+            return
+        self.data["finished_at"] = datetime.now().isoformat()
+        self.data["duration_seconds"] = round(time.monotonic() - self._t0, 3)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._written = True
+
+    def _write_on_exit(self):
+        if self._written:
+            return
+        self.data["status"] = "error" if self.data["error_count"] else "no_output"
+        try:
+            self.write()
+        except Exception:
+            pass
+
+
+def read_manifest(path):
+    """Lit un manifeste (None si absent ou illisible)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,213 @@
+"""
+Attentes conditionnelles communes aux scrapers (remplacent les time.sleep fixes).
+
+Une pause fixe paie le pire cas sur chaque page; ici on interroge un prédicat
+jusqu'à ce qu'il soit vrai ou que le délai expire, et on rend le temps réellement
+attendu. Les prédicats se composent (all_of / any_of):
+
+    element_count_stable(selector)   le nombre d'éléments ne bouge plus
+    network_idle()                   plus de requête en cours (événements CDP Network)
+    dom_quiet()                      aucune mutation du DOM pendant une période
+    spec_table_populated(selector)   tableau de specs rempli (lignes non vides)
+    document_ready()                 document.readyState == 'complete'
+
+    waited = wait_for(driver, all_of(network_idle(), element_count_stable("li.product_item")), timeout=15)
+    print(f"⏳ {waited}")     # ✅ réseau inactif + éléments stables (li.product_item) en 1.8s
+
+Un délai expiré n'est pas une erreur (comportement des anciennes pauses): le
+scraper continue avec ce qui est chargé. Les attentes sont cumulées par
+condition dans le manifeste de run (data["waits"]) si le driver en a un.
+"""
+import os
+import time
+
+# Intervalle d'interrogation des prédicats (s)
+SCRAPER_WAIT_POLL = float(os.getenv("SCRAPER_WAIT_POLL", "0.25"))
+
+_MUTATION_OBSERVER_JS = """
+if (!window.__scraperLastMutation) {
+    window.__scraperLastMutation = performance.now();
+    new MutationObserver(() => { window.__scraperLastMutation = performance.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+}
+return performance.now() - window.__scraperLastMutation;
+"""
+
+_POPULATED_ROWS_JS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .filter(e => (e.textContent || '').trim().length > 0).length;
+"""
+
+# Comptage côté page: pas de find_elements (soumis à l'implicit wait du driver quand rien ne correspond)
+_COUNT_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+_RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length;"
+
+
+class WaitResult:
+    """Issue d'une attente: ok (condition atteinte), waited (s), name (condition)."""
+
+    def __init__(self, ok, waited, name):
+        self.ok = ok
+        self.waited = waited
+        self.name = name
+
+    def __bool__(self):
+        return self.ok
+
+    def __str__(self):
+        return f"{'✅' if self.ok else '⌛'} {self.name} {'en' if self.ok else 'non atteint après'} {self.waited:.1f}s"
+
+
+class Condition:
+    """Prédicat nommé; réinitialisé au début de chaque attente (état des périodes de stabilité)."""
+
+    def __init__(self, name, check, reset=None):
+        self.name = name
+        self._check = check
+        self._reset = reset
+
+    def reset(self):
+        if self._reset:
+            self._reset()
+
+    def __call__(self, driver):
+        return self._check(driver)
+
+
+def _stable(name, sample, stable_for, accept=lambda value: True):
+    """Condition vraie quand sample(driver) garde la même valeur (acceptable) pendant stable_for secondes."""
+    state = {}
+
+    def reset():
+        state.clear()
+
+    def check(driver):
+        value = sample(driver)
+        now = time.monotonic()
+        if state.get("value") != value or "since" not in state:
+            state["value"], state["since"] = value, now
+        return accept(value) and now - state["since"] >= stable_for
+
+    return Condition(name, check, reset)
+
+
+def element_count_stable(selector, stable_for=1.0, min_count=1):
+    """Au moins min_count éléments (sélecteur CSS), nombre inchangé depuis stable_for secondes."""
+    return _stable(
+        f"éléments stables ({selector})",
+        lambda d: d.execute_script(_COUNT_JS, selector),
+        stable_for,
+        accept=lambda n: n >= min_count,
+    )
+
+
+def count_above(selector, count):
+    """Plus de `count` éléments (ex: nouveaux produits après un clic 'load more')."""
+    return Condition(f"plus de {count} éléments ({selector})", lambda d: d.execute_script(_COUNT_JS, selector) > count)
+
+
+def network_idle(idle_for=0.5, max_inflight=0, max_age_ms=10_000):
+    """Au plus max_inflight requêtes en cours pendant idle_for secondes.
+
+    Suit les événements CDP Network du journal performance (driver de
+    scraping/driver.py, profil fast); sinon repli sur le nombre d'entrées
+    Resource Timing, stable pendant idle_for. Les requêtes plus vieilles que
+    max_age_ms (long polling, websockets) ne comptent pas.
+    """
+    fallback = _stable("réseau inactif", lambda d: d.execute_script(_RESOURCE_COUNT_JS), idle_for)
+    state = {}
+
+    def reset():
+        state.clear()
+        fallback.reset()
+
+    def check(driver):
+        blocker = getattr(driver, "request_blocker", None)
+        if blocker is not None:
+            blocker.collect()
+        if blocker is None or not blocker.logging:
+            return fallback(driver)
+        now = time.monotonic()
+        if blocker.inflight(max_age_ms) > max_inflight:
+            state.pop("since", None)
+            return False
+        state.setdefault("since", now)
+        return now - state["since"] >= idle_for
+
+    return Condition("réseau inactif", check, reset)
+
+
+def dom_quiet(quiet_for=0.5):
+    """Aucune mutation du DOM depuis quiet_for secondes (MutationObserver installé à la demande)."""
+    # Première interrogation: l'observateur vient d'être posé, la période démarre maintenant
+    return Condition("DOM stable", lambda d: (d.execute_script(_MUTATION_OBSERVER_JS) or 0) >= quiet_for * 1000)
+
+
+def spec_table_populated(selector, min_rows=1):
+    """Au moins min_rows éléments `selector` avec du texte (tableau de specs rendu)."""
+    return Condition(
+        f"specs remplies ({selector})",
+        lambda d: d.execute_script(_POPULATED_ROWS_JS, selector) >= min_rows,
+    )
+
+
+def document_ready():
+    return Condition("document chargé", lambda d: d.execute_script("return document.readyState") == "complete")
+
+
+def all_of(*conditions):
+    def reset():
+        for c in conditions:
+            c.reset()
+
+    # Toutes interrogées à chaque tour: les périodes de stabilité avancent ensemble
+    return Condition(" + ".join(c.name for c in conditions), lambda d: all([c(d) for c in conditions]), reset)
+
+
+def any_of(*conditions):
+    def reset():
+        for c in conditions:
+            c.reset()
+
+    return Condition(" | ".join(c.name for c in conditions), lambda d: any(c(d) for c in conditions), reset)
+
+
+def _record(driver, result):
+    manifest = getattr(driver, "manifest", None)
+    if manifest is None:
+        return
+    waits = manifest.data.setdefault("waits", {})
+    entry = waits.setdefault(result.name, {"count": 0, "waited": 0.0, "timeouts": 0})
+    entry["count"] += 1
+    entry["waited"] = round(entry["waited"] + result.waited, 3)
+    entry["timeouts"] += 0 if result.ok else 1
+
+
+def wait_for(driver, condition, timeout, poll=None):
+    """Interroge condition(driver) jusqu'à vrai ou timeout; retourne un WaitResult (jamais d'exception)."""
+    poll = SCRAPER_WAIT_POLL if poll is None else poll
+    condition.reset()
+    t0 = time.monotonic()
+    ok = False
+    while True:
+        try:
+            ok = bool(condition(driver))
+        except Exception:
+            # Page en cours de navigation / élément détaché: on réessaie au tour suivant
+            ok = False
+        elapsed = time.monotonic() - t0
+        if ok or elapsed >= timeout:
+            break
+        time.sleep(min(poll, timeout - elapsed))
+    result = WaitResult(ok, time.monotonic() - t0, condition.name)
+    _record(driver, result)
+    return result
+
+
+def page_settled(spec_selector=None):
+    """Condition usuelle après driver.get: document chargé, réseau inactif, DOM stable (+ specs si fourni)."""
+    conditions = [document_ready(), network_idle(), dom_quiet()]
+    if spec_selector:
+        conditions.append(spec_table_populated(spec_selector))
+    return all_of(*conditions)
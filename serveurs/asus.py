@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -13,14 +11,21 @@ import sys
 
 # Ajouter le chemin du module database
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database.mysql_connector import save_to_database
+from database.save import save_to_database
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
 ENABLE_DB = os.getenv("ENABLE_DB", "false").lower() == "true"
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest("Asus", "serveurs")
 
 # ✅ Paramètres
-CHROMEDRIVER_PATH = os.path.join(os.getcwd(), "chromedriver.exe")
 URL = "https://servers.asus.com/products/Servers"
 BASE = "https://servers.asus.com"
 OUTPUT_JSON = "asus_servers_full.json"
+# Journal de reprise (SCRAPER_CHECKPOINT_DIR): produits déjà traités
+# (pagination par clic: les pages de listing sont toujours reparcourues)
+CHECKPOINT = Checkpoint("asus_servers")
 
 # Configuration pour tests rapides
 MAX_PAGES_TO_SCRAPE = 2  # ⚡ SEULEMENT 2 PAGES pour test rapide
@@ -41,36 +46,8 @@ except Exception:
 # Mode rapide: activé par défaut sous le scheduler
 FAST_SCRAPE = os.getenv("FAST_SCRAPE", "true" if os.getenv("RUNNING_UNDER_SCHEDULER") else "false").strip().lower() in {"1","true","yes","on"}
 
-# ✅ Config navigateur avec options améliorées pour éviter la détection
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").strip().lower() in {"1","true","yes","on"}
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-options.page_load_strategy = 'eager'
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-options.add_argument("--disable-logging")
-options.add_argument("--disable-gpu-sandbox")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-if FAST_SCRAPE:
-    # Désactiver le chargement des images pour accélérer les pages produit
-    options.add_argument("--blink-settings=imagesEnabled=false")
-if HEADLESS_MODE:
-    # Chrome moderne recommande --headless=new
-    options.add_argument("--headless=new")
-# Utiliser Selenium Manager (évite les soucis de versions de ChromeDriver)
-try:
-    driver = webdriver.Chrome(options=options)
-except Exception:
-    # Fallback minimal si un binaire local est absolument requis
-    try:
-        local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-        driver = webdriver.Chrome(service=Service(local_driver), options=options)
-    except Exception as e:
-        raise e
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+# ✅ Navigateur: profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+driver = create_driver(manifest=MANIFEST)
 
 # Timeout de chargement pour éviter les blocages
 try:
@@ -622,6 +599,12 @@ def extract_products_from_page(driver, wait, product_items, page_num, processed_
             relative_url = link_element.get_attribute("href")
             product_link = relative_url if relative_url.startswith("http") else BASE + relative_url
 
+            # Produit déjà extrait lors d'un run interrompu: pas de nouvel onglet produit ni de pause
+            done = CHECKPOINT.product(product_link)
+            if done is not None:
+                page_products.append(done)
+                continue
+
             print(f"📦 [Page {page_num}] [{index+1}/{len(product_items)}] Traitement de {name}...")
 
             # Description courte depuis la carte (fallback si specs indisponibles)
@@ -685,6 +668,7 @@ def extract_products_from_page(driver, wait, product_items, page_num, processed_
                     }
                     
                     page_products.append(product_data)
+                    CHECKPOINT.add_product(product_data)
                     print(f"✅ [Page {page_num}] [{index+1}/{len(product_items)}] {name} - {len(specs_dict)} spécifications extraites")
                     break  # Succès, sortir de la boucle de retry
                     
@@ -751,6 +735,8 @@ driver.quit()
 # ✅ Export JSON
 with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
     json.dump(products_data, f, ensure_ascii=False, indent=4)
+MANIFEST.finish(OUTPUT_JSON, len(products_data))
+CHECKPOINT.complete()
 
 print(f"\n🎯 Extraction terminée. {len(products_data)} produits enregistrés → {OUTPUT_JSON}")
 
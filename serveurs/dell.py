@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -32,34 +30,20 @@ DELAY_BETWEEN_PRODUCTS = 1
 
 # --- SETUP SELENIUM ---
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database.mysql_connector import save_to_database
+from database.save import save_to_database
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
 ENABLE_DB = os.getenv("ENABLE_DB", "false").lower() == "true"
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest(BRAND, "serveurs")
+# Journal de reprise (pages de listing + PDP terminées), relu si SCRAPER_RESUME=1
+CHECKPOINT = Checkpoint("dell_servers")
 MAX_PRODUCTS = int(os.getenv("MAX_PRODUCTS", "0") or "0")
 FAST_SCRAPE = os.getenv("FAST_SCRAPE", "false").strip().lower() in {"1","true","yes","on"}
 
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").strip().lower() in {"1","true","yes","on"}
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-options.page_load_strategy = 'eager'
-options.add_argument("--ignore-certificate-errors")
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-if FAST_SCRAPE:
-    options.add_argument("--blink-settings=imagesEnabled=false")
-if HEADLESS_MODE:
-    options.add_argument("--headless=new")
-# Utiliser Selenium Manager (fallback local si présent)
-try:
-    driver = webdriver.Chrome(options=options)
-except Exception:
-    try:
-        local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-        driver = webdriver.Chrome(service=Service(local_driver), options=options)
-    except Exception as e:
-        raise e
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+# Navigateur: profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+driver = create_driver(manifest=MANIFEST, extra_args=["--ignore-certificate-errors"])
 try:
     driver.set_page_load_timeout(15 if FAST_SCRAPE else 25)
 except Exception:
@@ -494,6 +478,12 @@ def scrape_dell_servers():
 
     # Parcourir toutes les pages de listing Dell demandées
     for url in BASE_URLS:
+        cached = CHECKPOINT.page(url)
+        if cached is not None:
+            print(f"♻️ Page déjà traitée (journal) : {url}")
+            all_products.extend(cached)
+            continue
+        page_start = len(all_products)
         try:
             print(f"🌐 Accès à la page : {url}")
             driver.get(url)
@@ -546,6 +536,7 @@ def scrape_dell_servers():
                     except Exception as e:
                         print(f"❌ Erreur lors du traitement de l'onglet {tab['name']} : {e}")
                         continue
+            CHECKPOINT.save_page(url, all_products[page_start:])
         except Exception as e:
             print(f"❌ Erreur lors du traitement de la page {url} : {e}")
             continue
@@ -571,6 +562,10 @@ def scrape_dell_servers():
     # Enrichir depuis la page produit
     enriched = []
     for idx, p in enumerate(products_to_process, 1):
+        done = CHECKPOINT.product(p['link'])
+        if done is not None:
+            enriched.append(done)
+            continue
         try:
             print(f"🔍 Détails {idx}/{len(products_to_process)}: {p['name']}")
             details, assets = extract_specs_from_product_page(driver, p['link'])
@@ -585,6 +580,7 @@ def scrape_dell_servers():
             if assets.get('datasheet_link'):
                 p['datasheet_link'] = assets['datasheet_link']
             enriched.append(p)
+            CHECKPOINT.add_product(p)
         except Exception as e:
             print(f"⚠️ Erreur enrichissement {p.get('name')}: {e}")
             enriched.append(p)
@@ -599,6 +595,8 @@ if __name__ == "__main__":
             # Sauvegarder en JSON
             with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
                 json.dump(products, f, ensure_ascii=False, indent=4)
+            MANIFEST.finish(OUTPUT_JSON, len(products))
+            CHECKPOINT.complete()
             print(f"💾 Données sauvegardées dans {OUTPUT_JSON}")
             
             # Sauvegarde en base de données
@@ -616,5 +614,6 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"❌ Erreur fatale : {e}")
+        MANIFEST.error(e)
     finally:
         driver.quit()
@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -33,43 +31,29 @@ DELAY_BETWEEN_PAGES = 5 # Délai entre chaque catégorie
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 # Optional DB import: keep scraper runnable without local package resolution
 try:
-    from database.mysql_connector import save_to_database  # type: ignore
+    from database.save import deactivate_missing_products, save_to_database  # type: ignore
     _DB_IMPORT_OK = True
 except Exception:
     save_to_database = None  # type: ignore
+    deactivate_missing_products = None  # type: ignore
     _DB_IMPORT_OK = False
+try:
+    from database.async_writer import open_stream_writer  # type: ignore
+except Exception:
+    open_stream_writer = None  # type: ignore
 ENABLE_DB = os.getenv("ENABLE_DB", "false").lower() == "true"
+from scraping.checkpoint import Checkpoint
+from scraping.driver import count_commands, create_driver
+from scraping.manifest import RunManifest
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest(BRAND, "serveurs")
+# Journal de reprise par catégorie, relu si SCRAPER_RESUME=1
+CHECKPOINT = Checkpoint("hp_servers")
 FAST_SCRAPE = os.getenv("FAST_SCRAPE", "false").strip().lower() in {"1","true","yes","on"}
 SKIP_PDP_ENRICH = os.getenv("SKIP_PDP_ENRICH", "true" if FAST_SCRAPE else "false").strip().lower() in {"1","true","yes","on"}
 
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").strip().lower() in {"1","true","yes","on"}
-options = webdriver.ChromeOptions()
-options.page_load_strategy = 'eager'
-options.add_argument("--start-maximized")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-options.add_experimental_option('useAutomationExtension', False)
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-options.add_argument("--log-level=3")
-options.add_argument("--disable-notifications")
-# Disable images in FAST_SCRAPE to speed up
-if FAST_SCRAPE:
-    prefs = {"profile.managed_default_content_settings.images": 2}
-    options.add_experimental_option("prefs", prefs)
-# Utiliser Selenium Manager (pas de chemin explicite vers chromedriver)
-if HEADLESS_MODE:
-    options.add_argument("--headless=new")
-
-try:
-    driver = webdriver.Chrome(options=options)
-except Exception:
-    # Fallback minimal si nécessaire (chemin local si présent)
-    try:
-        local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-        driver = webdriver.Chrome(service=Service(local_driver), options=options)
-    except Exception as e:
-        raise e
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+# Navigateur: profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+driver = create_driver(manifest=MANIFEST)
 try:
     driver.set_page_load_timeout(12 if FAST_SCRAPE else 20)
 except Exception:
@@ -135,6 +119,149 @@ def _sku_from_img(src: str) -> str | None:
         return m.group(1).upper()
     return None
 
+# Extraction des cartes produit: un seul execute_script renvoie toutes les cartes (JSON);
+# le parcours élément par élément (~6 allers-retours WebDriver par carte) reste en secours.
+# HP_TILE_EXTRACTOR=js (défaut) | elements | compare (les deux, comparaison des appels WebDriver)
+HP_TILE_EXTRACTOR = os.getenv("HP_TILE_EXTRACTOR", "js").strip().lower()
+TILE_SELECTOR = "[data-test-hook='@hpstellar/core/product-tile']"
+
+_TILES_JS = """
+const text = e => (e && (e.innerText || e.textContent) || '').trim();
+const filled = e => (e.textContent || '').trim() !== '';
+return Array.from(document.querySelectorAll(arguments[0])).map(card => {
+    const title = card.querySelector("a[data-test-hook='@hpstellar/core/product-tile__title']");
+    const link = title || card.querySelector('a[href]');
+    const h2 = card.querySelector('h2');
+    const img = card.querySelector("img[data-test-hook='@hpstellar/core/image-with-placeholder'], img");
+    const specs = "[data-test-hook='@hpstellar/core/product-tile__specs']";
+    return {
+        href: link ? link.href : '',
+        name: text(h2) || text(title),
+        sku: text(card.querySelector("[data-test-hook='@hpstellar/core/product-tile__sku']")),
+        img: img ? (img.src || '') : '',
+        bullets: Array.from(card.querySelectorAll(specs + ' li')).filter(filled).slice(0, 6).map(text),
+        paras: Array.from(card.querySelectorAll(specs + ' p')).filter(filled).slice(0, 3).map(text),
+    };
+});
+"""
+
+def _tile_hint(href, name, sku, img, bullets, paras):
+    """Hints d'une carte produit (mêmes règles pour l'extraction JS et élément par élément)."""
+    if not sku and img:
+        sku = _sku_from_img(img) or ''
+    lines = [t for t in bullets if t and 3 < len(t) < 180]
+    if not lines:
+        lines = [t for t in paras if t and len(t) > 10]
+    uniq = list(dict.fromkeys(lines))
+    return {
+        'link': href,
+        'name_hint': name,
+        'sku_hint': sku,
+        'img_hint': img,
+        'desc_hint': "; ".join(uniq)[:700] if uniq else ''
+    }
+
+def _tiles_via_js(driver, max_products=0):
+    """Toutes les cartes en un appel execute_script."""
+    hints, seen = [], set()
+    for raw in driver.execute_script(_TILES_JS, TILE_SELECTOR) or []:
+        if max_products and len(hints) >= max_products:
+            break
+        href = _clean_link(raw.get('href') or '')
+        if not href or '#reviews' in href or href in seen:
+            continue
+        hints.append(_tile_hint(href, (raw.get('name') or '').strip(), (raw.get('sku') or '').strip(),
+                                (raw.get('img') or '').strip(), raw.get('bullets') or [], raw.get('paras') or []))
+        seen.add(href)
+    return hints
+
+def _tiles_via_elements(driver, max_products=0):
+    """Parcours historique carte par carte (find_element / get_attribute / .text)."""
+    hints, seen = [], set()
+    for card in driver.find_elements(By.CSS_SELECTOR, TILE_SELECTOR):
+        if max_products and len(hints) >= max_products:
+            break
+        try:
+            href = ''
+            title_link = None
+            try:
+                title_link = card.find_element(By.CSS_SELECTOR, "a[data-test-hook='@hpstellar/core/product-tile__title']")
+                href = _clean_link(title_link.get_attribute('href'))
+            except Exception:
+                try:
+                    any_link = card.find_element(By.CSS_SELECTOR, "a[href]")
+                    href = _clean_link(any_link.get_attribute('href'))
+                except Exception:
+                    href = ''
+            if not href or '#reviews' in href or href in seen:
+                continue
+
+            name_hint = ''
+            try:
+                h2 = card.find_element(By.TAG_NAME, 'h2')
+                name_hint = (h2.text or '').strip()
+            except Exception:
+                try:
+                    name_hint = (title_link.text or '').strip()
+                except Exception:
+                    name_hint = ''
+
+            sku_hint = ''
+            try:
+                sku_el = card.find_element(By.CSS_SELECTOR, "[data-test-hook='@hpstellar/core/product-tile__sku']")
+                sku_hint = (sku_el.text or '').strip()
+            except Exception:
+                pass
+
+            img_hint = ''
+            try:
+                img_el = card.find_element(By.CSS_SELECTOR, "img[data-test-hook='@hpstellar/core/image-with-placeholder'], img")
+                img_hint = (img_el.get_attribute('src') or '').strip()
+            except Exception:
+                pass
+
+            bullets, paras = [], []
+            try:
+                bullets = [li.text.strip() for li in card.find_elements(By.XPATH, ".//*[@data-test-hook='@hpstellar/core/product-tile__specs']//li[normalize-space(string()) != '']")[:6]]
+                if not any(t and 3 < len(t) < 180 for t in bullets):
+                    paras = [p.text.strip() for p in card.find_elements(By.XPATH, ".//*[@data-test-hook='@hpstellar/core/product-tile__specs']//p[normalize-space(string()) != '']")[:3]]
+            except Exception:
+                pass
+
+            hints.append(_tile_hint(href, name_hint, sku_hint, img_hint, bullets, paras))
+            seen.add(href)
+        except Exception:
+            continue
+    return hints
+
+def _extract_tiles(driver, max_products=0):
+    """Cartes produit de la page (JS en un appel, repli élément par élément), appels WebDriver comptés."""
+    hints, calls = None, {}
+    if HP_TILE_EXTRACTOR in ("js", "compare"):
+        with count_commands(driver) as counter:
+            try:
+                hints = _tiles_via_js(driver, max_products)
+            except Exception as e:
+                print(f"⚠️ Extraction JS des cartes impossible ({e}), parcours élément par élément")
+        calls['js'] = counter.count
+    if not hints or HP_TILE_EXTRACTOR in ("elements", "compare"):
+        with count_commands(driver) as counter:
+            fallback = _tiles_via_elements(driver, max_products)
+        calls['elements'] = counter.count
+        if HP_TILE_EXTRACTOR == "compare" and hints is not None:
+            diff = sum(1 for a, b in zip(hints, fallback) if a != b) + abs(len(hints) - len(fallback))
+            print(f"🔬 Cartes: JS {len(hints)} / éléments {len(fallback)}, {diff} écart(s)")
+        if not hints:
+            hints = fallback
+    print(f"🧩 {len(hints)} cartes produit extraites — appels WebDriver: "
+          + ", ".join(f"{mode} {n}" for mode, n in calls.items()))
+    # Cumul par mode dans le manifeste (comparaison entre runs / modes)
+    for mode, n in calls.items():
+        key = f"tile_webdriver_calls_{mode}"
+        MANIFEST.count(key, MANIFEST.data["counts"].get(key, 0) + n)
+    MANIFEST.count("tiles", MANIFEST.data["counts"].get("tiles", 0) + len(hints))
+    return hints
+
 def scrape_category_page(driver, wait, category_url):
     """
     Extrait tous les produits d'une page de catégorie en utilisant une approche hybride :
@@ -166,88 +293,8 @@ def scrape_category_page(driver, wait, category_url):
             except ValueError:
                 max_products_env = 0
 
-            cards = driver.find_elements(By.CSS_SELECTOR, "[data-test-hook='@hpstellar/core/product-tile']")
-            print(f"🧩 {len(cards)} cartes produit détectées")
-            for idx, card in enumerate(cards):
-                if max_products_env and len(product_links_data) >= max_products_env:
-                    break
-                try:
-                    href = ''
-                    try:
-                        title_link = card.find_element(By.CSS_SELECTOR, "a[data-test-hook='@hpstellar/core/product-tile__title']")
-                        href = _clean_link(title_link.get_attribute('href'))
-                    except Exception:
-                        try:
-                            any_link = card.find_element(By.CSS_SELECTOR, "a[href]")
-                            href = _clean_link(any_link.get_attribute('href'))
-                        except Exception:
-                            href = ''
-                    if not href or '#reviews' in href or href in seen_links:
-                        continue
-
-                    name_hint = ''
-                    try:
-                        h2 = card.find_element(By.TAG_NAME, 'h2')
-                        name_hint = (h2.text or '').strip()
-                    except Exception:
-                        try:
-                            name_hint = (title_link.text or '').strip()
-                        except Exception:
-                            name_hint = ''
-
-                    sku_hint = ''
-                    try:
-                        sku_el = card.find_element(By.CSS_SELECTOR, "[data-test-hook='@hpstellar/core/product-tile__sku']")
-                        sku_hint = (sku_el.text or '').strip()
-                    except Exception:
-                        pass
-
-                    img_hint = ''
-                    try:
-                        img_el = card.find_element(By.CSS_SELECTOR, "img[data-test-hook='@hpstellar/core/image-with-placeholder'], img")
-                        img_hint = (img_el.get_attribute('src') or '').strip()
-                    except Exception:
-                        pass
-                    if not sku_hint and img_hint:
-                        ded = _sku_from_img(img_hint)
-                        if ded:
-                            sku_hint = ded
-
-                    desc_hint = ''
-                    try:
-                        bullets = card.find_elements(By.XPATH, ".//*[@data-test-hook='@hpstellar/core/product-tile__specs']//li[normalize-space(string()) != '']")
-                        lines = []
-                        for li in bullets[:6]:
-                            t = li.text.strip()
-                            if t and 3 < len(t) < 180:
-                                lines.append(t)
-                        if not lines:
-                            paras = card.find_elements(By.XPATH, ".//*[@data-test-hook='@hpstellar/core/product-tile__specs']//p[normalize-space(string()) != '']")
-                            for p in paras[:3]:
-                                t = p.text.strip()
-                                if t and len(t) > 10:
-                                    lines.append(t)
-                        if lines:
-                            seen_txt = set()
-                            uniq = []
-                            for t in lines:
-                                if t not in seen_txt:
-                                    uniq.append(t)
-                                    seen_txt.add(t)
-                            desc_hint = "; ".join(uniq)[:700]
-                    except Exception:
-                        pass
-
-                    product_links_data.append({
-                        'link': href,
-                        'name_hint': name_hint,
-                        'sku_hint': sku_hint,
-                        'img_hint': img_hint,
-                        'desc_hint': desc_hint
-                    })
-                    seen_links.add(href)
-                except Exception:
-                    continue
+            product_links_data = _extract_tiles(driver, max_products_env)
+            seen_links.update(pl['link'] for pl in product_links_data)
 
             # 2) Fallback aux ancres si aucune carte détectée
             if not product_links_data:
@@ -650,7 +697,13 @@ def scrape_category_page(driver, wait, category_url):
 
         if not SKIP_PDP_ENRICH:
             for i in range(len(page_products)):
+                # Produit déjà enrichi lors d'un run interrompu: pas de nouvelle visite PDP
+                done = CHECKPOINT.product(page_products[i].get('link'))
+                if done is not None:
+                    page_products[i] = done
+                    continue
                 page_products[i] = enrich_if_needed(page_products[i])
+                CHECKPOINT.add_product(page_products[i])
         else:
             print("⏭️ Enrichissement PDP désactivé (SKIP_PDP_ENRICH=true)")
 
@@ -677,6 +730,8 @@ def scrape_category_page(driver, wait, category_url):
 if __name__ == "__main__":
     print(f"🚀 Démarrage du scraping pour la marque : {BRAND}")
     all_products_data = []
+    # Écriture DB en continu (DB_STREAM_WRITES=true): chaque catégorie part en base pendant la suivante
+    db_writer = open_stream_writer("serveurs", BRAND) if callable(open_stream_writer) else None
     # Boucle sur chaque URL de catégorie
     # Respecter un éventuel MAX_PRODUCTS global (par page cumulée)
     try:
@@ -686,33 +741,55 @@ if __name__ == "__main__":
             max_products_env = 0
 
         for url in URLS_TO_SCRAPE:
-            products_from_category = scrape_category_page(driver, wait, url)
+            products_from_category = CHECKPOINT.page(url)
+            if products_from_category is not None:
+                print(f"♻️ Catégorie déjà traitée (journal) : {url}")
+            else:
+                products_from_category = scrape_category_page(driver, wait, url)
+                CHECKPOINT.save_page(url, products_from_category)
             if max_products_env and len(all_products_data) + len(products_from_category) > max_products_env:
                 take = max(0, max_products_env - len(all_products_data))
                 all_products_data.extend(products_from_category[:take])
+                if db_writer:
+                    db_writer.put_many(products_from_category[:take])
                 print(f"✨ Limite MAX_PRODUCTS atteinte ({max_products_env}).")
                 break
             else:
                 all_products_data.extend(products_from_category)
+                if db_writer:
+                    db_writer.put_many(products_from_category)
                 print(f"✨ {len(products_from_category)} produits ajoutés depuis cette catégorie.")
             if url != URLS_TO_SCRAPE[-1]: # Si ce n'est pas la dernière catégorie
                 print(f"⏳ Pause de {DELAY_BETWEEN_PAGES} secondes avant la catégorie suivante...")
                 time.sleep(DELAY_BETWEEN_PAGES)
     except Exception as e:
         print(f"❌ Erreur fatale pendant l'exécution: {e}")
+        MANIFEST.error(e)
         traceback.print_exc()
     finally:
         try:
             driver.quit()
         except Exception:
             pass
+        if db_writer:
+            db_writer.close()
 
     if all_products_data:
         with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
             json.dump(all_products_data, f, ensure_ascii=False, indent=4)
+        MANIFEST.finish(OUTPUT_JSON, len(all_products_data))
+        CHECKPOINT.complete()
         print(f"\n🎯 Extraction terminée. {len(all_products_data)} produits au total enregistrés dans {OUTPUT_JSON}")
 
-        if ENABLE_DB and _DB_IMPORT_OK and callable(save_to_database):
+        if ENABLE_DB and _DB_IMPORT_OK and db_writer:
+            # Produits déjà upsertés par l'écrivain en flux: reste la désactivation des non revus
+            print(f"\n💾 Produits déjà écrits en flux ({db_writer.stats['batches']} lots), désactivation des non revus...")
+            if db_writer.stats['failed']:
+                print(f"⚠️ {db_writer.stats['failed']} produits en échec d'écriture, sauvegarde complète")
+                save_to_database(OUTPUT_JSON, "serveurs", BRAND)
+            else:
+                deactivate_missing_products(all_products_data, "serveurs", BRAND)
+        elif ENABLE_DB and _DB_IMPORT_OK and callable(save_to_database):
             print("\n💾 Tentative de sauvegarde en base de données...")
             try:
                 save_to_database(OUTPUT_JSON, "serveurs", BRAND)
@@ -724,7 +801,7 @@ if __name__ == "__main__":
             if not ENABLE_DB:
                 print("ℹ️ Sauvegarde BD désactivée (ENABLE_DB=false)")
             elif not _DB_IMPORT_OK:
-                print("ℹ️ Sauvegarde BD ignorée: import 'database.mysql_connector' introuvable.")
+                print("ℹ️ Sauvegarde BD ignorée: import 'database.save' introuvable.")
             else:
                 print("ℹ️ Sauvegarde BD ignorée: fonction save_to_database non disponible.")
     else:
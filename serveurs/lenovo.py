@@ -1,17 +1,20 @@
 import json
 import time
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from selenium.webdriver.chrome.options import Options
 import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
+from scraping.waits import all_of, count_above, dom_quiet, element_count_stable, network_idle, page_settled, spec_table_populated, wait_for
+
 # Env toggles for stability/speed
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").strip().lower() in {"1","true","yes","on"}
 FAST_SCRAPE = os.getenv("FAST_SCRAPE", "false").strip().lower() in {"1","true","yes","on"}
 try:
     MAX_PRODUCTS_LIMIT = int(os.getenv("MAX_PRODUCTS", "0") or 0)
@@ -20,6 +23,10 @@ except Exception:
 
 # Configuration
 OUTPUT_JSON = "lenovo_servers_full.json"
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest("Lenovo", "serveurs")
+# Journal de reprise (SCRAPER_CHECKPOINT_DIR): catégories et produits déjà traités
+CHECKPOINT = Checkpoint("lenovo_servers")
 CATEGORIES = {
     "Rack Servers": "https://www.lenovo.com/tn/fr/c/servers-storage/servers/racks/",
     "Tower Servers": "https://www.lenovo.com/tn/fr/c/servers-storage/servers/towers/",
@@ -31,24 +38,8 @@ CATEGORIES = {
 
 def setup_driver():
     """Configure et retourne le driver Chrome"""
-    chrome_options = Options()
-    chrome_options.page_load_strategy = 'eager'
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    if FAST_SCRAPE:
-        prefs = {"profile.managed_default_content_settings.images": 2}
-        chrome_options.add_experimental_option("prefs", prefs)
-    if HEADLESS_MODE:
-        chrome_options.add_argument("--headless=new")
-    
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+    driver = create_driver(manifest=MANIFEST)
     try:
         driver.set_page_load_timeout(15 if FAST_SCRAPE else 30)
     except Exception:
@@ -191,7 +182,8 @@ def extract_detailed_specs_from_product_page(driver, product_link):
         
         try:
             driver.get(product_link)
-            time.sleep(5)  # Attendre plus longtemps pour le chargement JavaScript
+            # Rendu JavaScript de la fiche: document, réseau et DOM stabilisés (au plus 5s comme avant)
+            print(f"⏳ {wait_for(driver, page_settled(), timeout=5)}")
             
             # Débogage : afficher le titre de la page
             page_title = driver.title
@@ -203,7 +195,7 @@ def extract_detailed_specs_from_product_page(driver, product_link):
                 if tech_specs_tab.is_displayed():
                     tech_specs_tab.click()
                     print("✅ Clic sur l'onglet 'Tech Specs'")
-                    time.sleep(3)  # Attendre le chargement des spécifications
+                    wait_for(driver, spec_table_populated(".specs-table .item"), timeout=3)
             except:
                 print("⚠️ Onglet 'Tech Specs' non trouvé ou déjà ouvert")
             
@@ -361,7 +353,8 @@ def extract_products_from_page(driver, category_name):
         for i in range(max_scrolls):
             current_position += scroll_increment
             driver.execute_script(f"window.scrollTo(0, {current_position});")
-            time.sleep(1 if FAST_SCRAPE else 3)  # Attendre un peu à chaque scroll
+            # Lazy loading déclenché: attendre que réseau et DOM se calment
+            wait_for(driver, all_of(network_idle(idle_for=0.3), dom_quiet(0.3)), timeout=1 if FAST_SCRAPE else 3)
             
             current_products = len(driver.find_elements(By.CSS_SELECTOR, "li.product_item"))
             # Arrêt anticipé si plafond atteint
@@ -374,7 +367,7 @@ def extract_products_from_page(driver, category_name):
 
         # Scroll final vers le bas
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2 if FAST_SCRAPE else 5)
+        wait_for(driver, all_of(network_idle(), element_count_stable("li.product_item")), timeout=2 if FAST_SCRAPE else 5)
 
         products_after_scroll = len(driver.find_elements(By.CSS_SELECTOR, "li.product_item"))
         print(f"📊 Produits après scroll: {products_after_scroll}")
@@ -442,7 +435,7 @@ def extract_products_from_page(driver, category_name):
             print(f"⚠️ Erreur lors de la gestion de la popup: {e}")
         
         # Attendre que la popup soit complètement fermée
-        time.sleep(3)
+        wait_for(driver, dom_quiet(), timeout=3)
         
         # Chercher et cliquer sur le bouton "Load More"
         print("🔍 Recherche du bouton 'Load More'...")
@@ -467,7 +460,7 @@ def extract_products_from_page(driver, category_name):
                             
                             # Scroll vers le bouton
                             driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(3)
+                            wait_for(driver, dom_quiet(0.3), timeout=3)
                             
                             # Compter les produits avant le clic
                             products_before = len(driver.find_elements(By.CSS_SELECTOR, "li.product_item"))
@@ -477,9 +470,14 @@ def extract_products_from_page(driver, category_name):
                             driver.execute_script("arguments[0].click();", button)
                             print("🖱️ Clic JavaScript sur le bouton 'Load More' réussi")
                             
-                            # Attendre le chargement avec un timeout plus long
+                            # Nouveaux produits arrivés et liste stabilisée (au plus 15s comme avant)
                             print("⏳ Attente du chargement des nouveaux produits...")
-                            time.sleep(15)
+                            waited = wait_for(driver, all_of(
+                                count_above("li.product_item", products_before),
+                                element_count_stable("li.product_item"),
+                                network_idle(),
+                            ), timeout=15)
+                            print(f"⏳ {waited}")
                             
                             # Compter les produits après le clic
                             products_after = len(driver.find_elements(By.CSS_SELECTOR, "li.product_item"))
@@ -503,9 +501,13 @@ def extract_products_from_page(driver, category_name):
                                                 
                                                 current_count = len(driver.find_elements(By.CSS_SELECTOR, "li.product_item"))
                                                 driver.execute_script("arguments[0].scrollIntoView(true);", new_button)
-                                                time.sleep(2)
+                                                wait_for(driver, dom_quiet(0.3), timeout=2)
                                                 driver.execute_script("arguments[0].click();", new_button)
-                                                time.sleep(15)
+                                                wait_for(driver, all_of(
+                                                    count_above("li.product_item", current_count),
+                                                    element_count_stable("li.product_item"),
+                                                    network_idle(),
+                                                ), timeout=15)
                                                 
                                                 new_count = len(driver.find_elements(By.CSS_SELECTOR, "li.product_item"))
                                                 if new_count > current_count:
@@ -588,6 +590,12 @@ def extract_products_from_page(driver, category_name):
                     except:
                         print(f"⚠️ Lien du produit {name} non trouvé")
                 
+                # Produit déjà extrait lors d'un run interrompu: pas de nouvelle visite PDP
+                done = CHECKPOINT.product(link)
+                if done is not None:
+                    products.append(done)
+                    continue
+                
                 # Extraire l'image
                 image_url = ""
                 try:
@@ -638,6 +646,7 @@ def extract_products_from_page(driver, category_name):
                 }
                 
                 products.append(product_data)
+                CHECKPOINT.add_product(product_data)
                 print(f"✅ Produit {i} extrait: {name}")
                 
             except Exception as e:
@@ -664,8 +673,14 @@ def scrape_lenovo_servers():
             print(f"URL: {url}")
             
             try:
+                cached = CHECKPOINT.page(url)
+                if cached is not None:
+                    print("♻️ Catégorie déjà traitée (journal)")
+                    all_products.extend(cached)
+                    continue
+                
                 driver.get(url)
-                time.sleep(3)
+                wait_for(driver, page_settled(), timeout=3)
                 
                 # Gérer les cookies à la première visite
                 if category_name == list(CATEGORIES.keys())[0]:
@@ -736,6 +751,7 @@ def scrape_lenovo_servers():
                 # Extraire les produits de cette catégorie
                 products = extract_products_from_page(driver, category_name)
                 all_products.extend(products)
+                CHECKPOINT.save_page(url, products)
                 
                 # Pause entre les catégories
                 time.sleep(1 if FAST_SCRAPE else 2)
@@ -761,6 +777,8 @@ def scrape_lenovo_servers():
         
         with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
             json.dump(unique_products, f, ensure_ascii=False, indent=2)
+        MANIFEST.finish(OUTPUT_JSON, len(unique_products))
+        CHECKPOINT.complete()
         
         print(f"✅ Scraping terminé ! {len(unique_products)} produits sauvegardés dans {OUTPUT_JSON}")
         
@@ -772,6 +790,7 @@ def scrape_lenovo_servers():
         
     except Exception as e:
         print(f"❌ Erreur générale : {e}")
+        MANIFEST.error(e)
     
     finally:
         driver.quit()
@@ -780,7 +799,7 @@ if __name__ == "__main__":
     # Import tardif pour éviter import circulaire si exécuté comme module
     try:
         sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-        from database.mysql_connector import save_to_database
+        from database.save import save_to_database
     except Exception:
         save_to_database = None
 
@@ -6,15 +6,19 @@ import time
 import json
 import logging
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 import os
+import sys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
+from scraping.waits import all_of, dom_quiet, network_idle, page_settled, spec_table_populated, wait_for
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,6 +28,10 @@ class XFusionServerScraperImproved:
         self.driver = None
         self.wait = None
         self.logger = logger
+        # Manifeste du run (fourni par main), compte aussi les pages chargées
+        self.manifest = None
+        # Journal de reprise (SCRAPER_CHECKPOINT_DIR): catégories et produits déjà traités
+        self.checkpoint = Checkpoint("xfusion_servers")
         
         # URLs des différentes catégories
         self.categories = {
@@ -36,19 +44,8 @@ class XFusionServerScraperImproved:
     
     def setup_driver(self):
         """Configuration du driver Chrome"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        
-        # Utiliser Selenium Manager; fallback local si nécessaire
-        try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-        except Exception:
-            local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-            self.driver = webdriver.Chrome(service=Service(local_driver), options=chrome_options)
+        # Profil commun (scraping/driver.py), toujours headless; pool du scheduler si disponible
+        self.driver = create_driver(manifest=self.manifest, headless=True)
         self.wait = WebDriverWait(self.driver, 15)
         
     def extract_table_servers_improved(self, url, category_name):
@@ -57,7 +54,7 @@ class XFusionServerScraperImproved:
         
         try:
             self.driver.get(url)
-            time.sleep(5)
+            self.logger.info(f"⏳ {wait_for(self.driver, page_settled(), timeout=5)}")
             
             # Attendre le chargement complet
             self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
@@ -72,10 +69,9 @@ class XFusionServerScraperImproved:
             while scroll_attempts < max_scroll_attempts:
                 # Scroll vers le bas
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
                 
-                # Attendre le chargement des nouveaux éléments
-                time.sleep(3)
+                # Attendre le chargement des nouveaux éléments (au plus 5s comme avant)
+                wait_for(self.driver, all_of(network_idle(), dom_quiet()), timeout=5)
                 
                 # Calculer la nouvelle hauteur
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -90,7 +86,7 @@ class XFusionServerScraperImproved:
                 self.logger.info(f"📜 Scroll {scroll_attempts}: nouvelle hauteur = {new_height}")
             
             # Attendre un peu plus pour le chargement final
-            time.sleep(5)
+            wait_for(self.driver, all_of(network_idle(), dom_quiet()), timeout=5)
             
             # Chercher le tableau après le scroll complet
             table_found = False
@@ -242,6 +238,11 @@ class XFusionServerScraperImproved:
                 "image_url": ""
             }
             
+            # Produit déjà extrait lors d'un run interrompu: pas de nouvelle visite PDP
+            done = self.checkpoint.product(link)
+            if done is not None:
+                return done
+            
             # Extraire les liens datasheet, image et spécifications détaillées depuis la page produit
             datasheet_link, image_url, detailed_specs = self.extract_product_details(link)
             server_data["datasheet_link"] = datasheet_link
@@ -256,6 +257,7 @@ class XFusionServerScraperImproved:
             if not self.is_complete_server(server_data):
                 return None  # Exclure ce produit
             
+            self.checkpoint.add_product(server_data)
             return server_data
                 
         except Exception as e:
@@ -309,7 +311,7 @@ class XFusionServerScraperImproved:
             self.driver.switch_to.window(self.driver.window_handles[1])
             
             self.driver.get(product_url)
-            time.sleep(5)
+            self.logger.debug(f"⏳ {wait_for(self.driver, page_settled(), timeout=5)}")
             
             # ÉTAPE 1: Extraire les spécifications techniques détaillées
             self.logger.info(f"🔍 Extraction des spécifications techniques pour: {product_url}")
@@ -318,7 +320,7 @@ class XFusionServerScraperImproved:
             try:
                 tech_specs_tab = self.driver.find_element(By.XPATH, "//a[contains(text(), 'Technical Specifications')]")
                 self.driver.execute_script("arguments[0].click();", tech_specs_tab)
-                time.sleep(3)
+                wait_for(self.driver, spec_table_populated("table tr td"), timeout=3)
                 self.logger.debug("✅ Clic sur l'onglet Technical Specifications")
             except:
                 self.logger.debug("ℹ️ Onglet Technical Specifications non trouvé ou déjà ouvert")
@@ -377,7 +379,7 @@ class XFusionServerScraperImproved:
             try:
                 related_tab = self.driver.find_element(By.XPATH, "//a[contains(text(), 'Related Resources')]")
                 self.driver.execute_script("arguments[0].click();", related_tab)
-                time.sleep(2)
+                wait_for(self.driver, dom_quiet(0.3), timeout=2)
                 self.logger.debug("✅ Clic sur l'onglet Related Resources")
             except:
                 self.logger.debug("❌ Onglet Related Resources non trouvé")
@@ -464,11 +466,11 @@ class XFusionServerScraperImproved:
         
         try:
             self.driver.get(url)
-            time.sleep(5)
+            wait_for(self.driver, page_settled(), timeout=5)
             
             # Scroll pour charger tout le contenu
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            wait_for(self.driver, all_of(network_idle(), dom_quiet()), timeout=3)
             
             # Chercher toutes les sections avec jiedian_list
             sections = self.driver.find_elements(By.CSS_SELECTOR, ".jiedian_list")
@@ -518,6 +520,11 @@ class XFusionServerScraperImproved:
                             "image_url": ""
                         }
                         
+                        done = self.checkpoint.product(link)
+                        if done is not None:
+                            servers.append(done)
+                            continue
+                        
                         # Extraire les liens datasheet, image et spécifications détaillées depuis la page produit
                         datasheet_link, image_url, detailed_specs = self.extract_product_details(link)
                         server_data["datasheet_link"] = datasheet_link
@@ -529,6 +536,7 @@ class XFusionServerScraperImproved:
                             self.logger.info(f"✅ Spécifications détaillées remplacées pour: {name}")
                         
                         servers.append(server_data)
+                        self.checkpoint.add_product(server_data)
                         self.logger.info(f"✅ Serveur Rack-Scale {i+1}: {name}")
                         
                 except Exception as e:
@@ -542,9 +550,13 @@ class XFusionServerScraperImproved:
     
     def extract_fusionpod_ai(self, url):
         """Extrait les données FusionPoD for AI"""
+        done = self.checkpoint.product(url)
+        if done is not None:
+            return [done]
+        
         try:
             self.driver.get(url)
-            time.sleep(5)
+            wait_for(self.driver, page_settled(spec_selector=".jieshao_feature"), timeout=5)
             
             # Extraire les spécifications
             specs = {}
@@ -584,6 +596,7 @@ class XFusionServerScraperImproved:
                 server_data["tech_specs"] = detailed_specs
                 self.logger.info(f"✅ Spécifications détaillées remplacées pour: FusionPoD for AI")
             
+            self.checkpoint.add_product(server_data)
             return [server_data]
             
         except Exception as e:
@@ -600,6 +613,12 @@ class XFusionServerScraperImproved:
             for category, url in self.categories.items():
                 self.logger.info(f"🔍 Scraping {category}...")
                 
+                cached = self.checkpoint.page(url)
+                if cached is not None:
+                    self.logger.info(f"♻️ {category}: déjà traitée (journal)")
+                    all_servers.extend(cached)
+                    continue
+                
                 if category == "Rack-Scale Servers":
                     servers = self.extract_rack_scale_servers(url)
                 elif category == "FusionPoD for AI":
@@ -608,6 +627,7 @@ class XFusionServerScraperImproved:
                     servers = self.extract_table_servers_improved(url, category)
                 
                 all_servers.extend(servers)
+                self.checkpoint.save_page(url, servers)
                 self.logger.info(f"✅ {category}: {len(servers)} serveurs trouvés")
                 
                 time.sleep(2)  # Pause entre les catégories
@@ -624,17 +644,23 @@ class XFusionServerScraperImproved:
             json.dump(servers, f, indent=2, ensure_ascii=False)
         
         self.logger.info(f"💾 Données sauvegardées dans {filename}")
+        return filename
 
 
 def main():
     scraper = XFusionServerScraperImproved()
+    # Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+    manifest = RunManifest("xFusion", "serveurs")
+    scraper.manifest = manifest
     
     logger.info("🚀 Démarrage du scraping XFusion amélioré...")
     
     servers = scraper.scrape_all_categories()
     
     if servers:
-        scraper.save_to_json(servers)
+        output_json = scraper.save_to_json(servers)
+        manifest.finish(output_json, len(servers))
+        scraper.checkpoint.complete()
         
         # Afficher le résumé
         print("\n📊 RÉSUMÉ DU SCRAPING AMÉLIORÉ:")
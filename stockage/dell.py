@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -13,12 +11,20 @@ import sys
 
 # Ajouter le chemin du module database
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database.mysql_connector import save_to_database
+from database.save import save_to_database
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
+from scraping.waits import all_of, dom_quiet, element_count_stable, network_idle, wait_for
 ENABLE_DB = os.getenv("ENABLE_DB", "false").lower() == "true"
 
 # ✅ CONFIGURATION DELL STOCKAGE
 BRAND = "Dell"
 OUTPUT_JSON = "dell_storage_full.json"
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest(BRAND, "stockage")
+# Journal de reprise par catégorie / onglet, relu si SCRAPER_RESUME=1
+CHECKPOINT = Checkpoint("dell_storage")
 
 # 📦 URLs des catégories de stockage Dell - PRODUCTION COMPLÈTE
 STORAGE_URLS = [
@@ -70,34 +76,11 @@ POWERSCALE_CATEGORIES = [
 MAX_PRODUCTS_PER_CATEGORY = int(os.getenv("MAX_PRODUCTS", "15") or 15)
 DELAY_BETWEEN_PRODUCTS = 1
 DELAY_BETWEEN_CATEGORIES = 2
+# Attente maximale (s) de stabilisation du tableau produits (scraping/waits.py)
 DELAY_FOR_PAGE_LOAD = 3
+PRODUCT_ROW_SELECTOR = "div[role='row'].cmfe-row:not(.cmfe-header-row)"
 
-# ✅ Setup Selenium avec options anti-détection
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").strip().lower() in {"1","true","yes","on"}
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-options.add_argument("--disable-logging")
-options.add_argument("--disable-gpu-sandbox")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-if HEADLESS_MODE:
-    options.add_argument("--headless=new")
-
-try:
-    driver = webdriver.Chrome(options=options)
-except Exception:
-    try:
-        local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-        driver = webdriver.Chrome(service=Service(local_driver), options=options)
-    except Exception as e:
-        raise e
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-wait = WebDriverWait(driver, 30)
-driver.implicitly_wait(10)
+# ✅ Navigateur: profil commun (scraping/driver.py), créé dans scrape_all_dell_storage (un seul Chrome par run)
 
 def handle_popups_and_cookies(driver, wait):
     """Gère les popups et bannières de cookies Dell"""
@@ -221,7 +204,7 @@ def click_dell_tab(driver, wait, tab_name):
                         time.sleep(1)
                         driver.execute_script("arguments[0].click();", element)
                         print(f"   📑 Clic sur l'onglet Dell '{tab_name}' réussi avec JS")
-                        time.sleep(3)
+                        wait_for(driver, all_of(network_idle(), dom_quiet()), timeout=3)
                         return True
                 else:
                     # CSS selector
@@ -242,7 +225,7 @@ def click_dell_tab(driver, wait, tab_name):
                                 driver.execute_script("arguments[0].click();", element)
                             
                             print(f"   📑 Clic sur l'onglet Dell '{tab_name}' réussi")
-                            time.sleep(3)
+                            wait_for(driver, all_of(network_idle(), dom_quiet()), timeout=3)
                             return True
                         else:
                             print(f"   ⚠️ Élément trouvé mais non visible: {selector}")
@@ -279,19 +262,20 @@ def extract_products_from_category_page(driver, wait, category_url, tab_info=Non
                     # Attendre que les lignes cachées deviennent visibles
                     wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, 
                         "div[role='row'].cmfe-row:not(.cmfe-header-row):not(.dds__d-none)")) > 0)
-                    time.sleep(2)  # Délai supplémentaire pour stabilisation
+                    # Stabilisation: plus de nouvelles lignes affichées
+                    wait_for(driver, element_count_stable(f"{PRODUCT_ROW_SELECTOR}:not(.dds__d-none)", stable_for=0.5), timeout=2)
                 except TimeoutException:
                     print("⚠️ Timeout en attendant le chargement du contenu de l'onglet")
         
         # Attendre le chargement du tableau Dell
         try:
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.cmfe-table")))
-            time.sleep(DELAY_FOR_PAGE_LOAD)
+            print(f"⏳ {wait_for(driver, all_of(element_count_stable(PRODUCT_ROW_SELECTOR), network_idle()), timeout=DELAY_FOR_PAGE_LOAD)}")
         except TimeoutException:
             print(f"⚠️ Tableau Dell non trouvé, essai avec sélecteur alternatif...")
             try:
                 wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "[role='table']")))
-                time.sleep(DELAY_FOR_PAGE_LOAD)
+                wait_for(driver, all_of(element_count_stable("[role='row']"), network_idle()), timeout=DELAY_FOR_PAGE_LOAD)
             except TimeoutException:
                 print(f"❌ Aucun tableau de produits trouvé sur {category_url}")
                 return products
@@ -345,6 +329,13 @@ def extract_products_from_category_page(driver, wait, category_url, tab_info=Non
                     
                 # Combiner les informations
                 category_name = tab_info['name'] if tab_info else extract_category_from_url(category_url)
+                # Lien = fiche technique, parfois partagée entre modèles: clé catégorie + nom
+                checkpoint_key = f"{category_name}|{product_info['name']}"
+                done = CHECKPOINT.product(checkpoint_key)
+                if done is not None:
+                    # Déjà extrait lors d'un run interrompu: pas de pause entre produits
+                    products.append(done)
+                    continue
                 product_data = {
                     "brand": BRAND,
                     "category": category_name,
@@ -357,6 +348,7 @@ def extract_products_from_category_page(driver, wait, category_url, tab_info=Non
                 }
                 
                 products.append(product_data)
+                CHECKPOINT.add_product(product_data, key=checkpoint_key)
                 print(f"✅ [{index+1}/{len(product_rows)}] {product_info['name']} - {len(product_info['tech_specs'])} spécifications")
                 
                 # Pause entre produits
@@ -489,23 +481,8 @@ def scrape_all_dell_storage():
     print("🚀 Dell Storage - Toutes catégories (ObjectScale + Unity XT + PowerStore + PowerMax + PowerVault + PowerScale)")
     all_products = []
     
-    # Configuration du driver WebDriver
-    options = webdriver.ChromeOptions()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    try:
-        driver = webdriver.Chrome(options=options)
-    except Exception:
-        try:
-            local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-            driver = webdriver.Chrome(service=Service(local_driver), options=options)
-        except Exception as e:
-            raise e
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Driver WebDriver (profil commun, attaché au pool du scheduler si disponible)
+    driver = create_driver(manifest=MANIFEST)
     
     wait = WebDriverWait(driver, 15)
     
@@ -515,9 +492,15 @@ def scrape_all_dell_storage():
             try:
                 print(f"\n📂 [{i}/{len(STORAGE_URLS) + len(POWERVAULT_CATEGORIES) + len(POWERSCALE_CATEGORIES)}] Traitement catégorie Dell: {extract_category_from_url(category_url)}")
                 
-                # Extraire les produits de cette catégorie Dell
+                # Extraire les produits de cette catégorie Dell (ou les reprendre du journal)
+                category_products = CHECKPOINT.page(category_url)
+                if category_products is not None:
+                    print("♻️ Catégorie déjà traitée (journal)")
+                    all_products.extend(category_products)
+                    continue
                 category_products = extract_products_from_category_page(driver, wait, category_url)
                 all_products.extend(category_products)
+                CHECKPOINT.save_page(category_url, category_products)
                 
                 print(f"✅ Catégorie Dell {i} terminée - {len(category_products)} produits extraits")
                 
@@ -535,11 +518,18 @@ def scrape_all_dell_storage():
             try:
                 print(f"\n📂 [{i}/{len(STORAGE_URLS) + len(POWERVAULT_CATEGORIES) + len(POWERSCALE_CATEGORIES)}] PowerVault: {powervault_tab['name']}")
                 
-                # Extraire les produits de cet onglet PowerVault
+                # Extraire les produits de cet onglet PowerVault (ou les reprendre du journal)
+                page_key = f"{powervault_tab['url']}#{powervault_tab['name']}"
+                category_products = CHECKPOINT.page(page_key)
+                if category_products is not None:
+                    print("♻️ Onglet déjà traité (journal)")
+                    all_products.extend(category_products)
+                    continue
                 category_products = extract_products_from_category_page(
                     driver, wait, powervault_tab['url'], powervault_tab
                 )
                 all_products.extend(category_products)
+                CHECKPOINT.save_page(page_key, category_products)
                 
                 print(f"✅ PowerVault onglet {i-base_index} terminé - {len(category_products)} produits extraits")
                 
@@ -558,11 +548,18 @@ def scrape_all_dell_storage():
             try:
                 print(f"\n📂 [{i}/{len(STORAGE_URLS) + len(POWERVAULT_CATEGORIES) + len(POWERSCALE_CATEGORIES)}] PowerScale: {powerscale_tab['name']}")
                 
-                # Extraire les produits de cet onglet PowerScale
+                # Extraire les produits de cet onglet PowerScale (ou les reprendre du journal)
+                page_key = f"{powerscale_tab['url']}#{powerscale_tab['name']}"
+                category_products = CHECKPOINT.page(page_key)
+                if category_products is not None:
+                    print("♻️ Onglet déjà traité (journal)")
+                    all_products.extend(category_products)
+                    continue
                 category_products = extract_products_from_category_page(
                     driver, wait, powerscale_tab['url'], powerscale_tab
                 )
                 all_products.extend(category_products)
+                CHECKPOINT.save_page(page_key, category_products)
                 
                 print(f"✅ PowerScale onglet {i-base_index_2} terminé - {len(category_products)} produits extraits")
                 
@@ -603,6 +600,8 @@ if __name__ == "__main__":
             # Sauvegarder en JSON
             with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
                 json.dump(products, f, ensure_ascii=False, indent=4)
+            MANIFEST.finish(OUTPUT_JSON, len(products))
+            CHECKPOINT.complete()
             print(f"💾 Données Dell sauvegardées dans {OUTPUT_JSON}")
             
             # Sauvegarde en base de données conditionnelle
@@ -620,5 +619,4 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"❌ Erreur fatale Dell: {e}")
-    finally:
-        driver.quit()
+        MANIFEST.error(e)
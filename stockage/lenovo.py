@@ -1,5 +1,3 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -13,12 +11,19 @@ import sys
 
 # Ajouter le chemin du module database
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database.mysql_connector import save_to_database
+from database.save import save_to_database
+from scraping.checkpoint import Checkpoint
+from scraping.driver import create_driver
+from scraping.manifest import RunManifest
 ENABLE_DB = os.getenv("ENABLE_DB", "false").lower() == "true"
 
 # ✅ CONFIGURATION LENOVO STOCKAGE
 BRAND = "Lenovo"
 OUTPUT_JSON = "lenovo_storage_full.json"
+# Manifeste de run pour le scheduler (SCRAPER_MANIFEST_PATH)
+MANIFEST = RunManifest(BRAND, "stockage")
+# Journal de reprise par catégorie, relu si SCRAPER_RESUME=1
+CHECKPOINT = Checkpoint("lenovo_storage")
 
 # 📦 URLs des catégories de stockage Lenovo - PRODUCTION COMPLÈTE
 STORAGE_URLS = [
@@ -36,30 +41,8 @@ DELAY_BETWEEN_PRODUCTS = 1
 DELAY_BETWEEN_CATEGORIES = 1
 DELAY_FOR_PAGE_LOAD = 2
 
-# ✅ Setup Selenium avec options anti-détection
-HEADLESS_MODE = os.getenv("HEADLESS_MODE", "false").strip().lower() in {"1","true","yes","on"}
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-options.add_argument("--disable-logging")
-options.add_argument("--disable-gpu-sandbox")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-if HEADLESS_MODE:
-    options.add_argument("--headless=new")
-
-try:
-    driver = webdriver.Chrome(options=options)
-except Exception:
-    try:
-        local_driver = os.path.join(os.getcwd(), "chromedriver.exe")
-        driver = webdriver.Chrome(service=Service(local_driver), options=options)
-    except Exception as e:
-        raise e
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+# ✅ Navigateur: profil commun (scraping/driver.py), attaché au pool du scheduler si disponible
+driver = create_driver(manifest=MANIFEST)
 wait = WebDriverWait(driver, 30)
 driver.implicitly_wait(10)
 
@@ -148,6 +131,12 @@ def extract_products_from_category_page(driver, wait, category_url):
                 
                 if not product_info:
                     continue
+
+                # Produit déjà extrait lors d'un run interrompu: pas de nouvel onglet produit
+                done = CHECKPOINT.product(product_info["link"])
+                if done is not None:
+                    products.append(done)
+                    continue
                     
                 # IMPORTANT: Cliquer sur "Learn More" depuis la liste pour accéder aux spécifications
                 detailed_specs = click_learn_more_and_extract_specs(driver, wait, item, product_info["name"])
@@ -165,6 +154,7 @@ def extract_products_from_category_page(driver, wait, category_url):
                 }
                 
                 products.append(product_data)
+                CHECKPOINT.add_product(product_data)
                 print(f"✅ [{index+1}/{len(product_items)}] {product_info['name']} - {len(detailed_specs)} spécifications")
                 
                 # Pause entre produits
@@ -587,9 +577,15 @@ def scrape_all_lenovo_storage():
         try:
             print(f"\n📂 [{i}/{len(STORAGE_URLS)}] Traitement catégorie: {extract_category_from_url(category_url)}")
             
-            # Extraire les produits de cette catégorie
+            # Extraire les produits de cette catégorie (ou les reprendre du journal)
+            category_products = CHECKPOINT.page(category_url)
+            if category_products is not None:
+                print("♻️ Catégorie déjà traitée (journal)")
+                all_products.extend(category_products)
+                continue
             category_products = extract_products_from_category_page(driver, wait, category_url)
             all_products.extend(category_products)
+            CHECKPOINT.save_page(category_url, category_products)
             
             print(f"✅ Catégorie {i} terminée - {len(category_products)} produits extraits")
             
@@ -625,6 +621,8 @@ if __name__ == "__main__":
             # Sauvegarder en JSON
             with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
                 json.dump(products, f, ensure_ascii=False, indent=4)
+            MANIFEST.finish(OUTPUT_JSON, len(products))
+            CHECKPOINT.complete()
             print(f"💾 Données sauvegardées dans {OUTPUT_JSON}")
             
             # Sauvegarde en base de données conditionnelle
@@ -642,5 +640,6 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"❌ Erreur fatale: {e}")
+        MANIFEST.error(e)
     finally:
         driver.quit()
@@ -0,0 +1,23 @@
+import pytest
+
+from database.sqlite_connector import SQLiteConnector
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Backend SQLite sur un fichier temporaire, schéma créé."""
+    db = SQLiteConnector({"path": str(tmp_path / "scraping.db"), "timeout": 5})
+    assert db.connect()
+    assert db.create_tables()
+    yield db
+    db.close()
+
+
+def make_product(brand, n, **specs):
+    return {
+        "brand": brand,
+        "name": f"{brand} {n}",
+        "sku": f"{brand[:2].upper()}-{n}",
+        "link": f"https://example.com/{brand.lower()}/{n}",
+        "tech_specs": specs or {"RAM": "32 GB"},
+    }
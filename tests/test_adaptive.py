@@ -0,0 +1,75 @@
+"""Répartition du budget navigateur (automation/adaptive.py): règle de la racine carrée bornée."""
+import math
+
+import pytest
+
+from automation.adaptive import _allocate
+
+
+def _used(costs, freqs):
+    return sum(costs[s] * freqs[s] for s in costs)
+
+
+def test_unclamped_frequencies_follow_square_root_rule_and_spend_budget():
+    costs = {"a": 100.0, "b": 400.0, "c": 900.0}
+    churn = {"a": 1.0, "b": 1.0, "c": 4.0}
+    freqs = _allocate(costs, churn, 1000.0, 0.0, math.inf)
+
+    assert _used(costs, freqs) == pytest.approx(1000.0)
+    ratios = {s: freqs[s] / math.sqrt(churn[s] / costs[s]) for s in costs}
+    assert ratios["a"] == pytest.approx(ratios["b"]) == pytest.approx(ratios["c"])
+    # √(1/100) : √(1/400) : √(4/900)
+    assert freqs["a"] == pytest.approx(2 * freqs["b"])
+
+
+def test_max_clamp_hands_leftover_budget_to_the_others():
+    costs = {"volatile": 10.0, "b": 100.0, "c": 400.0}
+    churn = {"volatile": 100.0, "b": 1.0, "c": 1.0}
+    freqs = _allocate(costs, churn, 1000.0, 0.0, 7.0)
+
+    assert freqs["volatile"] == 7.0
+    assert _used(costs, freqs) == pytest.approx(1000.0)
+    assert freqs["b"] == pytest.approx(2 * freqs["c"])
+    assert freqs["b"] < 7.0
+
+
+def test_zero_churn_gets_min_frequency():
+    costs = {"stable": 100.0, "b": 100.0, "c": 400.0}
+    churn = {"stable": 0.0, "b": 1.0, "c": 1.0}
+    freqs = _allocate(costs, churn, 1000.0, 0.25, 7.0)
+
+    assert freqs["stable"] == 0.25
+    assert _used(costs, freqs) == pytest.approx(1000.0)
+    assert freqs["b"] == pytest.approx(2 * freqs["c"])
+
+
+def test_all_zero_churn_gets_min_frequency():
+    costs = {"a": 100.0, "b": 200.0}
+    freqs = _allocate(costs, {"a": 0.0, "b": 0.0}, 1000.0, 0.25, 7.0)
+    assert freqs == {"a": 0.25, "b": 0.25}
+
+
+def test_exhausted_budget_falls_back_to_min_frequency():
+    costs = {"a": 100.0, "b": 400.0}
+    churn = {"a": 1.0, "b": 1.0}
+    assert _allocate(costs, churn, 0.0, 0.25, 7.0) == {"a": 0.25, "b": 0.25}
+    assert _allocate(costs, churn, -50.0, 0.25, 7.0) == {"a": 0.25, "b": 0.25}
+
+    # Budget consommé par le plancher d'un script: les autres restent au minimum
+    costs = {"stable": 1000.0, "b": 100.0}
+    freqs = _allocate(costs, {"stable": 0.0, "b": 1.0}, 200.0, 0.25, 7.0)
+    assert freqs == {"stable": 0.25, "b": 0.25}
+
+
+def test_frequencies_stay_within_bounds():
+    costs = {f"s{i}": 60.0 * (i + 1) for i in range(8)}
+    churn = {f"s{i}": 10.0 ** (i - 4) for i in range(8)}
+    freqs = _allocate(costs, churn, 5000.0, 0.25, 7.0)
+
+    assert set(freqs) == set(costs)
+    assert all(0.25 <= f <= 7.0 for f in freqs.values())
+    assert _used(costs, freqs) == pytest.approx(5000.0)
+
+
+def test_empty_input():
+    assert _allocate({}, {}, 1000.0, 0.25, 7.0) == {}
@@ -0,0 +1,84 @@
+"""Écrivain DB en arrière-plan: flush par lots, lignes brutes écrasées par l'upsert nettoyé."""
+import pytest
+
+from conftest import make_product
+from database import async_writer
+from database.async_writer import AsyncDBWriter, open_stream_writer
+
+
+@pytest.fixture
+def sqlite_backend(monkeypatch, tmp_path):
+    # get_connector() du thread écrivain → SQLiteConnector sur un fichier temporaire
+    monkeypatch.setattr("database.common.DB_BACKEND", "sqlite")
+    monkeypatch.setattr("database.sqlite_connector.SQLITE_CONFIG", {"path": str(tmp_path / "writer.db"), "timeout": 5})
+
+
+def test_batches_are_flushed_and_counted(sqlite_backend):
+    with AsyncDBWriter("serveurs", brand="HP", batch_size=2, flush_seconds=60) as writer:
+        writer.put_many([make_product("HP", n) for n in range(5)])
+    assert writer.error is None
+    assert writer.stats["new"] == 5
+    assert writer.stats["batches"] == 3
+
+
+def test_identical_rerun_counts_unchanged(sqlite_backend):
+    products = [make_product("HP", n) for n in range(3)]
+    for _ in range(2):
+        with AsyncDBWriter("serveurs", batch_size=10, flush_seconds=60) as writer:
+            writer.put_many(products)
+    assert writer.stats["unchanged"] == 3 and writer.stats["new"] == 0
+
+
+def test_stream_writer_enabled_for_standalone_runs(monkeypatch, sqlite_backend):
+    monkeypatch.setattr(async_writer, "DB_STREAM_WRITES", True)
+    monkeypatch.setenv("ENABLE_DB", "true")
+    monkeypatch.delenv("RUNNING_UNDER_SCHEDULER", raising=False)
+    writer = open_stream_writer("serveurs", "HP")
+    assert writer is not None
+    writer.close()
+
+
+def test_stream_writer_enabled_under_scheduler(monkeypatch, sqlite_backend):
+    # Un run tué au timeout doit avoir déjà persisté ses lignes
+    monkeypatch.setattr(async_writer, "DB_STREAM_WRITES", True)
+    monkeypatch.setenv("ENABLE_DB", "true")
+    monkeypatch.setenv("RUNNING_UNDER_SCHEDULER", "1")
+    writer = open_stream_writer("serveurs", "HP")
+    assert writer is not None
+    writer.close()
+
+
+def test_cleaned_upload_overwrites_streamed_raw_rows(sqlite_backend):
+    from database.common import get_connector
+    from database.save import deactivate_missing_products, save_products
+
+    raw = [make_product("HP", n, SKU=f"P{n}", RAM="32GB ") for n in range(2)]
+    for p in raw:
+        p["sku"] = None
+    with AsyncDBWriter("serveurs", brand="HP", batch_size=10, flush_seconds=60) as writer:
+        writer.put_many(raw)
+    assert writer.stats["new"] == 2
+
+    # Sortie nettoyée du scheduler: SKU remonté, specs normalisées, même lien
+    cleaned = [dict(p, sku=f"P{n}", tech_specs={"RAM": "32 GB"}) for n, p in enumerate(raw)]
+    assert save_products(cleaned, "serveurs", "HP")
+
+    db = get_connector()
+    assert db.connect()
+    try:
+        rows = list(db.iter_products("serveurs", brand="HP"))
+        assert sorted(r["sku"] for r in rows) == ["P0", "P1"]
+        assert all(r["tech_specs"] == {"RAM": "32 GB"} for r in rows)
+    finally:
+        db.close()
+
+    # Fin d'un run en flux: seule la désactivation des non revus reste à faire
+    assert deactivate_missing_products(cleaned[:1], "serveurs", "HP")
+    db = get_connector()
+    assert db.connect()
+    try:
+        cur = db.connection.cursor()
+        cur.execute("SELECT sku, is_active FROM serveurs ORDER BY sku")
+        assert [tuple(r) for r in cur.fetchall()] == [("P0", 1), ("P1", 0)]
+    finally:
+        db.close()
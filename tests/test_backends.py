@@ -0,0 +1,71 @@
+"""Le backend SQLite ne dépend pas du pilote MySQL."""
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_BLOCK_MYSQL = """
+import sys
+sys.modules['mysql'] = None
+sys.modules['mysql.connector'] = None
+"""
+
+_WITHOUT_MYSQL = _BLOCK_MYSQL + """
+from database.common import get_connector
+from database.async_writer import open_stream_writer
+db = get_connector('sqlite')
+assert type(db).__name__ == 'SQLiteConnector'
+assert 'database.mysql_connector' not in sys.modules
+"""
+
+# Chemin complet: sauvegarde des scrapers, upload en processus du scheduler, benchmark DB
+_PIPELINE_WITHOUT_MYSQL = _BLOCK_MYSQL + """
+import runpy
+from database.save import save_to_database
+from automation.scheduler import ScrapingScheduler
+
+assert save_to_database(sys.argv[1], 'serveurs', 'HP')
+scheduler = ScrapingScheduler()
+churn = scheduler.upload_products([{'brand': 'HP', 'name': 'DL380', 'link': 'https://hp.com/1',
+                                    'tech_specs': {'RAM': '64 GB'}}], 'serveurs', 'HP')
+scheduler.close_db()
+assert churn == {'new': 0, 'changed': 1, 'unchanged': 0, 'deactivated': 1}, churn
+
+sys.argv = ['bench_db.py', 'upsert', '--rows', '20', '--batch-size', '10']
+try:
+    runpy.run_path('tools/bench_db.py', run_name='__main__')
+except SystemExit as e:
+    assert not e.code, e.code
+assert 'database.mysql_connector' not in sys.modules
+"""
+
+
+def _run(code, *args, env=None):
+    return subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def test_sqlite_backend_imports_without_mysql_driver():
+    result = _run(_WITHOUT_MYSQL)
+    assert result.returncode == 0, result.stderr
+
+
+def test_save_upload_and_bench_run_without_mysql_driver(tmp_path):
+    products = tmp_path / "hp_servers.json"
+    products.write_text(json.dumps([
+        {"brand": "HP", "name": "DL380", "link": "https://hp.com/1", "tech_specs": {"RAM": "32 GB"}},
+        {"brand": "HP", "name": "DL360", "link": "https://hp.com/2", "tech_specs": {"RAM": "16 GB"}},
+    ]), encoding="utf-8")
+    env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=str(tmp_path / "scraping.db"),
+               SCHEDULER_SILENT_CONSOLE="1")
+
+    result = _run(_PIPELINE_WITHOUT_MYSQL, str(products), env=env)
+    assert result.returncode == 0, result.stderr + result.stdout
+    assert "rows/s" in result.stdout
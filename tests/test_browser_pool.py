@@ -0,0 +1,89 @@
+"""Pool de Chrome chauds: prêt borné, repli local et fermeture garantie par le scheduler."""
+import pytest
+
+from scraping.browser_pool import ChromePool
+
+
+class FakeChrome:
+    def __init__(self, address="127.0.0.1:9222"):
+        self.address = address
+        self.pages = 0
+        self.runs = 0
+        self.closed = False
+
+    def alive(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(*instances):
+    pool = ChromePool(len(instances))
+    for instance in instances:
+        pool._all.append(instance)
+        pool._idle.put(instance)
+    return pool
+
+
+def test_acquire_times_out_when_every_instance_is_lent():
+    pool = _pool(FakeChrome())
+    chrome = pool.acquire(timeout=0.05)
+    assert chrome is not None and chrome.runs == 1
+    assert pool.acquire(timeout=0.05) is None
+
+    pool.release(chrome, pages=3)
+    again = pool.acquire(timeout=0.05)
+    assert again is chrome and pool.stats["reused"] == 1 and pool.stats["pages"] == 3
+
+
+def test_acquire_on_empty_or_closed_pool_returns_none():
+    assert ChromePool(2).acquire(timeout=0.05) is None
+    pool = _pool(FakeChrome())
+    pool.close()
+    assert pool.acquire(timeout=0.05) is None
+
+
+@pytest.fixture
+def scheduler():
+    module = pytest.importorskip("automation.scheduler")
+    return module.ScrapingScheduler()
+
+
+def test_run_pooled_falls_back_to_local_chrome(scheduler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(scheduler, "_run_script_once",
+                        lambda script, resume=False, chrome_address=None: calls.append(chrome_address) or {"status": "success"})
+
+    class ExhaustedPool:
+        def acquire(self):
+            return None
+
+    scheduler.browser_pool = ExhaustedPool()
+    result = scheduler._run_pooled("serveurs/hp.py")
+    assert result == {"status": "success"} and calls == [None]
+
+
+def test_pool_and_db_closed_when_run_is_interrupted(scheduler, monkeypatch, tmp_path):
+    closed = []
+    monkeypatch.setattr("automation.scheduler.log_dir", str(tmp_path))
+
+    class TrackedPool:
+        stats = {"launched": 1}
+
+        def close(self):
+            closed.append("pool")
+
+    def interrupted(category):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(scheduler, "run_category", interrupted)
+    monkeypatch.setattr(scheduler, "close_db", lambda: closed.append("db"))
+    monkeypatch.setattr(scheduler, "selected_categories", lambda: ["serveurs"])
+    monkeypatch.setenv("SCHEDULER_PARALLEL_WORKERS", "1")
+    scheduler.browser_pool = TrackedPool()
+
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.run_all_scrapers()
+    assert closed == ["db", "pool"]
+    assert scheduler.browser_pool is None
@@ -0,0 +1,86 @@
+"""Journal de reprise (scraping/checkpoint.py): troncature, reprise, clés produit."""
+import json
+
+import pytest
+
+from scraping import checkpoint as checkpoint_mod
+from scraping.checkpoint import Checkpoint, journal_entries
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(checkpoint_mod, "SCRAPER_CHECKPOINT", True)
+
+
+def _product(n):
+    return {"brand": "HP", "name": f"DL{n}", "link": f"https://hp.com/{n}", "tech_specs": {}}
+
+
+def test_fresh_run_truncates_previous_journal(tmp_path):
+    path = tmp_path / "hp.jsonl"
+    first = Checkpoint("hp", path=str(path), resume=False)
+    first.add_product(_product(1))
+    first._fh.close()
+
+    fresh = Checkpoint("hp", path=str(path), resume=False)
+    assert fresh.product("https://hp.com/1") is None
+    assert journal_entries(str(path)) == 0
+
+
+def test_resume_reloads_pages_and_products(tmp_path):
+    path = tmp_path / "hp.jsonl"
+    run = Checkpoint("hp", path=str(path), resume=False)
+    run.save_page("https://hp.com/list?page=1", [_product(1), _product(2)])
+    run.add_product(_product(3))
+    run._fh.close()
+
+    resumed = Checkpoint("hp", path=str(path), resume=True)
+    assert [p["name"] for p in resumed.page("https://hp.com/list?page=1")] == ["DL1", "DL2"]
+    assert resumed.product("https://hp.com/3")["name"] == "DL3"
+    assert resumed.page("https://hp.com/list?page=2") is None
+    # La reprise ajoute au journal existant
+    resumed.add_product(_product(4))
+    assert journal_entries(str(path)) == 3
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / "hp.jsonl"
+    line = json.dumps({"type": "product", "link": "https://hp.com/1", "product": _product(1)})
+    path.write_text(line + "\n" + line[: len(line) // 2], encoding="utf-8")
+
+    resumed = Checkpoint("hp", path=str(path), resume=True)
+    assert list(resumed.products) == ["https://hp.com/1"]
+
+
+def test_empty_page_is_not_saved(tmp_path):
+    run = Checkpoint("hp", path=str(tmp_path / "hp.jsonl"), resume=False)
+    run.save_page("https://hp.com/list", [])
+    assert run.page("https://hp.com/list") is None
+    assert journal_entries(run.path) == 0
+
+
+def test_custom_key_for_shared_links(tmp_path):
+    path = tmp_path / "dell.jsonl"
+    run = Checkpoint("dell", path=str(path), resume=False)
+    # Deux modèles pointant vers la même fiche technique
+    a = {"name": "ME5012", "link": "https://dell.com/spec.pdf"}
+    b = {"name": "ME5024", "link": "https://dell.com/spec.pdf"}
+    run.add_product(a, key="PowerVault|ME5012")
+    run.add_product(b, key="PowerVault|ME5024")
+    run._fh.close()
+
+    resumed = Checkpoint("dell", path=str(path), resume=True)
+    assert resumed.product("PowerVault|ME5012")["name"] == "ME5012"
+    assert resumed.product("PowerVault|ME5024")["name"] == "ME5024"
+    assert resumed.product("https://dell.com/spec.pdf") is None
+
+
+def test_complete_removes_journal(tmp_path):
+    path = tmp_path / "hp.jsonl"
+    run = Checkpoint("hp", path=str(path), resume=False)
+    run.add_product(_product(1))
+    run.complete()
+    assert not path.exists()
+    # Après complete(), plus rien n'est écrit
+    run.add_product(_product(2))
+    assert not path.exists()
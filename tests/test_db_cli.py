@@ -0,0 +1,86 @@
+"""Export en flux de database/db_cli.py sur le backend SQLite (JSON / NDJSON, gzip)."""
+import gzip
+import json
+
+import pytest
+
+from conftest import make_product
+from database import db_cli
+from database import sqlite_connector
+from database.db_cli import _row_json, cmd_export, cmd_export_all
+from database.sqlite_connector import SQLiteConnector
+
+# Guillemets, antislash et caractères non ASCII dans le texte JSON brut de tech_specs
+_SPECS = {"Modèle": 'Rack 19" 2U', "Température": "10–35 °C", "Chemin": "C:\\hp", "RAM": "64 GB"}
+
+
+@pytest.fixture
+def exported_db(sqlite_db, monkeypatch):
+    sqlite_db.insert_products([make_product("HP", 1, **_SPECS), make_product("HP", 2),
+                               make_product("Dell", 3, RAM="128 GB")], "serveurs")
+    sqlite_db.insert_products([make_product("Dell", 4, Capacité="1,2 Po")], "stockage")
+    sqlite_db.insert_products([make_product("Epson", 5, Type="Jet d'encre")], "imprimantes_scanners")
+    # Pages de 2 lignes: la pagination par (brand, id) est exercée
+    monkeypatch.setattr(sqlite_connector, "DB_PAGE_SIZE", 2)
+    # Un connecteur par appel: cmd_export ferme le sien, cmd_export_all en ouvre un par thread
+    monkeypatch.setattr(db_cli, "get_connector", lambda: SQLiteConnector({"path": sqlite_db.config["path"], "timeout": 5}))
+    return sqlite_db
+
+
+def _read(path, fmt, compress="none"):
+    opener = gzip.open if compress == "gzip" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        text = f.read()
+    if fmt == "json":
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines()]
+
+
+@pytest.mark.parametrize("fmt,compress", [("json", "none"), ("ndjson", "none"), ("json", "gzip"), ("ndjson", "gzip")])
+def test_export_round_trip(exported_db, tmp_path, fmt, compress):
+    out = tmp_path / f"serveurs.{fmt}"
+    assert cmd_export("serveurs", None, str(out), fmt, compress) == 0
+
+    rows = _read(out, fmt, compress)
+    assert [(r["brand"], r["sku"]) for r in rows] == [("Dell", "DE-3"), ("HP", "HP-1"), ("HP", "HP-2")]
+    assert rows[1]["tech_specs"] == _SPECS
+    assert rows[2]["tech_specs"] == {"RAM": "32 GB"}
+    assert rows[1]["link"] == "https://example.com/hp/1"
+    # Colonnes générées spec_* exclues de l'export
+    assert not any(key.startswith("spec_") for row in rows for key in row)
+
+
+def test_export_filters_by_brand_and_keeps_empty_json_valid(exported_db, tmp_path):
+    out = tmp_path / "hp.json"
+    assert cmd_export("serveurs", "HP", str(out)) == 0
+    assert [r["sku"] for r in _read(out, "json")] == ["HP-1", "HP-2"]
+
+    assert cmd_export("serveurs", "Lenovo", str(out)) == 0
+    assert _read(out, "json") == []
+
+
+def test_export_rejects_unknown_table(exported_db, tmp_path):
+    assert cmd_export("clients", None, str(tmp_path / "x.json")) == 2
+
+
+def test_export_all_writes_one_file_per_table(exported_db, tmp_path):
+    prefix = tmp_path / "export"
+    assert cmd_export_all(str(prefix), None, "ndjson", "gzip") == 0
+
+    stockage = _read(f"{prefix}_stockage.ndjson.gz", "ndjson", "gzip")
+    printers = _read(f"{prefix}_imprimantes_scanners.ndjson.gz", "ndjson", "gzip")
+    assert len(_read(f"{prefix}_serveurs.ndjson.gz", "ndjson", "gzip")) == 3
+    assert stockage[0]["tech_specs"] == {"Capacité": "1,2 Po"}
+    assert printers[0]["tech_specs"] == {"Type": "Jet d'encre"}
+
+
+def test_row_json_splices_raw_specs_text():
+    raw = json.dumps(_SPECS, ensure_ascii=False)
+    line = _row_json({"id": 1, "name": 'ME5 "12"', "tech_specs": raw})
+    assert json.loads(line) == {"id": 1, "name": 'ME5 "12"', "tech_specs": _SPECS}
+    # Non-ASCII conservé tel quel, pas d'échappement \uXXXX
+    assert "Température" in line
+
+    assert json.loads(_row_json({"id": 2, "tech_specs": raw.encode("utf-8")}))["tech_specs"] == _SPECS
+    assert json.loads(_row_json({"tech_specs": raw})) == {"tech_specs": _SPECS}
+    assert json.loads(_row_json({"id": 3, "tech_specs": None})) == {"id": 3, "tech_specs": None}
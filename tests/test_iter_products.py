@@ -0,0 +1,126 @@
+"""Parcours en flux par clé (brand, id): pages complètes, ordre, reprise et décodage des specs."""
+import json
+import os
+
+import pytest
+
+from conftest import make_product
+
+BRANDS = ["ASUS", "Dell", "HP", "Lenovo"]
+
+
+@pytest.fixture
+def populated(sqlite_db):
+    # Insertions entrelacées: les id d'une marque ne sont pas contigus
+    for n in range(7):
+        sqlite_db.insert_products([make_product(brand, n) for brand in BRANDS], "serveurs")
+    return sqlite_db
+
+
+@pytest.mark.parametrize("page_size", [1, 3, 7, 28, 100])
+def test_every_row_once_in_brand_id_order(populated, page_size):
+    rows = list(populated.iter_products("serveurs", columns=["name"], page_size=page_size))
+    keys = [(row["brand"], row["id"]) for row in rows]
+    assert len(keys) == len(BRANDS) * 7
+    assert keys == sorted(set(keys))
+
+
+def test_brand_filter(populated):
+    rows = list(populated.iter_products("serveurs", brand="HP", page_size=2))
+    assert [row["brand"] for row in rows] == ["HP"] * 7
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+
+def test_specs_decoded_unless_raw(populated):
+    row = next(populated.iter_products("serveurs", page_size=5))
+    assert row["tech_specs"] == {"RAM": "32 GB"}
+    raw = next(populated.iter_products("serveurs", page_size=5, decode_specs=False))
+    assert json.loads(raw["tech_specs"]) == {"RAM": "32 GB"}
+
+
+def test_unknown_column_rejected(populated):
+    with pytest.raises(ValueError):
+        next(populated.iter_products("serveurs", columns=["nope"]))
+
+
+def test_keyset_predicate_uses_brand_id_index(populated):
+    plan = populated.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id, brand FROM serveurs WHERE (brand, id) > (?, ?) ORDER BY brand, id LIMIT ?",
+        ("Dell", 3, 10),
+    ).fetchall()
+    detail = " ".join(row[-1] for row in plan)
+    assert "idx_serveurs_brand_id" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+class _StreamCursor:
+    def __init__(self, rows):
+        self._rows = rows
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class _StreamConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_mysql_decodes_bytes_specs_and_uses_row_constructor(monkeypatch):
+    pytest.importorskip("mysql.connector")
+    from database import mysql_connector
+
+    rows = [
+        {"id": 1, "brand": "HP", "tech_specs": b'{"RAM": "64 GB"}'},
+        {"id": 2, "brand": "HP", "tech_specs": '{"RAM": "32 GB"}'},
+    ]
+    cursor = _StreamCursor(rows)
+    monkeypatch.setattr(mysql_connector, "get_connection", lambda config: _StreamConnection(cursor))
+    db = mysql_connector.MySQLConnector({"database": "test_iter"})
+    monkeypatch.setattr(db, "_ensure_connection", lambda: True)
+
+    result = list(db.iter_products("serveurs", page_size=2))
+    assert [row["tech_specs"] for row in result] == [{"RAM": "64 GB"}, {"RAM": "32 GB"}]
+    # Page pleine: la requête suivante reprend après (HP, 2)
+    sql, params = cursor.executed[-1]
+    assert "WHERE (brand, id) > (%s, %s)" in sql
+    assert params == ("HP", 2, 2)
+
+
+@pytest.mark.skipif(not os.getenv("MYSQL_TEST_DATABASE"), reason="MYSQL_TEST_DATABASE non défini (serveur MySQL de test)")
+def test_mysql_keyset_predicate_is_range_scan():
+    from database.config import DB_CONFIG
+    from database.mysql_connector import MySQLConnector
+
+    db = MySQLConnector(dict(DB_CONFIG, database=os.environ["MYSQL_TEST_DATABASE"]))
+    assert db.connect() and db.create_tables()
+    cursor = db.connection.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "EXPLAIN SELECT id, brand FROM serveurs WHERE (brand, id) > (%s, %s) ORDER BY brand, id LIMIT %s",
+            ("Dell", 3, 10),
+        )
+        plan = cursor.fetchone()
+    finally:
+        cursor.close()
+        db.close()
+    assert plan["key"] == "idx_brand_id"
+    assert plan["type"] in {"range", "index"}
+    assert "filesort" not in (plan.get("Extra") or "")
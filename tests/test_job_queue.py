@@ -0,0 +1,144 @@
+"""File de jobs du mode distribué (automation/job_queue.py) et attente du coordinateur."""
+import time
+
+import pytest
+
+from automation.job_queue import SQLiteJobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+
+
+def _enqueue(queue, script, domain=None, priority=0.0, max_attempts=3):
+    return queue.enqueue("run-1", {"category": "serveurs", "script": script},
+                         domain=domain, priority=priority, max_attempts=max_attempts)
+
+
+def test_expired_lease_is_requeued_then_abandoned(queue):
+    job_id = _enqueue(queue, "serveurs/hp.py", max_attempts=2)
+
+    first = queue.lease("w1", lease_seconds=-1)
+    assert first["id"] == job_id and first["attempts"] == 1
+    # Bail expiré: le job revient en file et un autre worker le reprend
+    second = queue.lease("w2", lease_seconds=-1)
+    assert second["id"] == job_id and second["attempts"] == 2
+    # Le worker d'origine a perdu son bail: heartbeat et résultat ignorés
+    assert not queue.heartbeat(job_id, "w1")
+    assert not queue.complete(job_id, "w1", {"status": "success"})
+
+    # Dernière tentative expirée: abandon
+    assert queue.requeue_expired() == 1
+    job = queue.jobs("run-1")[0]
+    assert job["status"] == "failed" and "lease expired (worker w2)" in job["error"]
+    assert queue.lease("w3") is None
+
+
+def test_heartbeat_extends_lease(queue):
+    job_id = _enqueue(queue, "serveurs/hp.py")
+    queue.lease("w1", lease_seconds=-1)
+    assert queue.heartbeat(job_id, "w1", lease_seconds=60)
+    assert queue.requeue_expired() == 0
+    assert queue.complete(job_id, "w1", {"status": "success"})
+    assert queue.run_status("run-1") == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_fail_retries_and_keeps_partial_result(queue):
+    job_id = _enqueue(queue, "serveurs/hp.py", max_attempts=2)
+    queue.lease("w1")
+    assert queue.fail(job_id, "w1", "timeout", result={"status": "timeout", "duration": 10})
+    job = queue.jobs("run-1")[0]
+    assert job["status"] == "pending" and job["worker"] is None
+    assert job["result"] == {"status": "timeout", "duration": 10}
+
+    queue.lease("w2")
+    assert queue.fail(job_id, "w2", "timeout")
+    assert queue.jobs("run-1")[0]["status"] == "failed"
+
+
+def test_fail_without_retry_is_final(queue):
+    job_id = _enqueue(queue, "serveurs/missing.py")
+    queue.lease("w1")
+    queue.fail(job_id, "w1", "not_found", retry=False)
+    assert queue.jobs("run-1")[0]["status"] == "failed"
+
+
+def test_lease_order_and_domain_cap(queue):
+    _enqueue(queue, "stockage/dell.py", domain="dell.com", priority=100)
+    _enqueue(queue, "serveurs/dell.py", domain="dell.com", priority=200)
+    _enqueue(queue, "serveurs/hp.py", domain="hp.com", priority=50)
+
+    first = queue.lease("w1", domain_cap=1)
+    second = queue.lease("w2", domain_cap=1)
+    assert first["payload"]["script"] == "serveurs/dell.py"
+    # dell.com déjà au plafond: le job HP passe devant stockage/dell.py
+    assert second["payload"]["script"] == "serveurs/hp.py"
+    assert queue.lease("w3", domain_cap=1) is None
+
+
+def test_cancel_abandons_unfinished_jobs(queue):
+    done_id = _enqueue(queue, "serveurs/hp.py", priority=2)
+    leased_id = _enqueue(queue, "serveurs/dell.py", priority=1)
+    _enqueue(queue, "serveurs/asus.py")
+    queue.lease("w1")
+    queue.complete(done_id, "w1", {"status": "success"})
+    queue.lease("w2")
+
+    assert queue.cancel("run-1", "échéance dépassée") == 2
+    assert queue.run_status("run-1") == {"pending": 0, "leased": 0, "done": 1, "failed": 2}
+    # Le worker encore en cours ne peut plus écraser l'abandon
+    assert not queue.complete(leased_id, "w2", {"status": "success"})
+
+
+class FakeProcess:
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+
+@pytest.fixture
+def scheduler():
+    module = pytest.importorskip("automation.scheduler")
+    return module.ScrapingScheduler()
+
+
+def test_wait_returns_when_all_jobs_finished(scheduler, queue):
+    job_id = _enqueue(queue, "serveurs/hp.py")
+    queue.lease("w1")
+    queue.complete(job_id, "w1", {"status": "success"})
+    assert scheduler._wait_distributed(queue, "run-1", [FakeProcess()], time.monotonic() + 60) is None
+
+
+def test_wait_stops_when_local_workers_died(scheduler, queue):
+    _enqueue(queue, "serveurs/hp.py")
+    reason = scheduler._wait_distributed(queue, "run-1", [FakeProcess(1), FakeProcess(1)], time.monotonic() + 60)
+    assert reason and "workers locaux arrêtés" in reason and "1 jobs en attente" in reason
+
+
+def test_wait_keeps_waiting_for_leased_job_of_dead_worker_until_deadline(scheduler, queue):
+    _enqueue(queue, "serveurs/hp.py")
+    queue.lease("external", lease_seconds=60)
+    reason = scheduler._wait_distributed(queue, "run-1", [FakeProcess(0)], time.monotonic() - 1)
+    assert reason and reason.startswith("échéance dépassée")
+
+
+def test_script_timeout_scales_with_max_products(scheduler, monkeypatch):
+    monkeypatch.delenv("SCHEDULER_SCRIPT_TIMEOUT_SECONDS", raising=False)
+    monkeypatch.delenv("SCHEDULER_MAX_TIMEOUT_CAP_SECONDS", raising=False)
+    scheduler.history = type("NoHistory", (), {"model": lambda self, script: None})()
+    assert scheduler.script_timeout("serveurs/hp.py", 20) == 900 * 4
+    assert scheduler.script_timeout("serveurs/lenovo.py", 5) == 1800
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    from automation.job_queue import JobQueue
+
+    class PartialQueue(JobQueue):
+        def enqueue(self, run_id, payload, domain=None, priority=0.0, max_attempts=None):
+            return 1
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialQueue()
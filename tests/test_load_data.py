@@ -0,0 +1,108 @@
+"""LOAD DATA (load_products_bulk): classement sur la table de staging, historique, bilan."""
+import json
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from database import mysql_connector
+from database.mysql_connector import PRODUCT_COLUMNS, MySQLConnector
+
+
+class StagingCursor:
+    """Curseur factice: répond au bilan de classement et aux lectures de specs (historique)."""
+
+    def __init__(self, counts, changed_rows, old_specs):
+        self.counts = counts
+        self.changed_rows = changed_rows
+        self.old_specs = old_specs
+        self.executed = []
+        self.history = []
+        self.rowcount = sum(counts)
+        self._result = []
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.executed.append(sql)
+        self._result = []
+        if sql.startswith("SELECT COALESCE(SUM(match_id IS NULL)"):
+            self._result = [self.counts]
+        elif sql.startswith("SELECT match_id,"):
+            self._result = self.changed_rows
+        elif sql.startswith("SELECT id, tech_specs FROM"):
+            self._result = [(row_id, self.old_specs[row_id]) for row_id in params]
+
+    def executemany(self, sql, rows):
+        self.history.extend(rows)
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return list(self._result)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _staged_row(row_id, specs):
+    values = dict.fromkeys(PRODUCT_COLUMNS)
+    values.update(brand="HP", link=f"https://example.com/{row_id}", name=f"P{row_id}", tech_specs=json.dumps(specs))
+    return (row_id,) + tuple(values[c] for c in PRODUCT_COLUMNS)
+
+
+@pytest.fixture
+def bulk(monkeypatch):
+    def run(counts, changed_rows=(), old_specs=None):
+        cursor = StagingCursor(counts, list(changed_rows), old_specs or {})
+        monkeypatch.setattr(mysql_connector, "get_connection", lambda config: FakeConnection(cursor))
+        db = MySQLConnector({"database": "test_load_data"})
+        products = [{"brand": "HP", "name": f"P{i}", "link": f"https://example.com/{i}"} for i in range(sum(counts))]
+        return db, db.load_products_bulk(products, "serveurs"), cursor
+    return run
+
+
+def test_reports_new_changed_unchanged(bulk):
+    db, result, _cursor = bulk((2, 0, 3))
+    assert db.last_upsert_stats == {"new": 2, "changed": 0, "unchanged": 3}
+    assert result == (2, 3)
+
+
+def test_only_new_and_changed_rows_are_merged(bulk):
+    _db, _result, cursor = bulk((1, 0, 1))
+    merge = next(sql for sql in cursor.executed if sql.startswith("INSERT INTO serveurs"))
+    assert "WHERE match_id IS NULL OR NOT (match_hash <=> content_hash)" in merge
+    touch = next(sql for sql in cursor.executed if sql.startswith("UPDATE serveurs t JOIN staging_products"))
+    assert "WHERE s.match_hash <=> s.content_hash" in touch
+
+
+def test_changed_rows_are_historised_before_merge(bulk):
+    _db, _result, cursor = bulk(
+        (0, 1, 0),
+        changed_rows=[_staged_row(7, {"RAM": "64 GB"})],
+        old_specs={7: json.dumps({"RAM": "32 GB"})},
+    )
+    assert cursor.history == [("serveurs", 7, json.dumps({"changed": {"RAM": ["32 GB", "64 GB"]}}))]
+    read = next(i for i, sql in enumerate(cursor.executed) if sql.startswith("SELECT id, tech_specs FROM serveurs"))
+    merge = next(i for i, sql in enumerate(cursor.executed) if sql.startswith("INSERT INTO serveurs"))
+    assert read < merge
+
+
+def test_unchanged_rerun_records_no_history(bulk):
+    _db, _result, cursor = bulk((0, 0, 4))
+    assert cursor.history == []
+    assert not any(sql.startswith("SELECT match_id,") for sql in cursor.executed)
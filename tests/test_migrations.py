@@ -0,0 +1,129 @@
+"""Migrations MySQL (schema_version) rejouées sur un curseur factice, sans serveur."""
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql.connector import Error
+
+from database import mysql_connector
+from database.mysql_connector import SCHEMA_MIGRATIONS, MySQLConnector
+
+
+class FakeCursor:
+    """Curseur qui trace les requêtes; `fail` associe un fragment SQL à un errno MySQL."""
+
+    def __init__(self, applied=(), fail=None, lock=1):
+        self.applied = set(applied)
+        self.fail = fail or {}
+        self.lock = lock
+        self.executed = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        for fragment, errno in self.fail.items():
+            if fragment in sql:
+                raise Error(msg=f"échec simulé: {fragment}", errno=errno)
+        if sql.startswith("SELECT version FROM schema_version"):
+            self._result = [(v,) for v in sorted(self.applied)]
+        elif "GET_LOCK" in sql:
+            self._result = [(self.lock,)]
+        elif sql.startswith("INSERT INTO schema_version"):
+            self.applied.add(params[0])
+            self._result = []
+        else:
+            self._result = [(1,)]
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    monkeypatch.setattr(mysql_connector, "_schema_cache", {})
+    db = MySQLConnector({"database": "test_migrations"})
+    monkeypatch.setattr(db, "_ensure_connection", lambda: True)
+    return db
+
+
+ALL_VERSIONS = [version for version, _description, _statements in SCHEMA_MIGRATIONS]
+
+
+def test_fresh_database_applies_every_migration(connector):
+    cursor = FakeCursor()
+    assert connector._apply_migrations(cursor, set()) == []
+    assert sorted(cursor.applied) == ALL_VERSIONS
+
+
+def test_ignored_errnos_do_not_fail_migration(connector):
+    # Colonne / index déjà présents (1060, 1061), index absent (1091): bases déjà à jour
+    cursor = FakeCursor(fail={"ADD COLUMN sku": 1060, "DROP INDEX unique_product": 1091, "idx_brand_id": 1061})
+    assert connector._apply_migrations(cursor, set()) == []
+    assert sorted(cursor.applied) == ALL_VERSIONS
+
+
+def test_failed_migration_does_not_block_later_ones(connector):
+    # Doublons restants sur (brand, sku): la migration 3 échoue, content_hash et product_history passent quand même
+    cursor = FakeCursor(fail={"unique_brand_sku": 1062})
+    assert connector._apply_migrations(cursor, set()) == [3]
+    assert 3 not in cursor.applied
+    assert {5, 6} <= cursor.applied
+
+
+def test_failed_migration_is_retried(connector):
+    cursor = FakeCursor(fail={"unique_brand_sku": 1062})
+    connector._apply_migrations(cursor, set())
+    cursor.fail = {}
+    assert connector._apply_migrations(cursor, set(cursor.applied)) == []
+    assert sorted(cursor.applied) == ALL_VERSIONS
+
+
+def test_unique_keys_are_deduplicated_first(connector):
+    cursor = FakeCursor()
+    connector._apply_migrations(cursor, {1, 2})
+    deletes = [i for i, sql in enumerate(cursor.executed) if sql.startswith("DELETE t1 FROM serveurs")]
+    index = cursor.executed.index(
+        next(sql for sql in cursor.executed if "unique_brand_sku ON serveurs" in sql)
+    )
+    assert deletes and max(deletes) < index
+
+
+def test_create_tables_reports_failed_migration(connector):
+    connector.connection = FakeConnection(FakeCursor(fail={"unique_brand_linkhash": 1062}))
+    assert connector.create_tables() is False
+    assert "test_migrations" not in mysql_connector._schema_cache
+
+
+def test_create_tables_refuses_without_migration_lock(connector):
+    cursor = FakeCursor(lock=0)
+    connector.connection = FakeConnection(cursor)
+    assert connector.create_tables() is False
+    assert not cursor.applied
+    assert not any(sql.startswith("ALTER TABLE") for sql in cursor.executed)
+
+
+def test_create_tables_skips_lock_when_up_to_date(connector, monkeypatch):
+    monkeypatch.setattr(connector, "_load_schema", lambda cursor: {})
+    monkeypatch.setattr(connector, "_sync_spec_columns", lambda cursor, schema: False)
+    cursor = FakeCursor(applied=ALL_VERSIONS)
+    connector.connection = FakeConnection(cursor)
+    assert connector.create_tables() is True
+    assert not any("GET_LOCK" in sql for sql in cursor.executed)
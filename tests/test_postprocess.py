@@ -0,0 +1,27 @@
+"""Post-traitement en une passe (scheduler.postprocess_json): normalisation et stats mesurées."""
+import json
+
+import pytest
+
+scheduler = pytest.importorskip("automation.scheduler")
+
+
+def test_single_pass_normalises_and_reports_measured_stats(tmp_path):
+    path = tmp_path / "hp_servers.json"
+    path.write_text(json.dumps([
+        {"brand": "HP", "name": "DL380", "link": "https://hp.com/1", "description": "x" * 50,
+         "tech_specs": {"SKU": "P1", "RAM": "32 GB"}},
+        {"brand": "HP", "name": "DL360", "link": "https://hp.com/2", "tech_specs": {"RAM": "16 GB"}},
+    ], indent=4), encoding="utf-8")
+
+    data, findings, stats = scheduler.postprocess_json(str(path))
+
+    assert data[0]["sku"] == "P1" and "SKU" not in data[0]["tech_specs"]
+    assert "description" not in data[0]
+    assert findings == []
+    assert stats["items"] == 2 and stats["skus_hoisted"] == 1 and stats["descriptions_removed"] == 1
+    assert stats["brands"] == ["HP"]
+    assert stats["bytes_out"] == path.stat().st_size
+    # Pas d'estimation présentée comme une mesure
+    assert not {"bytes_saved", "est_seconds_saved", "passes_avoided"} & set(stats)
+    assert json.loads(path.read_text(encoding="utf-8")) == data
@@ -0,0 +1,101 @@
+"""Modèle de durée par script (automation/run_history.py): ajustement, timeouts, régressions."""
+import json
+
+import pytest
+
+from automation import run_history
+from automation.run_history import RunHistory, ScriptModel, regression
+
+
+@pytest.fixture(autouse=True)
+def defaults(monkeypatch):
+    monkeypatch.setattr(run_history, "SCHEDULER_HISTORY_MIN_RUNS", 3)
+    monkeypatch.setattr(run_history, "SCHEDULER_TIMEOUT_FACTOR", 2.0)
+    monkeypatch.setattr(run_history, "SCHEDULER_TIMEOUT_SIGMAS", 4)
+    monkeypatch.setattr(run_history, "SCHEDULER_MIN_TIMEOUT_SECONDS", 300)
+    monkeypatch.setattr(run_history, "SCHEDULER_REGRESSION_THRESHOLD", 0.5)
+
+
+def test_linear_fit_separates_listing_and_per_product_time():
+    model = ScriptModel([(10, 150.0), (20, 200.0), (40, 300.0)])
+    assert model.seconds_per_product == pytest.approx(5.0)
+    assert model.listing_seconds == pytest.approx(100.0)
+    assert model.stdev == pytest.approx(0.0)
+    assert model.typical_products == 20
+    assert model.predict(30) == pytest.approx(250.0)
+    # Sans volume: volume médian historique
+    assert model.predict() == pytest.approx(200.0)
+
+
+def test_constant_volume_falls_back_to_median_ratio():
+    model = ScriptModel([(10, 100.0), (10, 120.0), (10, 110.0)])
+    assert model.seconds_per_product == pytest.approx(11.0)
+    assert model.listing_seconds == 0.0
+    assert model.predict() == pytest.approx(110.0)
+
+
+def test_single_sample_uses_its_ratio():
+    model = ScriptModel([(5, 50.0)])
+    assert model.seconds_per_product == pytest.approx(10.0)
+    assert model.listing_seconds == 0.0 and model.stdev == 0.0
+
+
+def test_negative_intercept_falls_back_to_median_ratio():
+    # Pente 9, ordonnée -80: ajustement incohérent
+    model = ScriptModel([(10, 10.0), (20, 100.0)])
+    assert model.seconds_per_product == pytest.approx(3.0)
+    assert model.listing_seconds == 0.0
+
+
+def test_zero_products_predicts_mean_duration():
+    model = ScriptModel([(0, 60.0), (0, 80.0)])
+    assert model.seconds_per_product == 0.0
+    assert model.predict() == pytest.approx(70.0)
+
+
+def test_timeout_floor_factor_sigmas_and_cap():
+    fast = ScriptModel([(10, 10.0), (20, 20.0), (40, 40.0)])
+    assert fast.timeout(10) == 300
+
+    steady = ScriptModel([(100, 500.0), (200, 1000.0), (400, 2000.0)])
+    assert steady.timeout(400) == 4000
+    assert steady.timeout(400, cap=2500) == 2500
+    # Plafond nul ou négatif ignoré
+    assert steady.timeout(400, cap=0) == 4000
+
+    # Résidus ±100 s: prévu + 4σ l'emporte sur prévu × 2
+    noisy = ScriptModel([(10, 100.0), (10, 300.0)])
+    assert noisy.predict() == pytest.approx(200.0) and noisy.stdev == pytest.approx(100.0)
+    assert noisy.timeout() == 600
+    # Le plafond passe même sous le plancher
+    assert noisy.timeout(cap=120) == 120
+
+
+def test_regression_flag():
+    model = ScriptModel([(10, 200.0), (10, 200.0), (10, 200.0)])
+    assert regression(model, 300.0) is None
+    assert regression(model, 400.0) == {"predicted_seconds": 200.0, "duration": 400.0, "slowdown": 2.0}
+    # Prévision au volume du run
+    assert regression(model, 400.0, products=20) is None
+    assert regression(None, 10_000.0) is None
+
+
+def _write_report(tmp_path, n, result):
+    report = {"start_time": f"2026-01-{n:02d}T03:00:00", "categories": {"serveurs": {"serveurs/hp.py": result}}}
+    (tmp_path / f"scraping_report_202601{n:02d}.json").write_text(json.dumps(report), encoding="utf-8")
+
+
+def test_history_needs_min_runs_and_skips_resumed_runs(tmp_path):
+    _write_report(tmp_path, 1, {"status": "success", "duration": 100, "products": 10})
+    _write_report(tmp_path, 2, {"status": "success", "duration": 120, "products": 12})
+    _write_report(tmp_path, 3, {"status": "success", "duration": 30, "products": 3, "resumed_from": "hp.jsonl"})
+    _write_report(tmp_path, 4, {"status": "timeout", "duration": 900, "products": 5})
+    history = RunHistory(str(tmp_path))
+    assert history.samples["serveurs/hp.py"] == [(10, 100.0), (12, 120.0)]
+    assert history.model("serveurs/hp.py") is None
+    # Le run repris compte pour la date du dernier succès, pas pour le modèle
+    assert history.last_success("serveurs/hp.py").day == 3
+
+    _write_report(tmp_path, 5, {"status": "success", "duration": 140, "products": 14})
+    model = RunHistory(str(tmp_path)).model("serveurs/hp.py")
+    assert model.seconds_per_product == pytest.approx(10.0)
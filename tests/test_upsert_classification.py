@@ -0,0 +1,213 @@
+"""Classement nouveaux / modifiés / inchangés par content_hash, historique et stabilité de updated_at."""
+import os
+import time
+
+import pytest
+
+from conftest import make_product
+
+
+def _row(db, sku):
+    return db.connection.execute(
+        "SELECT id, updated_at, last_seen, is_active, content_hash FROM serveurs WHERE sku = ?", (sku,)
+    ).fetchone()
+
+
+def test_first_run_inserts_everything(sqlite_db):
+    sqlite_db.insert_products([make_product("HP", n) for n in range(3)], "serveurs")
+    assert sqlite_db.last_upsert_stats == {"new": 3, "changed": 0, "unchanged": 0}
+
+
+def test_rerun_with_identical_data_is_unchanged(sqlite_db):
+    products = [make_product("HP", n) for n in range(3)]
+    sqlite_db.insert_products(products, "serveurs")
+    sqlite_db.insert_products(products, "serveurs")
+    assert sqlite_db.last_upsert_stats == {"new": 0, "changed": 0, "unchanged": 3}
+
+
+def test_scraped_at_does_not_count_as_a_change(sqlite_db):
+    sqlite_db.insert_products([dict(make_product("HP", 1), scraped_at="2026-01-01T00:00:00")], "serveurs")
+    sqlite_db.insert_products([dict(make_product("HP", 1), scraped_at="2026-02-01T00:00:00")], "serveurs")
+    assert sqlite_db.last_upsert_stats["unchanged"] == 1
+
+
+def test_rerun_leaves_updated_at_untouched(sqlite_db):
+    products = [make_product("HP", 1)]
+    sqlite_db.insert_products(products, "serveurs")
+    sqlite_db.connection.execute("UPDATE serveurs SET updated_at = '2000-01-01 00:00:00', last_seen = '2000-01-01 00:00:00'")
+    sqlite_db.insert_products(products, "serveurs")
+    _id, updated_at, last_seen, is_active, _hash = _row(sqlite_db, "HP-1")
+    assert updated_at == "2000-01-01 00:00:00"
+    assert last_seen != "2000-01-01 00:00:00"
+    assert is_active == 1
+
+
+def test_reactivation_leaves_updated_at_untouched(sqlite_db):
+    sqlite_db.insert_products([make_product("HP", n) for n in range(2)], "serveurs")
+    sqlite_db.connection.execute("UPDATE serveurs SET updated_at = '2000-01-01 00:00:00', is_active = 0")
+    sqlite_db.deactivate_missing("serveurs", "HP", {"HP-0", "HP-1"}, set())
+    rows = sqlite_db.connection.execute("SELECT updated_at, is_active FROM serveurs").fetchall()
+    assert rows == [("2000-01-01 00:00:00", 1)] * 2
+
+
+def test_changed_specs_are_historised(sqlite_db):
+    sqlite_db.insert_products([make_product("HP", 1, RAM="32 GB", CPU="Xeon")], "serveurs")
+    sqlite_db.insert_products([make_product("HP", 1, RAM="64 GB", CPU="Xeon")], "serveurs")
+    assert sqlite_db.last_upsert_stats == {"new": 0, "changed": 1, "unchanged": 0}
+    product_id = _row(sqlite_db, "HP-1")[0]
+    specs, deltas = sqlite_db.product_history("serveurs", product_id)
+    assert specs == {"RAM": "64 GB", "CPU": "Xeon"}
+    assert [delta for _hid, _at, delta in deltas] == [{"changed": {"RAM": ["32 GB", "64 GB"]}}]
+
+
+def test_match_by_link_when_sku_missing(sqlite_db):
+    product = dict(make_product("HP", 1), sku=None)
+    sqlite_db.insert_products([product], "serveurs")
+    sqlite_db.insert_products([dict(product, tech_specs={"RAM": "128 GB"})], "serveurs")
+    assert sqlite_db.last_upsert_stats == {"new": 0, "changed": 1, "unchanged": 0}
+    assert sqlite_db.connection.execute("SELECT COUNT(*) FROM serveurs").fetchone()[0] == 1
+
+
+@pytest.mark.skipif(not os.getenv("MYSQL_TEST_DATABASE"), reason="MYSQL_TEST_DATABASE non défini (serveur MySQL de test)")
+@pytest.mark.parametrize("mode", ["in_list", "staging"])
+def test_mysql_rerun_and_reactivation_keep_updated_at(mode):
+    from database.config import DB_CONFIG
+    from database.mysql_connector import MySQLConnector
+
+    db = MySQLConnector(dict(DB_CONFIG, database=os.environ["MYSQL_TEST_DATABASE"]))
+    assert db.connect() and db.create_tables()
+    brand = f"TEST-{mode}"
+    products = [make_product(brand, n) for n in range(2)]
+    cursor = db.connection.cursor()
+    try:
+        cursor.execute("DELETE FROM serveurs WHERE brand = %s", (brand,))
+        db.connection.commit()
+        db.insert_products(products, "serveurs")
+        cursor.execute("UPDATE serveurs SET updated_at = '2000-01-01 00:00:00', is_active = 0 WHERE brand = %s", (brand,))
+        db.connection.commit()
+        time.sleep(1)
+        db.insert_products(products, "serveurs")
+        assert db.last_upsert_stats == {"new": 0, "changed": 0, "unchanged": 2}
+        db.deactivate_missing("serveurs", brand, {p["sku"] for p in products}, set(), mode=mode)
+        cursor.execute("SELECT updated_at, is_active FROM serveurs WHERE brand = %s", (brand,))
+        rows = cursor.fetchall()
+        assert [(str(updated_at), active) for updated_at, active in rows] == [("2000-01-01 00:00:00", 1)] * 2
+    finally:
+        cursor.execute("DELETE FROM serveurs WHERE brand = %s", (brand,))
+        db.connection.commit()
+        cursor.close()
+        db.close()
+
+
+class _RecordingCursor:
+    def __init__(self, known=()):
+        self.known = list(known)
+        self.executed = []
+        self.rowcount = 0
+        self._result = []
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.executed.append(sql)
+        self._result = self.known if sql.startswith("SELECT id, brand, sku, link_hash, content_hash") else []
+
+    def executemany(self, sql, rows):
+        self.executed.append(" ".join(sql.split()))
+
+    def fetchall(self):
+        return list(self._result)
+
+    def fetchone(self):
+        return (0,)
+
+    def close(self):
+        pass
+
+
+class _RecordingConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.mark.parametrize("mode", ["in_list", "staging"])
+def test_mysql_tracking_updates_pin_on_update_columns(monkeypatch, mode):
+    """last_seen/is_active seuls: updated_at (ON UPDATE CURRENT_TIMESTAMP) réaffecté à lui-même."""
+    pytest.importorskip("mysql.connector")
+    from database.common import _COL, _product_row
+    from database.mysql_connector import MySQLConnector
+
+    db = MySQLConnector({"database": "test_updated_at"})
+    monkeypatch.setattr(db, "_ensure_connection", lambda: True)
+    monkeypatch.setattr(db, "table_columns", lambda table: set())
+    product = make_product("HP", 1)
+    row = _product_row(product, False)
+    cursor = _RecordingCursor(known=[(1, "HP", "HP-1", row[_COL["link_hash"]], row[_COL["content_hash"]])])
+    db.connection = _RecordingConnection(cursor)
+
+    db.insert_products([product], "serveurs")
+    db.deactivate_missing("serveurs", "HP", {"HP-1"}, {row[_COL["link_hash"]]}, mode=mode)
+
+    assert db.last_upsert_stats == {"new": 0, "changed": 0, "unchanged": 1}
+    tracking = [sql for sql in cursor.executed if sql.startswith("UPDATE") and ("SET is_active = 1" in sql or "SET t.is_active = 1" in sql)]
+    assert tracking
+    for sql in tracking:
+        assert "updated_at = updated_at" in sql or "t.updated_at = t.updated_at" in sql, sql
+    assert not any(sql.startswith("INSERT INTO serveurs") for sql in cursor.executed)
+
+
+def test_lookup_reads_only_the_batch_keys(sqlite_db, monkeypatch):
+    """Un petit lot ne relit pas toute la marque: requêtes sur (brand, sku) / (brand, link_hash) du lot."""
+    monkeypatch.setattr("database.common.DEACTIVATE_STAGING_CHUNK", 2)
+    sqlite_db.insert_products([make_product("HP", n) for n in range(50)], "serveurs")
+
+    statements = []
+    sqlite_db.connection.set_trace_callback(statements.append)
+    batch = [make_product("HP", n) for n in range(3)]
+    # Même lien, SKU apparu depuis: retrouvé par link_hash
+    batch.append(dict(make_product("HP", 10, RAM="64 GB"), sku=None))
+    batch.append(make_product("HP", 99))
+    sqlite_db.insert_products(batch, "serveurs")
+    sqlite_db.connection.set_trace_callback(None)
+
+    assert sqlite_db.last_upsert_stats == {"new": 1, "changed": 1, "unchanged": 3}
+    lookups = [s for s in statements if s.startswith("SELECT id, brand, sku, link_hash, content_hash")]
+    # 4 SKU puis 5 liens, par paquets de 2
+    assert len(lookups) == 2 + 3
+    assert all("(brand, sku) IN" in s or "(brand, link_hash) IN" in s for s in lookups)
+
+    plan = sqlite_db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id, brand, sku, link_hash, content_hash FROM serveurs "
+        "WHERE (brand, link_hash) IN (VALUES (?, ?))", ("HP", "x")
+    ).fetchall()
+    assert any(row[-1].startswith("SEARCH serveurs USING") and "(brand=? AND link_hash=?)" in row[-1] for row in plan), plan
+
+
+def test_mysql_lookup_uses_row_constructor_keys(monkeypatch):
+    pytest.importorskip("mysql.connector")
+    from database.mysql_connector import MySQLConnector
+
+    db = MySQLConnector({"database": "test_lookup"})
+    monkeypatch.setattr(db, "_ensure_connection", lambda: True)
+    monkeypatch.setattr(db, "table_columns", lambda table: set())
+    cursor = _RecordingCursor()
+    db.connection = _RecordingConnection(cursor)
+
+    db.insert_products([make_product("HP", 1), make_product("HP", 2)], "serveurs")
+
+    lookups = [s for s in cursor.executed if s.startswith("SELECT id, brand, sku, link_hash, content_hash")]
+    assert lookups == [
+        "SELECT id, brand, sku, link_hash, content_hash FROM serveurs WHERE (brand, sku) IN ((%s, %s), (%s, %s))",
+        "SELECT id, brand, sku, link_hash, content_hash FROM serveurs WHERE (brand, link_hash) IN ((%s, %s), (%s, %s))",
+    ]
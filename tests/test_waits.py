@@ -0,0 +1,139 @@
+"""Attentes conditionnelles (scraping/waits.py) sur un driver factice."""
+from scraping import waits
+from scraping.waits import (all_of, any_of, count_above, document_ready, dom_quiet, element_count_stable,
+                            network_idle, spec_table_populated, wait_for)
+
+
+class FakeClock:
+    """time.monotonic / time.sleep déterministes: sleep avance l'horloge."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeManifest:
+    def __init__(self):
+        self.data = {}
+
+
+class FakeDriver:
+    """execute_script rend la valeur scriptée pour le script JS (dernière valeur répétée)."""
+
+    def __init__(self, scripts, manifest=None):
+        self.scripts = {k: list(v) for k, v in scripts.items()}
+        self.manifest = manifest
+
+    def execute_script(self, script, *args):
+        values = self.scripts[script]
+        value = values.pop(0) if len(values) > 1 else values[0]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class FakeBlocker:
+    logging = True
+
+    def __init__(self, inflight):
+        self._inflight = list(inflight)
+
+    def collect(self):
+        pass
+
+    def inflight(self, max_age_ms=None):
+        return self._inflight.pop(0) if len(self._inflight) > 1 else self._inflight[0]
+
+
+def _clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(waits.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(waits.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_element_count_stable_waits_for_count_to_settle(monkeypatch):
+    _clock(monkeypatch)
+    driver = FakeDriver({waits._COUNT_JS: [0, 4, 8, 8, 8, 8, 8, 8]})
+    result = wait_for(driver, element_count_stable("li", stable_for=1.0), timeout=10, poll=0.5)
+    assert result.ok
+    # 8 éléments vus à t=1.0, stables depuis 1 s à t=2.0
+    assert result.waited == 2.0
+
+
+def test_element_count_stable_rejects_empty_page(monkeypatch):
+    _clock(monkeypatch)
+    driver = FakeDriver({waits._COUNT_JS: [0]})
+    result = wait_for(driver, element_count_stable("li", stable_for=0.5), timeout=3, poll=0.5)
+    assert not result.ok and result.waited == 3.0
+    assert "non atteint" in str(result)
+
+
+def test_count_above_and_spec_table(monkeypatch):
+    _clock(monkeypatch)
+    driver = FakeDriver({waits._COUNT_JS: [10, 10, 14], waits._POPULATED_ROWS_JS: [0, 3]})
+    assert wait_for(driver, count_above("li", 10), timeout=5, poll=0.25).waited == 0.5
+    assert wait_for(driver, spec_table_populated("tr", min_rows=2), timeout=5, poll=0.25).ok
+
+
+def test_dom_quiet_and_document_ready(monkeypatch):
+    _clock(monkeypatch)
+    driver = FakeDriver({
+        waits._MUTATION_OBSERVER_JS: [None, 120, 600],
+        "return document.readyState": ["loading", "complete"],
+    })
+    assert wait_for(driver, dom_quiet(0.5), timeout=5, poll=0.25).waited == 0.5
+    assert wait_for(driver, document_ready(), timeout=5, poll=0.25).waited == 0.25
+
+
+def test_network_idle_uses_cdp_blocker_then_resource_fallback(monkeypatch):
+    _clock(monkeypatch)
+    driver = FakeDriver({waits._RESOURCE_COUNT_JS: [5, 7, 7, 7]})
+    driver.request_blocker = FakeBlocker([2, 1, 0, 0, 0, 0])
+    # En cours jusqu'à t=0.5, puis inactif pendant idle_for=0.5
+    assert wait_for(driver, network_idle(idle_for=0.5), timeout=5, poll=0.25).waited == 1.0
+
+    driver.request_blocker = None
+    # Repli Resource Timing: 7 entrées dès t=0.25, stables 0.5 s plus tard
+    assert wait_for(driver, network_idle(idle_for=0.5), timeout=5, poll=0.25).waited == 0.75
+
+
+def test_all_of_advances_every_condition_and_any_of_short_circuits(monkeypatch):
+    _clock(monkeypatch)
+    driver = FakeDriver({
+        waits._COUNT_JS: [3],
+        "return document.readyState": ["loading", "loading", "complete"],
+    })
+    result = wait_for(driver, all_of(element_count_stable("li", stable_for=0.5), document_ready()),
+                      timeout=5, poll=0.25)
+    # Les deux périodes avancent ensemble: pas de somme des attentes
+    assert result.ok and result.waited == 0.5
+    assert result.name == "éléments stables (li) + document chargé"
+
+    driver.scripts["return document.readyState"] = ["loading"]
+    assert wait_for(driver, any_of(document_ready(), count_above("li", 2)), timeout=5).waited == 0.0
+
+
+def test_exceptions_are_retried_and_waits_recorded_in_manifest(monkeypatch):
+    _clock(monkeypatch)
+    manifest = FakeManifest()
+    driver = FakeDriver({"return document.readyState": [RuntimeError("navigation"), "complete"]}, manifest)
+    assert wait_for(driver, document_ready(), timeout=5, poll=0.25).ok
+
+    driver.scripts["return document.readyState"] = ["loading"]
+    assert not wait_for(driver, document_ready(), timeout=1, poll=0.25)
+    assert manifest.data["waits"]["document chargé"] == {"count": 2, "waited": 1.25, "timeouts": 1}
+
+
+def test_conditions_reset_between_waits(monkeypatch):
+    _clock(monkeypatch)
+    condition = element_count_stable("li", stable_for=0.5)
+    driver = FakeDriver({waits._COUNT_JS: [4]})
+    assert wait_for(driver, condition, timeout=5, poll=0.25).waited == 0.5
+    # Nouvelle attente: la période de stabilité repart de zéro
+    assert wait_for(driver, condition, timeout=5, poll=0.25).waited == 0.5
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks de la couche base de données.
+
+Usage (DB_BACKEND=sqlite pour mesurer le backend SQLite embarqué):
+  python tools/bench_db.py upsert --rows 2000 --batch-size 500
+  python tools/bench_db.py connect --sessions 10
+  python tools/bench_db.py deactivate --rows 10000 100000
+
+Les lignes synthétiques sont écrites sous une marque dédiée (BENCH par défaut)
+puis supprimées en fin de run. Chaque mode d'upsert est mesuré sur trois passes:
+insertion à froid, relance à l'identique, puis mise à jour des specs.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+# Pas d'import du pilote MySQL ici: upsert/deactivate tournent avec DB_BACKEND=sqlite sans lui
+from database.common import _link_hash, get_connector
+from database.config import DB_BACKEND, DB_CONFIG, DB_CONFIG_NO_DB
+
+
+def _synthetic_products(n: int, brand: str) -> list[dict]:
+    products = []
+    for i in range(n):
+        products.append({
+            "brand": brand,
+            "name": f"Bench Server {i}",
+            "sku": f"BENCH-{i:07d}" if i % 4 else None,
+            "link": f"https://bench.invalid/products/{i}",
+            "tech_specs": {"cpu_model": "Xeon Gold 6430", "ram_max_gb": 2048 + i % 7, "form_factor": "2U"},
+            "datasheet_link": "",
+            "image_url": f"https://bench.invalid/img/{i}.png",
+        })
+    return products
+
+
+def _purge(db, table: str, brand: str) -> None:
+    placeholder = "%s" if type(db).__name__ == "MySQLConnector" else "?"
+    cursor = db.connection.cursor()
+    cursor.execute(f"DELETE FROM {table} WHERE brand = {placeholder}", (brand,))
+    db.connection.commit()
+    cursor.close()
+
+
+def bench_upsert(db, table: str, brand: str, rows: int, batch_size: int) -> None:
+    products = _synthetic_products(rows, brand)
+    # Même catalogue avec specs modifiées: force des mises à jour réelles (content_hash différent)
+    modified = [dict(p, tech_specs=dict(p["tech_specs"], psu_watts=1600)) for p in products]
+    for label, bs in (("ligne par ligne", 0), (f"lots de {batch_size}", batch_size)):
+        _purge(db, table, brand)
+        for phase, batch in (("insert", products), ("same", products), ("update", modified)):
+            t0 = time.perf_counter()
+            db.insert_products(batch, table, batch_size=bs)
+            dt = time.perf_counter() - t0
+            stats = db.last_upsert_stats
+            print(f"{label:>18} | {phase:<6} | {rows / dt:10.0f} rows/s | {dt:7.2f}s | "
+                  f"+{stats['new']} ~{stats['changed']} ={stats['unchanged']}")
+    _purge(db, table, brand)
+
+
+def bench_deactivate(db, table: str, brand: str, sizes: list[int], seen_ratio: float) -> None:
+    """deactivate_missing: listes IN/NOT IN vs table temporaire + anti-jointures."""
+    for rows in sizes:
+        products = _synthetic_products(rows, brand)
+        _purge(db, table, brand)
+        db.insert_products(products, table, batch_size=1000)
+        seen = products[: int(rows * seen_ratio)]
+        skus = {p["sku"] for p in seen if p["sku"]}
+        hashes = {_link_hash(p["link"]) for p in seen}
+        for mode in ("in_list", "staging"):
+            t0 = time.perf_counter()
+            db.deactivate_missing(table, brand, skus, hashes, mode=mode)
+            dt = time.perf_counter() - t0
+            print(f"{mode:>18} | {rows:>7} rows | {rows / dt:10.0f} rows/s | {dt:7.2f}s")
+    _purge(db, table, brand)
+
+
+def bench_connect(sessions: int) -> None:
+    """Coût d'établissement de connexion pour N uploads successifs (ex: run hebdo de 10 marques)."""
+    # Benchmark propre à MySQL: pilote importé seulement ici
+    import mysql.connector
+
+    from database.mysql_connector import MySQLConnector
+
+    t0 = time.perf_counter()
+    for _ in range(sessions):
+        # Schéma historique: disponibilité + création base + connexion = 3 poignées de main
+        for cfg in (DB_CONFIG_NO_DB, DB_CONFIG_NO_DB, DB_CONFIG):
+            mysql.connector.connect(**cfg).close()
+    direct = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(sessions):
+        db = MySQLConnector()
+        db.connect()
+        db.close()
+    pooled = time.perf_counter() - t0
+    print(f"{'direct':>18} | {sessions} sessions | {direct * 1000 / sessions:8.1f} ms/session")
+    print(f"{'pool':>18} | {sessions} sessions | {pooled * 1000 / sessions:8.1f} ms/session")
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmarks DB (rows/sec)")
+    p.add_argument("--table", default="serveurs", choices=["serveurs", "stockage", "imprimantes_scanners"])
+    p.add_argument("--brand", default="BENCH")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    p_upsert = sub.add_parser("upsert", help="insert_products: ligne par ligne vs lots multi-lignes")
+    p_upsert.add_argument("--rows", type=int, default=2000)
+    p_upsert.add_argument("--batch-size", type=int, default=500)
+
+    p_deact = sub.add_parser("deactivate", help="deactivate_missing: in_list vs staging")
+    p_deact.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    p_deact.add_argument("--seen-ratio", type=float, default=0.95)
+
+    p_connect = sub.add_parser("connect", help="Connexions directes vs pool partagé")
+    p_connect.add_argument("--sessions", type=int, default=10)
+
+    args = p.parse_args()
+    if args.cmd == "connect":
+        bench_connect(args.sessions)
+        return 0
+
+    # Backend choisi par DB_BACKEND (mysql | sqlite)
+    db = get_connector()
+    if not db.connect():
+        print(f"❌ Base {DB_BACKEND} non disponible")
+        return 1
+    try:
+        db.create_tables()
+        if args.cmd == "upsert":
+            bench_upsert(db, args.table, args.brand, args.rows, args.batch_size)
+        elif args.cmd == "deactivate":
+            bench_deactivate(db, args.table, args.brand, args.rows, args.seen_ratio)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
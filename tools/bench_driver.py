@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Comparaison des temps de chargement de page par site et par profil de driver.
+
+Usage:
+  python tools/bench_driver.py                        # tous les sites, 3 passes
+  python tools/bench_driver.py --sites dell hp --runs 5 --profiles legacy fast
+
+Profils comparés:
+  legacy  options historiques des scrapers (chargement 'normal', images chargées)
+  full    fabrique scraping/driver.py, ressources chargées
+  fast    fabrique scraping/driver.py, images / polices / médias et trackers bloqués (défaut des scrapers)
+
+Chaque passe démarre un Chrome neuf sans cache disque persistant (chargement à
+froid); on mesure le retour de driver.get(), l'atteinte de readyState=complete,
+le volume transféré et le nombre de requêtes (Resource Timing API), et pour
+`fast` les requêtes bloquées (scraping/blocking.py).
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+
+_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scraping.driver import USER_AGENT, create_driver
+
+# Une page de listing représentative par site scrapé
+SITES = {
+    "asus": "https://servers.asus.com/products/Servers",
+    "dell": "https://www.dell.com/fr-fr/shop/serveurs-de-datacenter/sf/poweredge-datacenter-servers?hve=explore+poweredge-datacenter-servers",
+    "hp": "https://www.hp.com/us-en/shop/mdp/smb-servers-3074457345617969168--1/rack-servers",
+    "lenovo": "https://www.lenovo.com/tn/fr/c/servers-storage/servers/racks/",
+    "xfusion": "https://www.xfusion.com/en/product/rack-server",
+    "epson": "https://epson.com/For-Home/Printers/c/h1?q=%3Aprice-asc%3AdiscontinuedFlag%3Afalse",
+}
+
+_RESOURCES_JS = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return [entries.length, entries.reduce((s, e) => s + (e.transferSize || 0), 0)];
+"""
+
+
+def _legacy_driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    return webdriver.Chrome(options=options)
+
+
+def measure(profile: str, url: str, timeout: int) -> dict:
+    driver = _legacy_driver() if profile == "legacy" else create_driver(profile, headless=True, cache_name=False)
+    try:
+        driver.set_page_load_timeout(timeout)
+        t0 = time.perf_counter()
+        driver.get(url)
+        get_s = time.perf_counter() - t0
+        WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        complete_s = time.perf_counter() - t0
+        requests, transferred = driver.execute_script(_RESOURCES_JS)
+        blocker = getattr(driver, "request_blocker", None)
+        if blocker is not None:
+            blocker.collect()
+        blocked = sum(blocker.blocked.values()) if blocker is not None else 0
+        return {"get": get_s, "complete": complete_s, "requests": requests, "bytes": transferred, "blocked": blocked}
+    finally:
+        driver.quit()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Temps de chargement par site: legacy vs profils de la fabrique")
+    p.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    p.add_argument("--profiles", nargs="+", default=["legacy", "full", "fast"], choices=["legacy", "full", "fast"])
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--timeout", type=int, default=60)
+    args = p.parse_args()
+
+    print(f"{'site':>8} | {'profil':<6} | {'get()':>7} | {'complete':>8} | {'requêtes':>8} | {'transféré':>10} | {'bloquées':>8}")
+    for site in args.sites:
+        for profile in args.profiles:
+            samples = []
+            for _ in range(args.runs):
+                try:
+                    samples.append(measure(profile, SITES[site], args.timeout))
+                except Exception as e:
+                    print(f"{site:>8} | {profile:<6} | échec: {str(e).splitlines()[0][:80]}")
+            if not samples:
+                continue
+            med = {k: statistics.median(s[k] for s in samples) for k in samples[0]}
+            print(f"{site:>8} | {profile:<6} | {med['get']:6.2f}s | {med['complete']:7.2f}s | "
+                  f"{med['requests']:8.0f} | {med['bytes'] / 1024:8.0f} Ko | {med['blocked']:8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())